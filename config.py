@@ -14,12 +14,128 @@ VECTORSTORE_DIR = DATA_DIR / "vectorstore"
 METADATA_JSON = DATA_DIR / "eurlex_results.json"
 METADATA_JSON_RO = DATA_DIR / "eurlex_ro.json"
 PDF_DIR = DATA_DIR / "pdfs"
+PROCESSED_INDEX_JSON = DATA_DIR / "processed_index.json"
+PIPELINE_JOURNAL = DATA_DIR / "pipeline_journal.jsonl"
 
 # OpenAI configuration
 OPENAI_API_KEY = ""
+OPENAI_BASE_URL = None  # Point at a local OpenAI-compatible server for testing
 OPENAI_MODEL = "gpt-4o-mini"
 MAX_SUMMARY_TOKENS = 600
 TRUNCATE_WORDS = 5000
+ANSWER_SINGLE_PASS = False  # Answer and refine in one streamed call
+
+# Summarization: "truncate" summarizes the first TRUNCATE_WORDS words in one call;
+# "map_reduce" splits longer documents into sections of at most
+# SUMMARY_SECTION_TOKENS tokens, summarizes them concurrently (cached by content
+# hash) and merges the section summaries in one reduce call. Every section is
+# read: past SUMMARY_REDUCE_TOKENS tokens of section summaries, consecutive
+# summaries are first merged in groups, level by level, until they fit.
+# map_reduce is opt-in: it makes one call per section plus the merge calls
+SUMMARY_MODE = "truncate"
+SUMMARY_SECTION_TOKENS = 3000
+SUMMARY_SECTION_SUMMARY_TOKENS = 250
+SUMMARY_REDUCE_TOKENS = 6000
+SECTION_CACHE_PATH = DATA_DIR / "section_summary_cache.sqlite"
+SECTION_CACHE_MAX_ENTRIES = 100_000
+
+# Prompt assembly on the query path: prompts are counted with tiktoken before
+# sending and retrieved context is trimmed (lowest-ranked chunks first) to keep
+# them within PROMPT_MAX_TOKENS; LOG_TOKEN_USAGE logs prompt / cached /
+# completion tokens of every call
+PROMPT_MAX_TOKENS = 6000
+LOG_TOKEN_USAGE = True
+
+# Query path retrieval: chunks given to the model, and unfiltered chunks fetched
+# while the category is being detected (filtered locally afterwards)
+RETRIEVAL_K = 5
+RETRIEVAL_FETCH_K = 40
+
+# "hybrid" fuses dense and BM25 rankings (reciprocal rank fusion), "dense" is
+# Chroma similarity only
+RETRIEVAL_MODE = "hybrid"
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Query-time vector store: "chroma", or "numpy" for the memory-mapped flat index
+# exported from Chroma by build_vector_db ("int8" dtype quantizes the vectors,
+# NUMPY_INDEX_IVF_LISTS > 0 partitions them and searches the closest lists)
+VECTOR_BACKEND = "chroma"
+NUMPY_INDEX_DTYPE = "float32"
+NUMPY_INDEX_IVF_LISTS = 0
+NUMPY_INDEX_IVF_PROBES = 8
+
+# Vector store layout: "single" collection, or "sharded" with one store per
+# category (written in parallel, opened lazily at query time)
+VECTORSTORE_LAYOUT = "single"
+VECTORSTORE_SHARD_WORKERS = 4
+VECTORSTORE_OPEN_SHARDS = 8
+
+# Concurrent LLM execution (categorize/summarize)
+LLM_CONCURRENCY = 8
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 200_000
+LLM_MAX_RETRIES = 5
+
+# Offline backfills through the OpenAI Batch API (results within the completion
+# window, at BATCH_DISCOUNT of the synchronous price). Request files and batch
+# state live in BATCH_DIR; "local" is a file-based stand-in for offline runs.
+# Prices are USD per million tokens of OPENAI_MODEL, for the cost report
+BATCH_DIR = DATA_DIR / "batches"
+BATCH_BACKEND = "openai"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 60  # Seconds
+BATCH_DISCOUNT = 0.5
+LLM_INPUT_PRICE_PER_MTOK = 0.15
+LLM_OUTPUT_PRICE_PER_MTOK = 0.60
+
+# Streaming pipeline: documents being processed at once (bounds memory)
+PIPELINE_MAX_IN_FLIGHT = 32
+PIPELINE_INDEX_SAVE_EVERY = 25
+
+# Embedding configuration
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_CACHE_PATH = DATA_DIR / "embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_ENTRIES = 500_000
+
+# Chunking: "recursive" is the 600-character split; "structure" (opt-in) splits
+# on Article / recital / annex / paragraph boundaries into chunks of at most
+# CHUNK_TOKENS tokens, carrying over up to CHUNK_OVERLAP_TOKENS of whole
+# sentences. Switching chunkers re-embeds every file in the vector store
+CHUNKER = "recursive"
+CHUNK_TOKENS = 200
+CHUNK_OVERLAP_TOKENS = 30
+CHUNK_MIN_TOKENS = 40
+
+# Two-tier index: full raw texts are chunked into a fine store next to the
+# summaries; a question searches only the fine chunks of the FULLTEXT_DOCUMENTS
+# best documents of the summary ranking and adds FULLTEXT_K of them. Opt-in:
+# it embeds every raw text as well, several times the summaries' embedding cost
+FULLTEXT_INDEX = False
+FULLTEXT_DOCUMENTS = 3
+FULLTEXT_K = 4
+
+# Vector store ingestion: chunks per embedding request, concurrent embedding
+# requests per store, and batches buffered between the stages (bounds memory)
+INGEST_BATCH_SIZE = 256
+INGEST_WORKERS = 4
+INGEST_QUEUE_BATCHES = 8
+
+# Tracing: per-stage spans (OTLP/JSON field names) appended to TRACE_PATH.
+# Always on with --profile, which also prints a per-stage summary table
+TRACING_ENABLED = False
+TRACE_PATH = DATA_DIR / "traces.jsonl"
+
+# Semantic answer cache for rag_interface / gui.py
+ANSWER_CACHE_PATH = DATA_DIR / "answer_cache.sqlite"
+ANSWER_CACHE_THRESHOLD = 0.95  # Cosine similarity needed to reuse an answer
+ANSWER_CACHE_TTL = 7 * 24 * 3600  # Seconds
+ANSWER_CACHE_MAX_ENTRIES = 10_000
+
+# Question category routing: "centroid" (local, LLM fallback) or "llm"
+CATEGORY_ROUTER = "centroid"
+CATEGORY_ROUTER_MIN_MARGIN = 0.02  # Best minus second best centroid similarity
 
 # Domain categories
 DOMAINS = [
@@ -59,6 +175,22 @@ DOMAINS = [
     "Others/Unidentified",
 ]
 
+# Shared WebDriver pool used by the scrapers
+SCRAPER_WORKERS = 4
+SCRAPER_HOST_MIN_INTERVAL = 1.0  # Seconds between two requests to the same host
+SCRAPER_WAIT_TIMEOUT = 20
+SCRAPER_PAGE_LOAD_TIMEOUT = 300
+SCRAPER_DOWNLOAD_TIMEOUT = 60
+
+# Document fetching: "http" (plain HTTP, browser fallback) or "selenium"
+FETCH_BACKEND = "http"
+HTTP_CONCURRENCY = 8
+HTTP_TIMEOUT = 60
+HTTP_VALIDATORS_JSON = DATA_DIR / "http_validators.json"
+
+# PDF text extraction processes (None = one per CPU core)
+PDF_WORKERS = None
+
 # EUR-Lex scraping configuration
 BASE_URL = "https://eur-lex.europa.eu/"
 DEFAULT_TARGET_YEAR = 2025
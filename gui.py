@@ -1,20 +1,38 @@
 import streamlit as st
-from pathlib import Path
-from rag_interface import detect_category, get_answer, refine_answer, load_retriever
-from main_pipeline import load_raw_texts, save_summaries
+from rag_interface import (
+    AnswerStream,
+    detect_category,
+    get_categories,
+    get_prompt_builder,
+    load_retriever,
+)
+from scripts.answer_cache import AnswerCache
+from scripts.category_router import get_category_router
+from scripts.prompts import configure_usage_log
+from scripts.query_executor import QueryExecutor
+from config import RAW_DIR, SUMMARY_DIR, ANSWER_SINGLE_PASS
+
+
+# Query executors built by load_query_resources, closed when it is cleared
+@st.cache_resource
+def live_query_executors() -> list[QueryExecutor]:
+    return []
+
+
+# Streamlit reruns this script on every interaction: the retriever, answer
+# cache and query executor are built once per process, on the first question
+@st.cache_resource(show_spinner="Loading the vector store...")
+def load_query_resources():
+    retriever = load_retriever()
+    configure_usage_log()
+    get_prompt_builder()
+    category_router = get_category_router(detect_category)
+    query_executor = QueryExecutor(
+        retriever.vectorstore, category_router, bm25=getattr(retriever, "bm25", None)
+    )
+    live_query_executors().append(query_executor)
+    return retriever, AnswerCache(), category_router, query_executor
 
-# Import processing functions
-from scripts.parse_all_results import parse_all_results
-from scripts.extract_result_text import extract_result_text
-from scripts.categorize import categorize_texts
-from scripts.sanitize import sanitize_texts
-from scripts.summarize import summarize_texts
-from scripts.build_vector_db import build_vector_db
-from config import RAW_DIR, SUMMARY_DIR
-
-
-# Initialize retriever
-retriever = load_retriever()
 
 # Streamlit page settings
 st.set_page_config(page_title="EU Regulations", layout="wide")
@@ -59,21 +77,38 @@ with col1:
         st.session_state.clear_input = False
 
     question = st.text_area("Question", key="question_input", label_visibility="hidden")
+    single_pass = st.checkbox("Single-pass answer (faster first token)", value=ANSWER_SINGLE_PASS)
 
     if st.button("Get Answer", use_container_width=True):
         if question.strip():
-            with st.spinner("Detecting category..."):
-                category = detect_category(question)
-                st.markdown(f"<h4>📂 <b>Detected Category:</b> {category}</h4>", unsafe_allow_html=True)
-
-            with st.spinner("Retrieving relevant documents..."):
-                raw_answer = get_answer(question, category, retriever)
-
-            with st.spinner("Refining the answer..."):
-                final_answer = refine_answer(raw_answer, question)
+            retriever, answer_cache, category_router, query_executor = (
+                load_query_resources()
+            )
+            stream = AnswerStream(
+                question,
+                retriever,
+                answer_cache,
+                category_router,
+                single_pass=single_pass,
+                progress=st.write,
+                executor=query_executor,
+            )
+
+            # The raw answer streams here while it is generated (two-pass mode only)
+            with st.status("Answering...", expanded=True) as status:
+                st.write_stream(stream.draft())
+                if stream.cached:
+                    label = "♻️ Answered from cache"
+                else:
+                    label = "✅ Category detected" if single_pass else "✅ Draft ready"
+                status.update(label=label, state="complete", expanded=False)
+
+            st.markdown(f"<h4>📂 <b>Detected Category:</b> {stream.category}</h4>", unsafe_allow_html=True)
 
             st.subheader("Answer:")
-            st.write(final_answer)
+            st.write_stream(stream)
+            final_answer = stream.answer
+            st.caption(f"⏱️ {stream.format_timings()}")
 
             # Save to history and update session state
             st.session_state.history.append((question, final_answer))
@@ -97,6 +132,15 @@ with st.sidebar:
     target_year = st.number_input("Select Year", min_value=2000, max_value=2030, value=2025, step=1)
 
     if st.button("Run Processing Pipeline"):
+        # The pipeline (Selenium, PDF tooling, LLM engine) is only loaded when run
+        from main_pipeline import iter_raw_texts
+        from scripts.parse_all_results import parse_all_results
+        from scripts.extract_result_text import extract_result_text
+        from scripts.process_documents import stream_documents
+        from scripts.processed_index import ProcessedIndex
+        from scripts.run_journal import RunJournal
+        from scripts.build_vector_db import build_vector_db
+
         with st.status("Processing...", expanded=True) as status:
             st.write("🔍 Parsing metadata from EUR-Lex...")
             parse_all_results(target_year=target_year)
@@ -106,23 +150,34 @@ with st.sidebar:
             for update in extract_result_text_generator:
                 st.write(update)  # Display progress in UI
 
-            st.write("📂 Loading raw files from disk...")
-            raw_data = load_raw_texts(RAW_DIR)
-
-            st.write("🏷️ Categorizing documents...")
-            categorized = categorize_texts(raw_data)
-
-            st.write("🧼 Sanitizing text...")
-            sanitized = sanitize_texts(categorized)
-
-            st.write("🧠 Summarizing content...")
-            summarized = summarize_texts(sanitized)
-
-            st.write("💾 Saving summaries to disk...")
-            save_summaries(summarized, SUMMARY_DIR)
-
-            st.write("📚 Building vector database...")
-            build_vector_db()
+            journal = RunJournal.load()
+            try:
+                st.write("🧠 Categorizing, sanitizing and summarizing documents...")
+                index = ProcessedIndex.load(SUMMARY_DIR)
+                written = stream_documents(
+                    iter_raw_texts(RAW_DIR),
+                    index,
+                    SUMMARY_DIR,
+                    progress=st.write,
+                    journal=journal,
+                )
+                st.write(f"💾 Saved {written} new summaries to disk")
+
+                st.write("📚 Building vector database...")
+                build_vector_db(journal=journal)
+
+                journal.compact()
+            finally:
+                journal.close()
+
+            # Pick up the rebuilt store and any new category on the next question,
+            # after stopping the old executor's router thread
+            executors = live_query_executors()
+            while executors:
+                executors.pop().close()
+            load_query_resources.clear()
+            get_categories.cache_clear()
+            get_prompt_builder.cache_clear()
 
             status.update(label="✅ Database built successfully!", state="complete")
 
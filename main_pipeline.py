@@ -2,69 +2,86 @@
 
 from scripts.parse_all_results import parse_all_results
 from scripts.extract_result_text import extract_result_text
-from scripts.categorize import categorize_texts
-from scripts.sanitize import sanitize_texts
-from scripts.summarize import summarize_texts
+from scripts.process_documents import stream_documents
+from scripts.processed_index import ProcessedIndex
+from scripts.run_journal import RunJournal
 from scripts.build_vector_db import build_vector_db
 from scripts.parse_romanian_results import parse_all_results_ro
 from scripts.extract_pdf import extract_pdf
 from scripts.clean_pdfs import clean_pdfs
+from scripts.tracing import configure_tracing, span
 
-from config import RAW_DIR, SUMMARY_DIR, DEFAULT_TARGET_YEAR
+from config import RAW_DIR, SUMMARY_DIR, DEFAULT_TARGET_YEAR, TRACE_PATH
 
+from collections.abc import Iterator
 from pathlib import Path
+import argparse
 
 
-# Load raw .txt files from disk
-def load_raw_texts(raw_dir: Path) -> dict[str, str]:
-    data = {}
+# Stream raw .txt files from disk one at a time
+def iter_raw_texts(raw_dir: Path) -> Iterator[tuple[str, str]]:
     for file in raw_dir.rglob("*.txt"):
         relative_path = file.relative_to(raw_dir)
         with open(file, "r", encoding="utf-8") as f:
-            data[str(relative_path)] = f.read()
-    return data
+            yield str(relative_path), f.read()
 
 
-# Save final summarized output to disk
-def save_summaries(summaries: dict[str, dict[str, str]], output_dir: Path):
-    for category, files in summaries.items():
-        for relative_path, summary in files.items():
-            output_path = output_dir / category / relative_path
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(summary)
+def main(profile: bool = False):
+    tracer = configure_tracing(TRACE_PATH) if profile else None
+    with span("pipeline"):
+        _run_pipeline()
+
+    print("✅ All processing complete.")
+    if tracer:
+        print(f"📈 Stage profile (spans in {TRACE_PATH}):")
+        print(tracer.format_summary())
+        tracer.close()
 
 
-def main():
+def _run_pipeline():
     print("🔍 Parsing metadata from EUR-Lex...")
-    parse_all_results(target_year=DEFAULT_TARGET_YEAR)
-    parse_all_results_ro(target_year=DEFAULT_TARGET_YEAR)
+    with span("scrape", source="eur-lex"):
+        parse_all_results(target_year=DEFAULT_TARGET_YEAR)
+    with span("scrape", source="romanian"):
+        parse_all_results_ro(target_year=DEFAULT_TARGET_YEAR)
 
     print("🌐 Downloading full regulation text from links...")
-    extract_result_text()
-    extract_pdf()
-    clean_pdfs()
-
-    print("📂 Loading raw files from disk...")
-    raw_data = load_raw_texts(RAW_DIR)
-
-    print("🏷️ Categorizing documents...")
-    categorized = categorize_texts(raw_data)
-
-    print("🧼 Sanitizing text...")
-    sanitized = sanitize_texts(categorized)
-
-    print("🧠 Summarizing content...")
-    summarized = summarize_texts(sanitized)
-
-    print("💾 Saving summaries to disk...")
-    save_summaries(summarized, SUMMARY_DIR)
-
-    print("📚 Building vector database...")
-    build_vector_db()
-
-    print("✅ All processing complete.")
+    with span("extract", step="html") as stage:
+        for _ in extract_result_text():  # Generator, progress is printed as it runs
+            stage.add(items=1)
+    with span("extract", step="pdf_download"):
+        extract_pdf()
+    with span("extract", step="pdf_text"):
+        clean_pdfs()
+
+    # Stage outputs of an interrupted run are picked up from the journal
+    journal = RunJournal.load()
+    try:
+        print("🧠 Categorizing, sanitizing and summarizing documents...")
+        index = ProcessedIndex.load(SUMMARY_DIR)
+        with span("process") as stage:
+            written = stream_documents(
+                iter_raw_texts(RAW_DIR), index, SUMMARY_DIR, journal=journal
+            )
+            stage.set(items=written)
+        print(f"💾 Saved {written} new summaries to disk")
+
+        print("📚 Building vector database...")
+        with span("build_vector_db") as stage:
+            counts = build_vector_db(journal=journal)
+            stage.set(items=counts["chunks"])
+
+        journal.compact()
+    finally:
+        journal.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the full processing pipeline")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Trace every stage to {TRACE_PATH} and print a per-stage summary",
+    )
+    args = parser.parse_args()
+    main(profile=args.profile)
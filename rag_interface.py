@@ -1,52 +1,111 @@
 # rag_interface.py
 
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from config import VECTORSTORE_DIR, SUMMARY_DIR, OPENAI_MODEL, OPENAI_API_KEY
-from openai import OpenAI
+from langchain_core.documents import Document
+from scripts.answer_cache import AnswerCache
+from scripts.bm25_index import BM25Index
+from scripts.category_router import CategoryRouter, get_category_router
+from scripts.hybrid_retriever import HybridRetriever
+from scripts.numpy_index import NumpyVectorIndex
+from scripts.query_executor import QueryExecutor
+from scripts.embedding_cache import get_embedding_function
+from scripts.two_tier_retriever import TwoTierRetriever
+from scripts.prompts import Prompt, PromptBuilder, configure_usage_log, log_usage
+from scripts.tracing import configure_tracing, span, traced
+from config import (
+    VECTORSTORE_DIR,
+    SUMMARY_DIR,
+    OPENAI_MODEL,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    ANSWER_SINGLE_PASS,
+    RETRIEVAL_K,
+    RETRIEVAL_MODE,
+    VECTOR_BACKEND,
+    VECTORSTORE_LAYOUT,
+    FULLTEXT_INDEX,
+    TRACE_PATH,
+)
+from collections import Counter
+from collections.abc import Iterator
+from functools import lru_cache
+import argparse
 import os
+import time
 
-client = OpenAI(api_key=OPENAI_API_KEY)
 
-# ---------- Category list ----------
-CATEGORIES = sorted(
-    name for name in os.listdir(SUMMARY_DIR) if (SUMMARY_DIR / name).is_dir()
-)
+# ---------- Shared client and category list (created on first use) ----------
+@lru_cache(maxsize=None)
+def get_client():
+    from openai import OpenAI
+
+    return OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
-print("Available categories:", CATEGORIES)
+
+@lru_cache(maxsize=None)
+def get_categories() -> list[str]:
+    return sorted(
+        name for name in os.listdir(SUMMARY_DIR) if (SUMMARY_DIR / name).is_dir()
+    )
 
 
 # ---------- Load the persisted vector DB ----------
 def load_retriever():
-    embedding = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
-    vectordb = Chroma(
-        persist_directory=str(VECTORSTORE_DIR), embedding_function=embedding
-    )
-    return vectordb.as_retriever(search_kwargs={"k": 5})
+    # Chroma (and chromadb behind it) is only imported when a store is opened
+    from langchain_chroma import Chroma
+    from scripts.sharded_store import ShardedVectorStore
+
+    embedding = get_embedding_function()
+    vectordb = None
+    if VECTOR_BACKEND == "numpy":
+        vectordb = NumpyVectorIndex.load(embedding, VECTORSTORE_DIR)
+        if vectordb is None:
+            print("⚠️ No numpy vector index found, falling back to Chroma")
+    elif VECTORSTORE_LAYOUT == "sharded":
+        vectordb = ShardedVectorStore.load(embedding, VECTORSTORE_DIR)
+        if vectordb is None:
+            print("⚠️ No vector store shards found, falling back to Chroma")
+    if vectordb is None:
+        vectordb = Chroma(
+            persist_directory=str(VECTORSTORE_DIR), embedding_function=embedding
+        )
+    retriever = None
+    if RETRIEVAL_MODE == "hybrid":
+        bm25 = BM25Index.load(VECTORSTORE_DIR)
+        if bm25 is not None:
+            retriever = HybridRetriever(vectordb, bm25)
+        else:
+            print("⚠️ No BM25 index found, falling back to dense retrieval")
+    if retriever is None:
+        retriever = vectordb.as_retriever(search_kwargs={"k": RETRIEVAL_K})
+    if FULLTEXT_INDEX:
+        two_tier = TwoTierRetriever.load(retriever, embedding, VECTORSTORE_DIR)
+        if two_tier is not None:
+            return two_tier
+        print("⚠️ No full-text index found, searching summaries only")
+    return retriever
+
+
+# ---------- Prompt assembly (static prefixes built once) ----------
+@lru_cache(maxsize=None)
+def get_prompt_builder() -> PromptBuilder:
+    return PromptBuilder(get_categories())
 
 
 # ---------- Step 1: First model - Detect category ----------
 def detect_category(question: str) -> str:
-    formatted_categories = "\n- " + "\n- ".join(CATEGORIES)
-    system_prompt = (
-        "You are a classifier that determines the correct category of a user's question about European regulations.\n"
-        "Choose exactly one category from the following list:\n"
-        f"{formatted_categories}\n\n"
-        "Respond ONLY with the category name. Do not add any explanation or formatting."
-    )
+    categories = get_categories()
+    prompt = get_prompt_builder().category(question)
 
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": question},
-        ],
+        messages=prompt.messages,
         max_tokens=15,
         temperature=0,
     )
 
+    log_usage(prompt, response.usage)
     category = response.choices[0].message.content.strip()
-    if category not in CATEGORIES:
+    if category not in categories:
         print(
             f"⚠️ Unknown category detected: {category}. Defaulting to 'Others/Unidentified'."
         )
@@ -55,71 +114,358 @@ def detect_category(question: str) -> str:
 
 
 # ---------- Step 2: Retrieve context and generate raw answer ----------
+def retrieve_context(question: str, category: str, retriever) -> list[Document]:
+    return retriever.invoke(question, filter={"category": category})
+
+
 def get_answer(question: str, category: str, retriever):
-    relevant_docs = retriever.invoke(question, filter={"category": category})
-    context = "\n\n".join([doc.page_content for doc in relevant_docs])
-
-    prompt = (
-        f"You are an expert in European regulations. The following context belongs to the '{category}' category. "
-        "Use only the context to answer the user's question. The answer may be spread across the whole document. "
-        "Before answering the question, read the document thoroughly. "
-        "If the answer is not in the context, say: 'The information is not available in the provided documents.'\n\n"
-        f"Context:\n{context}\n\n"
-        f"Question: {question}\n\nAnswer:"
-    )
+    documents = retrieve_context(question, category, retriever)
+    prompt = get_prompt_builder().answer(question, category, documents)
 
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=OPENAI_MODEL,
-        messages=[{"role": "user", "content": prompt}],
+        messages=prompt.messages,
         temperature=1,
     )
+    log_usage(prompt, response.usage)
     return response.choices[0].message.content.strip()
 
 
 # ---------- Step 3: Refine the raw answer ----------
 def refine_answer(raw_answer: str, question: str) -> str:
-    prompt = (
-        "You are a professional legal assistant helping a user understand European Union regulations. "
-        "Your task is to take the following raw answer and rewrite it in a clear, organized, and formal tone.\n\n"
-        "Guidelines:\n"
-        "- Structure the response in full sentences.\n"
-        "- Use formal language but keep it easy to understand.\n"
-        "- Highlight legal points, actions, or obligations where relevant.\n"
-        "- Use bullet points or paragraphs only if it improves clarity.\n"
-        "- Remove any phrasing artifacts from the LLM that generated the raw answer.\n"
-        "- Do NOT add new facts or assumptions.\n"
-        "- The final response must only be based on the raw answer and the user question.\n\n"
-        f"User Question: {question}\n\n"
-        f"Raw Answer: {raw_answer}\n\n"
-        f"Formatted Answer:"
-    )
+    prompt = get_prompt_builder().refine(raw_answer, question)
 
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=OPENAI_MODEL,
-        messages=[{"role": "user", "content": prompt}],
+        messages=prompt.messages,
         temperature=0.5,
         max_tokens=600,
     )
+    log_usage(prompt, response.usage)
     return response.choices[0].message.content.strip()
 
 
-# ---------- Run full QA pipeline ----------
+# ---------- Streaming variants ----------
+def _stream_completion(prompt: Prompt, **kwargs) -> Iterator[str]:
+    # The last chunk carries the token usage of the whole completion
+    stream = get_client().chat.completions.create(
+        messages=prompt.messages,
+        stream=True,
+        stream_options={"include_usage": True},
+        **kwargs,
+    )
+    for chunk in stream:
+        if chunk.usage:
+            log_usage(prompt, chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def stream_answer(
+    question: str, category: str, retriever, documents: list[Document] | None = None
+) -> Iterator[str]:
+    if documents is None:
+        documents = retrieve_context(question, category, retriever)
+    yield from _stream_completion(
+        get_prompt_builder().answer(question, category, documents),
+        model=OPENAI_MODEL,
+        temperature=1,
+    )
+
+
+def stream_refine(raw_answer: str, question: str) -> Iterator[str]:
+    yield from _stream_completion(
+        get_prompt_builder().refine(raw_answer, question),
+        model=OPENAI_MODEL,
+        temperature=0.5,
+        max_tokens=600,
+    )
+
+
+def stream_single_pass(
+    question: str, category: str, retriever, documents: list[Document] | None = None
+) -> Iterator[str]:
+    """Answers and formats in one streamed call instead of answer + refine."""
+    if documents is None:
+        documents = retrieve_context(question, category, retriever)
+    yield from _stream_completion(
+        get_prompt_builder().single_pass(question, category, documents),
+        model=OPENAI_MODEL,
+        temperature=0.5,
+        max_tokens=600,
+    )
+
+
+# ---------- Full QA pipeline, behind the semantic answer cache ----------
+class AnswerStream:
+    """
+    Streams the answer to one question. Iterating yields the final answer's
+    tokens; in two-pass mode draft() yields the raw answer first, so callers
+    can show it while it is generated. category, cached, answer, ttft (seconds
+    until the first token of either stream), total_time and per-stage timings
+    are filled in as the streams are consumed. The finished answer is stored
+    in the cache. The router is only used to build the default executor,
+    which is closed once the context is prepared.
+    """
+
+    def __init__(
+        self,
+        question: str,
+        retriever,
+        cache: AnswerCache | None = None,
+        router: CategoryRouter | None = None,
+        single_pass: bool = ANSWER_SINGLE_PASS,
+        progress=print,
+        executor: QueryExecutor | None = None,
+    ):
+        self.question = question
+        self.retriever = retriever
+        self.cache = cache or AnswerCache()
+        # A passed-in executor is shared (gui.py keeps one per process)
+        self._owns_executor = executor is None
+        self.executor = executor or QueryExecutor(
+            retriever.vectorstore,
+            router or get_category_router(detect_category),
+            k=retriever.search_kwargs.get("k", RETRIEVAL_K),
+            bm25=getattr(retriever, "bm25", None),
+        )
+        self.single_pass = single_pass
+        self.progress = progress
+
+        self.category = None
+        self.cached = False
+        self.answer = ""
+        self.ttft = None
+        self.total_time = None
+        self.timings = {}
+        self._start = time.perf_counter()
+        self._prepared = False
+        self._vector = None
+        self._documents = None
+        self._raw_answer = None
+
+    def _prepare(self):
+        if self._prepared:
+            return
+        self._prepared = True
+        try:
+            self._prepare_context()
+        finally:
+            if self._owns_executor:
+                self.executor.close()
+
+    def _prepare_context(self):
+        # Questions citing a known CELEX / document number skip embedding
+        bm25 = getattr(self.retriever, "bm25", None)
+        if bm25 is not None:
+            start = time.perf_counter()
+            with span("retrieve", strategy="exact_id") as stage:
+                documents = bm25.lookup_ids(self.question, self.executor.k)
+                stage.set(items=len(documents))
+            self.timings["exact_id"] = time.perf_counter() - start
+            if documents:
+                categories = Counter(doc.metadata["category"] for doc in documents)
+                self.category = categories.most_common(1)[0][0]
+                sources = dict.fromkeys(doc.metadata["source"] for doc in documents)
+                self.progress(f"🔎 Matched by document number: {', '.join(sources)}")
+                if hasattr(self.retriever, "lookup_fine"):
+                    # The cited document's own articles and annexes, still
+                    # without embedding the question
+                    start = time.perf_counter()
+                    fine = self.retriever.lookup_fine(documents, self.question)
+                    self.timings["retrieve_fine"] = time.perf_counter() - start
+                    documents = documents + fine
+                self._documents = documents
+                return
+
+        start = time.perf_counter()
+        with span("embed", items=1):
+            embeddings = self.retriever.vectorstore.embeddings
+            self._vector = embeddings.embed_query(self.question)
+        self.timings["embed"] = time.perf_counter() - start
+
+        # Cached answers are only reused within the question's category. A
+        # local route is checked before retrieval; when only the LLM router
+        # can decide, it runs alongside retrieval and the cache is checked after
+        start = time.perf_counter()
+        local_route = self.executor.route_local(self.question, self._vector)
+        self.timings["route"] = time.perf_counter() - start
+        if local_route is not None and self._reuse_cached(local_route.category):
+            return
+
+        self.progress("🔍 Detecting category and retrieving context...")
+        prepared = self.executor.prepare(self.question, self._vector, local_route)
+        route = prepared.route
+        self.category = route.category
+        self.timings.update(prepared.timings)
+        if local_route is None and self._reuse_cached(route.category):
+            return
+        documents = prepared.documents
+        if hasattr(self.retriever, "search_fine"):
+            documents = documents + self._search_fine(documents, self._vector)
+        self._documents = documents
+        self.progress(
+            f"📂 Category detected: {self.category} "
+            f"({route.strategy}, confidence {route.confidence:.2f})"
+        )
+
+    def _reuse_cached(self, category: str) -> bool:
+        start = time.perf_counter()
+        with span("answer_cache") as stage:
+            cached = self.cache.lookup(self._vector, category=category)
+            stage.add(cache_hits=int(bool(cached)), cache_misses=int(not cached))
+        self.timings["cache"] = time.perf_counter() - start
+        if not cached:
+            return False
+        self.progress(f"♻️ Reusing the answer to: {cached['question']}")
+        self.category = cached["category"]
+        self.answer = cached["answer"]
+        self.cached = True
+        return True
+
+    def _search_fine(self, documents, vector: list[float]) -> list:
+        start = time.perf_counter()
+        fine = self.retriever.search_fine(documents, vector)
+        self.timings["retrieve_fine"] = time.perf_counter() - start
+        return fine
+
+    def _timed(self, tokens: Iterator[str]) -> Iterator[str]:
+        for token in tokens:
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self._start
+            yield token
+
+    def draft(self) -> Iterator[str]:
+        self._prepare()
+        if self.cached or self.single_pass or self._raw_answer is not None:
+            return
+
+        self.progress("🧠 Searching for answer...")
+        start = time.perf_counter()
+        parts = []
+        tokens = traced(
+            "answer",
+            stream_answer(
+                self.question, self.category, self.retriever, documents=self._documents
+            ),
+        )
+        for token in self._timed(tokens):
+            parts.append(token)
+            yield token
+        self._raw_answer = "".join(parts).strip()
+        self.timings["answer"] = time.perf_counter() - start
+
+    def __iter__(self) -> Iterator[str]:
+        self._prepare()
+        if self.cached:
+            yield from self._timed([self.answer])
+            self.total_time = time.perf_counter() - self._start
+            return
+
+        if self.single_pass:
+            self.progress("🧠 Searching for answer...")
+            stage = "answer"
+            tokens = traced(
+                "answer",
+                stream_single_pass(
+                    self.question,
+                    self.category,
+                    self.retriever,
+                    documents=self._documents,
+                ),
+                single_pass=True,
+            )
+        else:
+            for _ in self.draft():
+                pass
+            self.progress("🪄 Polishing answer...")
+            stage = "refine"
+            tokens = traced("refine", stream_refine(self._raw_answer, self.question))
+
+        start = time.perf_counter()
+        parts = []
+        for token in self._timed(tokens):
+            parts.append(token)
+            yield token
+        self.answer = "".join(parts).strip()
+        self.timings[stage] = time.perf_counter() - start
+        self.total_time = time.perf_counter() - self._start
+        if self._vector is not None:
+            self.cache.store(self.question, self._vector, self.category, self.answer)
+
+    def format_timings(self) -> str:
+        stages = ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()
+        )
+        return (
+            f"First token after {self.ttft:.2f}s, done in {self.total_time:.2f}s "
+            f"({stages})"
+        )
+
+
+def answer_question(
+    question: str,
+    retriever,
+    cache: AnswerCache | None = None,
+    router: CategoryRouter | None = None,
+    progress=print,
+    single_pass: bool = ANSWER_SINGLE_PASS,
+) -> dict:
+    """
+    Answers a question and returns {"category", "answer", "cached", "ttft"}.
+    The cache is checked before category detection, so a hit costs one
+    (usually cached) embedding and no chat completions. The category comes from
+    the configured router, which only asks the LLM when the local centroids are
+    not confident.
+    """
+    stream = AnswerStream(question, retriever, cache, router, single_pass, progress)
+    for _ in stream:
+        pass
+    return {
+        "category": stream.category,
+        "answer": stream.answer,
+        "cached": stream.cached,
+        "ttft": stream.ttft,
+    }
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Ask a question about EU regulations")
+    parser.add_argument(
+        "--single-pass",
+        action="store_true",
+        default=ANSWER_SINGLE_PASS,
+        help="Answer and format in one streamed call",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Trace every stage to {TRACE_PATH} and print a per-stage summary",
+    )
+    args = parser.parse_args()
+    tracer = configure_tracing(TRACE_PATH) if args.profile else None
+    configure_usage_log()
+
+    print("Available categories:", get_categories())
     retriever = load_retriever()
+    get_prompt_builder()
     question = input("Ask a question about EU regulations:\n> ")
 
-    print("\n🔍 Detecting category...")
-    category = detect_category(question)
-    print(f"📂 Category detected: {category}")
-
-    print("\n🧠 Searching for answer...")
-    raw_answer = get_answer(question, category, retriever)
-
-    print("\n🪄 Polishing answer...")
-    final_answer = refine_answer(raw_answer, question)
+    stream = AnswerStream(question, retriever, single_pass=args.single_pass)
+    # The draft is shown as it streams, so ttft is the first token on screen
+    for i, token in enumerate(stream.draft()):
+        if i == 0:
+            print("\n📝 Draft Answer:")
+        print(token, end="", flush=True)
 
     print("\n✅ Final Answer:")
-    print(final_answer)
+    for token in stream:
+        print(token, end="", flush=True)
+    print(f"\n\n⏱️ {stream.format_timings()}")
+    if tracer:
+        print(f"\n📈 Stage profile (spans in {TRACE_PATH}):")
+        print(tracer.format_summary())
+        tracer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+# scripts/answer_cache.py
+
+from pathlib import Path
+from config import (
+    VECTORSTORE_DIR,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+)
+from scripts.corpus_version import read_corpus_version
+import numpy as np
+import sqlite3
+import threading
+import time
+
+
+class AnswerCache:
+    """
+    Semantic cache of final answers. A question hits when a previously answered
+    one has a cosine similarity of at least threshold and was answered against
+    the same corpus version (and category, when one is given). Entries expire
+    after ttl seconds and the least recently used ones are evicted past
+    max_entries. Rebuilding the vector store changes the corpus version, which
+    drops every answer given against the old one.
+
+    Lookups search an in-memory matrix of the current version's normalized
+    question vectors; SQLite is only read when the version changes and written
+    on store (which is also when expired and evicted entries are deleted).
+    """
+
+    def __init__(
+        self,
+        cache_path: Path = ANSWER_CACHE_PATH,
+        persist_dir: Path = VECTORSTORE_DIR,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.persist_dir = persist_dir
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "id INTEGER PRIMARY KEY, corpus_version TEXT NOT NULL, "
+            "category TEXT NOT NULL, question TEXT NOT NULL, vector BLOB NOT NULL, "
+            "answer TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answers_version ON answers (corpus_version, category)"
+        )
+        self._conn.commit()
+
+        # Entries of self._version: row ids, categories, creation times and
+        # unit-length vectors, row-aligned
+        self._version = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._categories = np.empty(0, dtype=object)
+        self._created = np.empty(0, dtype=np.float64)
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def _corpus_version(self) -> str | None:
+        return read_corpus_version(self.persist_dir)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / (norms + 1e-12)
+
+    def _load(self, corpus_version: str):
+        # Caller holds the lock
+        rows = self._conn.execute(
+            "SELECT id, category, created_at, vector FROM answers "
+            "WHERE corpus_version = ? ORDER BY id",
+            (corpus_version,),
+        ).fetchall()
+        self._version = corpus_version
+        self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._categories = np.array([row[1] for row in rows], dtype=object)
+        self._created = np.array([row[2] for row in rows], dtype=np.float64)
+        if rows:
+            vectors = [np.frombuffer(row[3], dtype=np.float32) for row in rows]
+            self._matrix = self._normalize(np.stack(vectors))
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def _evict(self, corpus_version: str) -> int:
+        # Caller holds the lock. Returns the number of entries deleted
+        deleted = self._conn.execute(
+            "DELETE FROM answers WHERE corpus_version IS NOT ? OR created_at < ?",
+            (corpus_version, time.time() - self.ttl),
+        ).rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        if count > self.max_entries:
+            deleted += self._conn.execute(
+                "DELETE FROM answers WHERE id IN "
+                "(SELECT id FROM answers ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+        return deleted
+
+    def lookup(self, vector: list[float], category: str | None = None) -> dict | None:
+        """
+        Returns the closest cached {"question", "category", "answer",
+        "similarity"} above the threshold, or None. Without a category every
+        category of the current corpus version is searched.
+        """
+        corpus_version = self._corpus_version()
+        if corpus_version is None:
+            return None
+
+        with self._lock:
+            if corpus_version != self._version:
+                self._load(corpus_version)
+
+            best = None
+            if len(self._ids):
+                query_vector = self._normalize(np.asarray(vector, dtype=np.float32))
+                similarities = self._matrix @ query_vector
+                # Expired entries stay in memory until the next store deletes them
+                valid = self._created >= time.time() - self.ttl
+                if category is not None:
+                    valid &= self._categories == category
+                similarities = np.where(valid, similarities, -np.inf)
+                i = int(np.argmax(similarities))
+                if similarities[i] >= self.threshold:
+                    best = (int(self._ids[i]), float(similarities[i]))
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            answer_id, similarity = best
+            self._conn.execute(
+                "UPDATE answers SET last_used = ? WHERE id = ?",
+                (time.time(), answer_id),
+            )
+            question, category, answer = self._conn.execute(
+                "SELECT question, category, answer FROM answers WHERE id = ?",
+                (answer_id,),
+            ).fetchone()
+            self._conn.commit()
+            self.hits += 1
+
+        return {
+            "question": question,
+            "category": category,
+            "answer": answer,
+            "similarity": similarity,
+        }
+
+    def store(self, question: str, vector: list[float], category: str, answer: str):
+        corpus_version = self._corpus_version()
+        if corpus_version is None:
+            return
+
+        now = time.time()
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            answer_id = self._conn.execute(
+                "INSERT INTO answers (corpus_version, category, question, vector, "
+                "answer, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    corpus_version,
+                    category,
+                    question,
+                    vector.tobytes(),
+                    answer,
+                    now,
+                    now,
+                ),
+            ).lastrowid
+            deleted = self._evict(corpus_version)
+            self._conn.commit()
+
+            if deleted or corpus_version != self._version or not len(self._ids):
+                self._load(corpus_version)
+            else:
+                self._ids = np.append(self._ids, answer_id)
+                self._categories = np.append(self._categories, category)
+                self._created = np.append(self._created, now)
+                self._matrix = np.vstack([self._matrix, self._normalize(vector)])
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
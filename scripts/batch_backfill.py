@@ -0,0 +1,508 @@
+# scripts/batch_backfill.py
+
+from pathlib import Path
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    RAW_DIR,
+    SUMMARY_DIR,
+    SUMMARY_MODE,
+    TRUNCATE_WORDS,
+    DOMAINS,
+    BATCH_DIR,
+    BATCH_BACKEND,
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_INTERVAL,
+    BATCH_DISCOUNT,
+    LLM_INPUT_PRICE_PER_MTOK,
+    LLM_OUTPUT_PRICE_PER_MTOK,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+from scripts.categorize import (
+    CATEGORIZE_SYSTEM_PROMPT,
+    build_categorize_request,
+    parse_category,
+)
+from scripts.llm_engine import estimate_tokens
+from scripts.process_documents import write_summary
+from scripts.processed_index import ProcessedIndex, content_hash
+from scripts.run_journal import RunJournal
+from scripts.sanitize import sanitize_text
+from scripts.summarize import build_summary_request
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+
+# One request file per step: custom_id is the CELEX ID, unique within a file
+STEPS = ["categorize", "summarize"]
+STATE_NAME = "state.json"
+ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _write_json(data, path: Path):
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def batch_line(custom_id: str, request: dict) -> str:
+    body = {"model": OPENAI_MODEL, **request}
+    return json.dumps(
+        {"custom_id": custom_id, "method": "POST", "url": ENDPOINT, "body": body},
+        ensure_ascii=False,
+    )
+
+
+class OpenAIBatchBackend:
+    """Uploads request files and runs them through the OpenAI Batch API."""
+
+    name = "openai"
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        self.client = client
+
+    def submit(self, input_path: Path) -> str:
+        with open(input_path, "rb") as f:
+            upload = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def fetch(self, batch_id: str, output_path: Path):
+        # Failed requests are in the error file, same line format
+        batch = self.client.batches.retrieve(batch_id)
+        tmp_path = output_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    f.write(self.client.files.content(file_id).text)
+        os.replace(tmp_path, output_path)
+
+
+def fake_completion(body: dict) -> str:
+    """
+    Offline stand-in for the model: categorize requests get the first domain
+    named in the excerpt, summarize requests the opening words of the text.
+    """
+    system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+    if system == CATEGORIZE_SYSTEM_PROMPT:
+        text = user.split("Text: ", 1)[-1].lower()
+        matches = [domain for domain in DOMAINS if domain.lower() in text]
+        return matches[0] if matches else "Others/Unidentified"
+    text = user.removeprefix("Text:\n").removesuffix("\n\nSummary:")
+    return " ".join(text.split()[: body.get("max_tokens") or 100])
+
+
+class LocalBatchBackend:
+    """
+    File-based stand-in for the Batch API, for testing the whole cycle without
+    network access. A batch is a directory holding the input file; once
+    completion_seconds have passed since submission the first poll answers
+    every request with responder and writes the output file in the Batch API
+    format, with estimated token usage. A request the responder raises on gets
+    an error record, as a failed request of a real batch does.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: Path = BATCH_DIR / "local",
+        responder=fake_completion,
+        completion_seconds: float = 0.0,
+    ):
+        self.directory = Path(directory)
+        self.responder = responder
+        self.completion_seconds = completion_seconds
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:16]}"
+        batch_dir = self.directory / batch_id
+        batch_dir.mkdir(parents=True)
+        shutil.copyfile(input_path, batch_dir / "input.jsonl")
+        _write_json(
+            {"status": "in_progress", "submitted_at": time.time()},
+            batch_dir / "status.json",
+        )
+        return batch_id
+
+    def _run(self, batch_dir: Path):
+        tmp_path = batch_dir / "output.tmp"
+        with open(batch_dir / "input.jsonl", "r", encoding="utf-8") as source, open(
+            tmp_path, "w", encoding="utf-8"
+        ) as output:
+            for line in source:
+                request = json.loads(line)
+                body = request["body"]
+                try:
+                    content = self.responder(body)
+                except Exception as e:
+                    error = {"message": str(e), "type": "server_error"}
+                    record = {
+                        "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 500, "body": {"error": error}},
+                        "error": None,
+                    }
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    continue
+                response = {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": estimate_tokens(body["messages"]),
+                        "completion_tokens": len(content) // 4,
+                    },
+                }
+                record = {
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": response},
+                    "error": None,
+                }
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, batch_dir / "output.jsonl")
+
+    def poll(self, batch_id: str) -> str:
+        batch_dir = self.directory / batch_id
+        status = _read_json(batch_dir / "status.json")
+        if status["status"] == "in_progress":
+            if time.time() - status["submitted_at"] >= self.completion_seconds:
+                self._run(batch_dir)
+                status["status"] = "completed"
+                _write_json(status, batch_dir / "status.json")
+        return status["status"]
+
+    def fetch(self, batch_id: str, output_path: Path):
+        shutil.copyfile(self.directory / batch_id / "output.jsonl", output_path)
+
+
+def get_backend(name: str = BATCH_BACKEND):
+    if name == "openai":
+        return OpenAIBatchBackend()
+    if name == "local":
+        return LocalBatchBackend()
+    raise ValueError(f"Unknown batch backend: {name}")
+
+
+def _iter_raw_texts(raw_dir: Path):
+    for file in sorted(raw_dir.rglob("*.txt")):
+        with open(file, "r", encoding="utf-8") as f:
+            yield str(file.relative_to(raw_dir)), f.read()
+
+
+def prepare(
+    raw_dir: Path,
+    batch_dir: Path,
+    index: ProcessedIndex,
+    journal: RunJournal | None = None,
+) -> dict:
+    """
+    Writes the categorize and summarize requests of every document without a
+    current summary into one Batch-API JSONL file per step. Steps already in
+    the journal (from an interrupted synchronous run) are not requested again.
+    In map_reduce mode, documents longer than TRUNCATE_WORDS are left to the
+    synchronous path, which splits them into sections. Returns the new batch
+    state.
+    """
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    documents, requests, skipped_long = {}, dict.fromkeys(STEPS, 0), 0
+    files = {
+        step: open(batch_dir / f"{step}.jsonl", "w", encoding="utf-8")
+        for step in STEPS
+    }
+    try:
+        for relative_path, content in _iter_raw_texts(raw_dir):
+            celex_filename = Path(relative_path).name
+            raw_hash = content_hash(content)
+            if index.is_processed(celex_filename, raw_hash):
+                continue
+            sanitized = sanitize_text(content)
+            long = len(sanitized.split()) > TRUNCATE_WORDS
+            if SUMMARY_MODE == "map_reduce" and long:
+                skipped_long += 1
+                continue
+
+            celex = Path(relative_path).stem
+            sanitized_hash = content_hash(sanitized)
+            entry = journal.get(celex_filename) if journal else {}
+            if entry.get("raw_hash") != raw_hash:
+                entry = {}
+            if "category" not in entry:
+                files["categorize"].write(
+                    batch_line(celex, build_categorize_request(content)) + "\n"
+                )
+                requests["categorize"] += 1
+            if entry.get("sanitized_hash") != sanitized_hash or "summary" not in entry:
+                files["summarize"].write(
+                    batch_line(celex, build_summary_request(sanitized)) + "\n"
+                )
+                requests["summarize"] += 1
+            documents[celex] = {
+                "relative_path": relative_path,
+                "raw_hash": raw_hash,
+                "sanitized_hash": sanitized_hash,
+            }
+    finally:
+        for f in files.values():
+            f.close()
+
+    if skipped_long:
+        print(f"📏 {skipped_long} long documents left for map-reduce summarization")
+    return {
+        "documents": documents,
+        "batches": {
+            step: {"input": f"{step}.jsonl", "requests": requests[step]}
+            for step in STEPS
+        },
+    }
+
+
+def submit(backend, batch_dir: Path, state: dict) -> dict:
+    state["backend"] = backend.name
+    state["submitted_at"] = time.time()
+    for step, batch in state["batches"].items():
+        if batch["requests"]:
+            batch["id"] = backend.submit(batch_dir / batch["input"])
+            batch["status"] = "submitted"
+            print(
+                f"📤 Submitted {batch['requests']} {step} requests as {batch['id']}"
+            )
+    _write_json(state, batch_dir / STATE_NAME)
+    return state
+
+
+def poll(backend, batch_dir: Path, state: dict) -> bool:
+    """Refreshes the status of every batch, returns True once all have ended."""
+    for batch in state["batches"].values():
+        if batch.get("id") and batch["status"] not in TERMINAL_STATUSES:
+            batch["status"] = backend.poll(batch["id"])
+    _write_json(state, batch_dir / STATE_NAME)
+    return all(
+        batch["status"] in TERMINAL_STATUSES
+        for batch in state["batches"].values()
+        if batch.get("id")
+    )
+
+
+def _read_results(path: Path) -> tuple[dict[str, str], dict[str, int]]:
+    results, usage = {}, {"input_tokens": 0, "output_tokens": 0, "failed": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                usage["failed"] += 1
+                continue
+            body = response["body"]
+            results[record["custom_id"]] = body["choices"][0]["message"]["content"]
+            usage["input_tokens"] += body["usage"]["prompt_tokens"]
+            usage["output_tokens"] += body["usage"]["completion_tokens"]
+    return results, usage
+
+
+def ingest(
+    backend,
+    batch_dir: Path,
+    state: dict,
+    index: ProcessedIndex,
+    summary_dir: Path = SUMMARY_DIR,
+    journal: RunJournal | None = None,
+) -> dict:
+    """
+    Downloads the results of finished batches, journals every category and
+    summary, and writes a summary to summary_dir (recording it in the index)
+    for each document that has both. Documents whose requests failed are left
+    pending for the next backfill. Returns token usage and counts.
+    """
+    results, totals = {}, {"input_tokens": 0, "output_tokens": 0, "failed": 0}
+    for step, batch in state["batches"].items():
+        results[step] = {}
+        if not batch.get("id"):
+            continue
+        output_path = batch_dir / f"{step}_output.jsonl"
+        backend.fetch(batch["id"], output_path)
+        results[step], usage = _read_results(output_path)
+        for key, value in usage.items():
+            totals[key] += value
+
+    written = 0
+    for celex, document in state["documents"].items():
+        celex_filename = Path(document["relative_path"]).name
+        entry = journal.get(celex_filename) if journal else {}
+        if entry.get("raw_hash") != document["raw_hash"]:
+            entry = {}
+
+        category = entry.get("category")
+        if celex in results["categorize"]:
+            category = parse_category(results["categorize"][celex].strip())
+            if journal:
+                journal.record(
+                    celex_filename,
+                    "categorize",
+                    raw_hash=document["raw_hash"],
+                    category=category,
+                )
+        summary = entry.get("summary")
+        if entry.get("sanitized_hash") != document["sanitized_hash"]:
+            summary = None
+        if celex in results["summarize"]:
+            summary = results["summarize"][celex].strip()
+            if journal:
+                journal.record(
+                    celex_filename,
+                    "summarize",
+                    raw_hash=document["raw_hash"],
+                    sanitized_hash=document["sanitized_hash"],
+                    summary=summary,
+                )
+        if category is None or summary is None:
+            continue
+
+        summary_path = write_summary(
+            summary_dir, category, document["relative_path"], summary
+        )
+        index.add(celex_filename, category, document["raw_hash"], summary_path)
+        written += 1
+    index.save()
+
+    totals["documents"] = len(state["documents"])
+    totals["written"] = written
+    totals["requests"] = sum(batch["requests"] for batch in state["batches"].values())
+    totals["seconds"] = time.time() - state["submitted_at"]
+    return totals
+
+
+def format_report(totals: dict) -> str:
+    """Batch throughput and cost next to the synchronous path's for the same work."""
+    sync_cost = (
+        totals["input_tokens"] * LLM_INPUT_PRICE_PER_MTOK
+        + totals["output_tokens"] * LLM_OUTPUT_PRICE_PER_MTOK
+    ) / 1e6
+    # The synchronous path is bound by the configured RPM / TPM budget
+    sync_minutes = max(
+        totals["requests"] / LLM_REQUESTS_PER_MINUTE,
+        (totals["input_tokens"] + totals["output_tokens"]) / LLM_TOKENS_PER_MINUTE,
+    )
+    hours = totals["seconds"] / 3600
+    per_hour = totals["written"] / hours if hours else 0.0
+    return "\n".join(
+        [
+            f"💾 Wrote {totals['written']} of {totals['documents']} summaries "
+            f"({totals['requests']} requests, {totals['failed']} failed)",
+            f"🔢 {totals['input_tokens']} input, "
+            f"{totals['output_tokens']} output tokens",
+            f"⏱️ Batch: {totals['seconds'] / 60:.1f} min from submission "
+            f"({per_hour:.0f} documents/hour); synchronous: at least "
+            f"{sync_minutes:.1f} min at {LLM_REQUESTS_PER_MINUTE} RPM / "
+            f"{LLM_TOKENS_PER_MINUTE} TPM",
+            f"💰 Batch: ${sync_cost * BATCH_DISCOUNT:.4f}, synchronous: "
+            f"${sync_cost:.4f}",
+        ]
+    )
+
+
+def backfill(
+    command: str,
+    backend,
+    raw_dir: Path = RAW_DIR,
+    summary_dir: Path = SUMMARY_DIR,
+    batch_dir: Path = BATCH_DIR,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+):
+    """
+    submit: write and submit the request files. status: poll once.
+    ingest: poll once and, if every batch has ended, write the summaries.
+    run: all of the above, waiting for the batches in between.
+    """
+    state = _read_json(batch_dir / STATE_NAME)
+    index = ProcessedIndex.load(summary_dir)
+    journal = RunJournal.load()
+    try:
+        if state is not None and state["backend"] != backend.name:
+            print(
+                f"⚠️ Pending batches were submitted to the "
+                f"{state['backend']} backend"
+            )
+            return
+        if command in ("submit", "run"):
+            if state is not None:
+                if command == "submit":
+                    print(
+                        f"⚠️ Batches from {batch_dir / STATE_NAME} not ingested yet"
+                    )
+                    return
+            else:
+                state = prepare(raw_dir, batch_dir, index, journal)
+                if not state["documents"]:
+                    print("✅ Nothing to backfill")
+                    return
+                state = submit(backend, batch_dir, state)
+            if command == "submit":
+                return
+        if state is None:
+            print("⚠️ No submitted batches")
+            return
+
+        done = poll(backend, batch_dir, state)
+        while command == "run" and not done:
+            time.sleep(poll_interval)
+            done = poll(backend, batch_dir, state)
+        for step, batch in state["batches"].items():
+            if batch.get("id"):
+                print(f"📦 {step}: {batch['id']} {batch['status']}")
+        if command == "status" or not done:
+            return
+
+        totals = ingest(backend, batch_dir, state, index, summary_dir, journal)
+        print(format_report(totals))
+        (batch_dir / STATE_NAME).unlink()
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill categories and summaries through the Batch API"
+    )
+    parser.add_argument("command", choices=["submit", "status", "ingest", "run"])
+    parser.add_argument(
+        "--backend", choices=["openai", "local"], default=BATCH_BACKEND
+    )
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    backfill(args.command, get_backend(args.backend), poll_interval=args.poll_interval)
@@ -0,0 +1,98 @@
+# scripts/bench_category_router.py
+
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import DATA_DIR, VECTORSTORE_DIR, CATEGORY_ROUTER_MIN_MARGIN
+from scripts.category_router import CentroidRouter
+from scripts.embedding_cache import get_embedding_function
+from rag_interface import detect_category
+
+QUESTIONS_JSONL = DATA_DIR / "fixtures" / "category_questions.jsonl"
+MARGINS = [0.0, 0.01, 0.02, 0.05, 0.1]
+
+
+def load_questions(path: Path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_benchmark(questions_path: Path, persist_dir: Path, use_llm: bool):
+    questions = load_questions(questions_path)
+    router = CentroidRouter(persist_dir, min_margin=0.0)
+    if not router.categories:
+        print(f"❌ No category centroids in {persist_dir}, run build_vector_db first")
+        return
+    embedding = get_embedding_function()
+
+    rows = []
+    embed_time, centroid_time, llm_time = 0.0, 0.0, 0.0
+    for item in questions:
+        start = time.perf_counter()
+        vector = embedding.embed_query(item["question"])
+        embed_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = router.scores(vector)
+        centroid_time += time.perf_counter() - start
+        margin = scores[0][1] - scores[1][1] if len(scores) > 1 else 1.0
+
+        llm_category = None
+        if use_llm:
+            start = time.perf_counter()
+            llm_category = detect_category(item["question"])
+            llm_time += time.perf_counter() - start
+
+        rows.append((item["category"], scores[0][0], margin, llm_category))
+
+    n = len(rows)
+    print(f"📄 {n} labeled questions, {len(router.categories)} centroids")
+    centroid_correct = sum(label == predicted for label, predicted, _, _ in rows)
+    print(
+        f"   centroid  accuracy {centroid_correct / n:6.1%}  "
+        f"{1000 * centroid_time / n:7.2f} ms/question "
+        f"(+{1000 * embed_time / n:.1f} ms embedding, reused for retrieval)"
+    )
+    if not use_llm:
+        return
+
+    llm_correct = sum(label == llm for label, _, _, llm in rows)
+    print(
+        f"   llm       accuracy {llm_correct / n:6.1%}  "
+        f"{1000 * llm_time / n:7.2f} ms/question"
+    )
+
+    # Fallback strategy: centroid when the margin is high enough, LLM otherwise
+    print("🧭 Centroid with LLM fallback:")
+    for min_margin in sorted(set(MARGINS + [CATEGORY_ROUTER_MIN_MARGIN])):
+        correct, llm_calls = 0, 0
+        for label, predicted, margin, llm in rows:
+            if margin < min_margin:
+                llm_calls += 1
+                correct += label == llm
+            else:
+                correct += label == predicted
+        marker = " (configured)" if min_margin == CATEGORY_ROUTER_MIN_MARGIN else ""
+        print(
+            f"   margin {min_margin:<5} accuracy {correct / n:6.1%}  "
+            f"LLM calls {llm_calls / n:6.1%}{marker}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the centroid category router with the LLM classifier"
+    )
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_JSONL)
+    parser.add_argument("--persist-dir", type=Path, default=VECTORSTORE_DIR)
+    parser.add_argument(
+        "--no-llm", action="store_true", help="Only time and score the centroids"
+    )
+    args = parser.parse_args()
+    run_benchmark(args.questions, args.persist_dir, use_llm=not args.no_llm)
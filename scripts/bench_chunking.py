@@ -0,0 +1,177 @@
+# scripts/bench_chunking.py
+
+from difflib import SequenceMatcher
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from config import DATA_DIR, RETRIEVAL_K
+from scripts.bm25_index import celex_from_source
+from scripts.chunking import CharacterChunker, StructureChunker
+from scripts.embedding_cache import get_embedding_function
+
+# Hand-written summaries of real acts, with paraphrased questions labeled by
+# the passage of the summary that answers them
+FIXTURE_DIR = DATA_DIR / "fixtures" / "chunking"
+SUMMARIES_DIR = FIXTURE_DIR / "summaries"
+QUESTIONS_JSONL = FIXTURE_DIR / "questions.jsonl"
+KS = [1, 3, 5, 10]
+# A chunk answers a question when it contains this much of the answer passage
+MIN_ANSWER_COVERAGE = 0.5
+MIN_MATCH_WORDS = 3
+
+
+def load_corpus(root_directory: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(root_directory)): path.read_text(encoding="utf-8")
+        for path in sorted(root_directory.rglob("*.txt"))
+    }
+
+
+def load_questions(path: Path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def answer_coverage(answer: str, chunk: str) -> float:
+    """
+    Share of the answer passage's words found in the chunk, counting only runs
+    of at least MIN_MATCH_WORDS consecutive words so stray common words of an
+    unrelated chunk don't add up. Whitespace is normalized by the word split.
+    """
+    answer_words, chunk_words = answer.split(), chunk.split()
+    matcher = SequenceMatcher(None, answer_words, chunk_words, autojunk=False)
+    matched = sum(
+        block.size
+        for block in matcher.get_matching_blocks()
+        if block.size >= MIN_MATCH_WORDS
+    )
+    return matched / len(answer_words) if answer_words else 0.0
+
+
+def evaluate(
+    chunker,
+    corpus: dict[str, str],
+    questions: list[dict],
+    query_vectors: np.ndarray,
+    embedding,
+    count_tokens,
+) -> dict:
+    texts, chunk_labels = [], []
+    for source, chunks in zip(corpus, chunker.split_texts(list(corpus.values()))):
+        texts.extend(chunks)
+        chunk_labels.extend([celex_from_source(source)] * len(chunks))
+
+    vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    tokens = np.asarray(count_tokens(texts))
+
+    # Chunks of the labeled document that hold the answer passage
+    answers = np.zeros((len(questions), len(texts)), dtype=bool)
+    for i, question in enumerate(questions):
+        for j, (text, celex) in enumerate(zip(texts, chunk_labels)):
+            answers[i, j] = (
+                celex == question["celex"]
+                and answer_coverage(question["answer"], text) >= MIN_ANSWER_COVERAGE
+            )
+
+    # Top chunks per query, best first, deep enough for every k reported
+    scores = query_vectors @ vectors.T
+    top = np.argsort(-scores, axis=1)[:, : max(*KS, RETRIEVAL_K)]
+    hits = np.take_along_axis(answers, top, axis=1)
+    context_tokens = np.cumsum(tokens[top], axis=1)
+    ks = range(1, top.shape[1] + 1)
+    return {
+        "chunks": len(texts),
+        "mean_chunk_tokens": float(tokens.mean()),
+        # Answers no chunk covers, e.g. split across a chunk boundary
+        "unanswerable": int((~answers.any(axis=1)).sum()),
+        "recall": {k: float(hits[:, :k].any(axis=1).mean()) for k in ks},
+        "context_tokens": {k: float(context_tokens[:, k - 1].mean()) for k in ks},
+    }
+
+
+def run_benchmark(root_directory: Path, questions_path: Path):
+    corpus = load_corpus(root_directory)
+    if not corpus:
+        print(f"❌ No summaries found in {root_directory}")
+        return
+
+    questions = load_questions(questions_path)
+    known = {celex_from_source(source) for source in corpus}
+    questions = [q for q in questions if q["celex"] in known]
+    print(f"📋 {len(questions)} labeled questions with a summary in the corpus")
+    if not questions:
+        return
+
+    embedding = get_embedding_function()
+    structure = StructureChunker()
+    query_vectors = np.asarray(
+        embedding.embed_documents([q["question"] for q in questions]), dtype=np.float32
+    )
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True) + 1e-12
+
+    reports = {
+        "recursive 600 chars": evaluate(
+            CharacterChunker(),
+            corpus,
+            questions,
+            query_vectors,
+            embedding,
+            structure.count_tokens,
+        ),
+        f"structure {structure.chunk_tokens} tok": evaluate(
+            structure, corpus, questions, query_vectors, embedding, structure.count_tokens
+        ),
+    }
+
+    print(f"📊 {len(corpus)} summaries, {len(questions)} questions")
+    header = "".join(f"{f'R@{k}':>8}" for k in KS)
+    tokens_header = "".join(f"{f'tok@{k}':>9}" for k in KS)
+    print(
+        f"   {'chunker':<22}{'chunks':>8}{'mean tok':>10}{'split':>7}"
+        f"{header}{tokens_header}"
+    )
+    for name, report in reports.items():
+        recalls = "".join(f"{report['recall'][k]:8.1%}" for k in KS)
+        tokens = "".join(f"{report['context_tokens'][k]:9.0f}" for k in KS)
+        print(
+            f"   {name:<22}{report['chunks']:>8}{report['mean_chunk_tokens']:10.0f}"
+            f"{report['unanswerable']:>7}{recalls}{tokens}"
+        )
+
+    # Smallest k at which the structure chunker matches the baseline's recall
+    baseline, candidate = reports.values()
+    target = baseline["recall"][RETRIEVAL_K]
+    matching = [k for k, recall in candidate["recall"].items() if recall >= target]
+    if matching:
+        k = matching[0]
+        print(
+            f"🎯 Baseline recall@{RETRIEVAL_K} {target:.1%} with "
+            f"{baseline['context_tokens'][RETRIEVAL_K]:.0f} context tokens; "
+            f"structure chunks reach it at k={k} with "
+            f"{candidate['context_tokens'][k]:.0f} tokens"
+        )
+    else:
+        print(f"🎯 Structure chunks stay below the baseline recall@{RETRIEVAL_K}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare chunkers by retrieval recall@k and context tokens"
+    )
+    parser.add_argument("--root", type=Path, default=SUMMARIES_DIR)
+    parser.add_argument(
+        "--questions",
+        type=Path,
+        default=QUESTIONS_JSONL,
+        help='JSONL of {"question", "celex", "answer"}, answer quoting the summary',
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.root, args.questions)
@@ -0,0 +1,131 @@
+# scripts/bench_html_extract.py
+
+from bs4 import BeautifulSoup
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import DATA_DIR, METADATA_JSON
+from scripts.html_extract import extract_document_text
+
+FIXTURES_DIR = DATA_DIR / "fixtures" / "html"
+
+
+def legacy_html_to_text(html: str) -> str:
+    # The original BeautifulSoup extraction, kept as the baseline
+    soup = BeautifulSoup(html, "html.parser")
+    document_div = soup.find("div", id="document1")
+    document_content = []
+
+    if document_div:
+        for child in document_div.descendants:
+            if child.name == "table":
+                table_rows = []
+                for row in child.find_all("tr"):
+                    row_cells = [
+                        cell.get_text(separator=" ", strip=True)
+                        for cell in row.find_all("td")
+                    ]
+                    if row_cells:
+                        table_rows.append(" ; ".join(row_cells))
+                if table_rows:
+                    document_content.append("\n".join(table_rows))
+            elif child.name == "p":
+                paragraph = child.get_text(separator=" ", strip=True)
+                if paragraph:
+                    document_content.append(paragraph)
+    else:
+        document_content.append("No content found in the div with id 'document1'.")
+
+    return "\n\n".join(document_content)
+
+
+def record_fixtures(fixtures_dir: Path, count: int):
+    from scripts.extract_result_text import _document_url
+    from scripts.http_fetcher import HttpFetcher
+
+    with open(METADATA_JSON, "r", encoding="utf-8") as f:
+        entries = json.load(f)[:count]
+
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    by_url = {_document_url(entry): entry["celex"] for entry in entries}
+    for result, _ in HttpFetcher().iter_fetch(by_url):
+        if result.html:
+            (fixtures_dir / f"{by_url[result.url]}.html").write_text(
+                result.html, encoding="utf-8"
+            )
+            print(f"💾 Recorded {by_url[result.url]}")
+        else:
+            print(f"❌ Could not record {by_url[result.url]}: {result.error}")
+
+
+def _time(fn, pages: list[str], repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    outputs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [fn(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def run_benchmark(fixtures_dir: Path, repeat: int):
+    files = sorted(fixtures_dir.glob("*.html"))
+    if not files:
+        print(f"❌ No fixtures in {fixtures_dir}, record some with --record N")
+        return
+
+    pages = [f.read_text(encoding="utf-8") for f in files]
+    megabytes = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+
+    legacy_time, legacy_outputs = _time(legacy_html_to_text, pages, repeat)
+    fast_time, fast_outputs = _time(extract_document_text, pages, repeat)
+
+    print(f"📄 {len(pages)} pages, {megabytes:.1f} MB (best of {repeat})")
+    for name, elapsed in [("BeautifulSoup", legacy_time), ("lxml", fast_time)]:
+        print(
+            f"   {name:<14} {elapsed:8.3f}s  {len(pages) / elapsed:8.1f} pages/s  "
+            f"{megabytes / elapsed:6.1f} MB/s"
+        )
+    print(f"⚡ Speedup: {legacy_time / fast_time:.1f}x")
+
+    # The new output should be the old one minus repeated nested content
+    identical, deduplicated, different = 0, 0, []
+    old_words, new_words = 0, 0
+    for file, old, new in zip(files, legacy_outputs, fast_outputs):
+        old_words += len(old.split())
+        new_words += len(new.split())
+        if old == new:
+            identical += 1
+        elif set(new.split()) <= set(old.split()):
+            deduplicated += 1
+        else:
+            different.append(file.name)
+
+    print(
+        f"🔎 Output: {identical} identical, {deduplicated} with duplicates removed, "
+        f"{len(different)} different ({old_words} → {new_words} words)"
+    )
+    for name in different:
+        print(f"   ⚠️ {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare HTML-to-text extraction engines on saved EUR-Lex pages"
+    )
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--record", type=int, metavar="N", help="Download N pages as fixtures first"
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixtures, args.record)
+    run_benchmark(args.fixtures, args.repeat)
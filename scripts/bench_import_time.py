@@ -0,0 +1,90 @@
+# scripts/bench_import_time.py
+
+from pathlib import Path
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Modules whose import is on the question-answering startup path. Importing
+# gui outside `streamlit run` executes the page in bare mode, which is exactly
+# the per-rerun script cost minus the Streamlit server
+MODULES = ["rag_interface", "gui"]
+# Cold-start target for each module, in seconds
+IMPORT_BUDGET_S = 1.5
+
+
+def measure(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Imports module in a fresh interpreter under -X importtime. Returns the
+    module's cumulative import time in seconds and (seconds, name) for each
+    module it imports directly.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(ROOT_DIR), os.environ.get("PYTHONPATH")])
+            ),
+        },
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    total, direct = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        seconds = int(cumulative) / 1e6
+        # Nested imports are indented two spaces per level below their importer
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            direct.append((seconds, name.strip()))
+        elif level == 0 and name.strip() == module:
+            total = seconds
+    return total, direct
+
+
+def run_benchmark(modules: list[str], runs: int, top: int, budget: float) -> bool:
+    within_budget = True
+    for module in modules:
+        totals, slowest = [], {}
+        for _ in range(runs):
+            total, direct = measure(module)
+            totals.append(total)
+            for seconds, name in direct:
+                slowest[name] = max(slowest.get(name, 0.0), seconds)
+
+        median = statistics.median(totals)
+        status = "✅" if median <= budget else "❌"
+        within_budget &= median <= budget
+        print(
+            f"{status} import {module}: first {totals[0]:.2f}s, median {median:.2f}s "
+            f"over {runs} runs (budget {budget:.2f}s)"
+        )
+        heaviest = sorted(slowest.items(), key=lambda item: item[1], reverse=True)
+        for name, seconds in heaviest[:top]:
+            print(f"   {seconds:6.3f}s  {name}")
+    return within_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure cold import time of the query path with -X importtime"
+    )
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_S)
+    args = parser.parse_args()
+
+    ok = run_benchmark(args.modules, args.runs, args.top, args.budget)
+    sys.exit(0 if ok else 1)
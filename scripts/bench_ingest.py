@@ -0,0 +1,82 @@
+# scripts/bench_ingest.py
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from config import SUMMARY_DIR
+from scripts.build_vector_db import build_vector_db
+from scripts.ingest import IngestionEngine
+
+# (batch size, embedding workers) pairs, from one small request at a time up
+CONFIGURATIONS = [(16, 1), (256, 1), (256, 4), (256, 8), (512, 8)]
+
+
+class SlowFakeEmbeddings(Embeddings):
+    """
+    Deterministic local embedder that sleeps like an embedding API would: a
+    fixed round trip per request plus a little per text.
+    """
+
+    def __init__(self, size: int, request_latency: float, text_latency: float):
+        self.fake = DeterministicFakeEmbedding(size=size)
+        self.request_latency = request_latency
+        self.text_latency = text_latency
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.request_latency + self.text_latency * len(texts))
+        return self.fake.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def run_benchmark(
+    root_directory: Path, size: int, request_latency: float, text_latency: float
+):
+    results = []
+    for batch_size, workers in CONFIGURATIONS:
+        engine = IngestionEngine(
+            SlowFakeEmbeddings(size, request_latency, text_latency),
+            batch_size=batch_size,
+            workers=workers,
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = build_vector_db(
+                root_directory,
+                Path(tmp),
+                incremental=False,
+                engine=engine,
+                fulltext=False,
+            )
+        results.append((batch_size, workers, counts))
+
+    print(
+        f"📊 Fake embedder: {size} dims, {request_latency * 1000:.0f} ms/request "
+        f"+ {text_latency * 1000:.1f} ms/text"
+    )
+    print(f"   {'batch':>6}{'workers':>9}{'chunks':>8}{'time':>9}{'chunks/s':>10}")
+    for batch_size, workers, counts in results:
+        print(
+            f"   {batch_size:>6}{workers:>9}{counts['chunks']:>8}"
+            f"{counts['seconds']:8.1f}s{counts['chunks_per_second']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure ingestion throughput with a local fake embedder"
+    )
+    parser.add_argument("--root", type=Path, default=SUMMARY_DIR)
+    parser.add_argument("--size", type=int, default=1536)
+    parser.add_argument("--request-latency", type=float, default=0.2)
+    parser.add_argument("--text-latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    run_benchmark(args.root, args.size, args.request_latency, args.text_latency)
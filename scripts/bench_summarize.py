@@ -0,0 +1,120 @@
+# scripts/bench_summarize.py
+
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import RAW_DIR, TRUNCATE_WORDS
+from scripts.llm_engine import LLMEngine
+from scripts.sanitize import sanitize_text
+from scripts.section_cache import SectionSummaryCache
+from scripts.summarize import _section_chunker, split_sections, summarize_document
+from scripts.tracing import configure_tracing, span
+
+
+def load_documents(raw_directory: Path, n: int) -> dict[str, str]:
+    # The longest documents are the ones truncation hurts
+    files = sorted(
+        raw_directory.rglob("*.txt"), key=lambda path: path.stat().st_size, reverse=True
+    )
+    return {
+        path.name: sanitize_text(path.read_text(encoding="utf-8")) for path in files[:n]
+    }
+
+
+def coverage(documents: dict[str, str], mode: str) -> float:
+    """Share of the documents' tokens that the summarizer reads."""
+    chunker = _section_chunker()
+    read = total = 0
+    for text in documents.values():
+        words = text.split()
+        if mode == "map_reduce" and len(words) > TRUNCATE_WORDS:
+            read += sum(chunker.count_tokens(split_sections(text)))
+        else:
+            read += chunker.count_tokens([" ".join(words[:TRUNCATE_WORDS])])[0]
+        total += chunker.count_tokens([text])[0]
+    return read / total if total else 0.0
+
+
+async def _summarize_all(
+    documents: dict[str, str], mode: str, cache: SectionSummaryCache | None
+) -> float:
+    engine = LLMEngine()
+
+    async def summarize(text: str):
+        # Usage lands on the innermost span, so each call is counted once
+        with span("summarize", items=1):
+            return await summarize_document(engine, text, cache, mode)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(summarize(text) for text in documents.values()))
+        return time.perf_counter() - start
+    finally:
+        await engine.close()
+
+
+def run_mode(
+    documents: dict[str, str], mode: str, cache: SectionSummaryCache | None = None
+) -> dict[str, float]:
+    tracer = configure_tracing(path=None)
+    seconds = asyncio.run(_summarize_all(documents, mode, cache))
+    rows = tracer.summary()
+    return {
+        "seconds": seconds,
+        "input_tokens": sum(row["input_tokens"] for row in rows),
+        "output_tokens": sum(row["output_tokens"] for row in rows),
+        "cache_hits": sum(row["cache_hits"] for row in rows),
+        # Merge calls for documents whose section summaries overflow one reduce
+        "merge_calls": sum(
+            row["items"] for row in rows if row["stage"] == "summarize_merge"
+        ),
+        "coverage": coverage(documents, mode),
+    }
+
+
+def run_benchmark(raw_directory: Path, n_documents: int):
+    documents = load_documents(raw_directory, n_documents)
+    if not documents:
+        print(f"❌ No raw documents found in {raw_directory}")
+        return
+    words = sum(len(text.split()) for text in documents.values())
+    print(f"📄 {len(documents)} longest documents, {words} words in total")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SectionSummaryCache(Path(tmp) / "sections.sqlite")
+        results = {
+            "truncate": run_mode(documents, "truncate"),
+            "map_reduce": run_mode(documents, "map_reduce", cache),
+            # Same sections again: only the reduce calls are paid for
+            "map_reduce (cached)": run_mode(documents, "map_reduce", cache),
+        }
+        cache.close()
+
+    print(
+        f"   {'mode':<22}{'wall':>9}{'in tok':>10}{'out tok':>9}"
+        f"{'coverage':>10}{'cache hits':>12}{'merges':>8}"
+    )
+    for mode, result in results.items():
+        print(
+            f"   {mode:<22}{result['seconds']:8.1f}s{result['input_tokens']:>10}"
+            f"{result['output_tokens']:>9}{result['coverage']:10.0%}"
+            f"{result['cache_hits']:>12}{result['merge_calls']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare truncated and map-reduce summarization"
+    )
+    parser.add_argument("--root", type=Path, default=RAW_DIR)
+    parser.add_argument("--documents", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.root, args.documents)
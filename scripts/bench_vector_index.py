@@ -0,0 +1,172 @@
+# scripts/bench_vector_index.py
+
+from pathlib import Path
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import VECTORSTORE_DIR
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _key(doc) -> str:
+    return f"{doc.metadata.get('source')}::{doc.page_content[:80]}"
+
+
+def run_child(backend: str, index_dir: Path, queries_path: Path, k: int):
+    """Loads one backend in a fresh process and reports timings as JSON."""
+    import numpy as np
+
+    queries = json.loads(queries_path.read_text(encoding="utf-8"))
+    baseline_rss = _peak_rss_mb()
+
+    start = time.perf_counter()
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+
+        import_time = time.perf_counter() - start
+        store = Chroma(persist_directory=str(index_dir))
+    else:
+        from scripts.numpy_index import NumpyVectorIndex
+
+        import_time = time.perf_counter() - start
+        store = NumpyVectorIndex(index_dir, embeddings=None)
+    open_time = time.perf_counter() - start - import_time
+
+    latencies, results = [], []
+    for query in queries:
+        filter = {"category": query["category"]} if query["category"] else None
+        query_start = time.perf_counter()
+        docs = store.similarity_search_by_vector(query["vector"], k=k, filter=filter)
+        latencies.append(time.perf_counter() - query_start)
+        results.append([_key(doc) for doc in docs])
+
+    print(
+        json.dumps(
+            {
+                "import_s": import_time,
+                "open_s": open_time,
+                "first_query_ms": 1000 * latencies[0],
+                "p50_ms": 1000 * float(np.percentile(latencies[1:] or latencies, 50)),
+                "p95_ms": 1000 * float(np.percentile(latencies[1:] or latencies, 95)),
+                "rss_mb": _peak_rss_mb() - baseline_rss,
+                "results": results,
+            }
+        )
+    )
+
+
+def _spawn(backend: str, index_dir: Path, queries_path: Path, k: int) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--child",
+            backend,
+            "--index-dir",
+            str(index_dir),
+            "--queries-file",
+            str(queries_path),
+            "--k",
+            str(k),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(persist_dir: Path, n_queries: int, k: int, ivf_lists: int):
+    import numpy as np
+    from langchain_chroma import Chroma
+    from scripts.numpy_index import NUMPY_INDEX_DIR_NAME, build_numpy_index
+
+    db = Chroma(persist_directory=str(persist_dir))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        variants = {
+            "numpy float32": (tmp / "f32", "float32", 0),
+            "numpy int8": (tmp / "i8", "int8", 0),
+            f"numpy IVF{ivf_lists}": (tmp / "ivf", "float32", ivf_lists),
+        }
+        for name, (directory, dtype, lists) in variants.items():
+            start = time.perf_counter()
+            rows = build_numpy_index(db, directory, dtype=dtype, ivf_lists=lists)
+            elapsed = time.perf_counter() - start
+            print(f"🧮 Built {name} over {rows} rows in {elapsed:.1f}s")
+        if not rows:
+            print(f"❌ The vector store in {persist_dir} is empty")
+            return
+
+        # Stored chunk vectors serve as queries, half of them category-filtered
+        exact_dir = tmp / "f32" / NUMPY_INDEX_DIR_NAME
+        vectors = np.load(exact_dir / "vectors.npy", mmap_mode="r")
+        categories = np.load(exact_dir / "doc_categories.npy")
+        with open(exact_dir / "chunks.json", "r", encoding="utf-8") as f:
+            category_names = json.load(f)["categories"]
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)
+        queries = [
+            {
+                "vector": vectors[row].tolist(),
+                "category": category_names[categories[row]] if i % 2 else None,
+            }
+            for i, row in enumerate(sample)
+        ]
+        queries_path = tmp / "queries.json"
+        queries_path.write_text(json.dumps(queries), encoding="utf-8")
+
+        reports = {"chroma": _spawn("chroma", persist_dir, queries_path, k)}
+        for name, (directory, _, _) in variants.items():
+            reports[name] = _spawn(
+                "numpy", directory / NUMPY_INDEX_DIR_NAME, queries_path, k
+            )
+
+    truth = reports["numpy float32"]["results"]
+    print(f"📊 {len(queries)} queries, k={k} (half filtered by category)")
+    print(
+        f"   {'backend':<16}{'import':>8}{'open':>8}{'1st q':>9}"
+        f"{'p50':>9}{'p95':>9}{'RSS':>9}{'recall':>8}"
+    )
+    for name, report in reports.items():
+        overlap = [
+            len(set(found) & set(expected)) / max(len(expected), 1)
+            for found, expected in zip(report["results"], truth)
+        ]
+        print(
+            f"   {name:<16}{report['import_s']:7.2f}s{report['open_s']:7.2f}s"
+            f"{report['first_query_ms']:7.1f}ms{report['p50_ms']:7.2f}ms"
+            f"{report['p95_ms']:7.2f}ms{report['rss_mb']:6.0f} MB"
+            f"{sum(overlap) / len(overlap):8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare Chroma with the numpy vector index (load, latency, RSS)"
+    )
+    parser.add_argument("--persist-dir", type=Path, default=VECTORSTORE_DIR)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ivf-lists", type=int, default=64)
+    parser.add_argument("--child", choices=["chroma", "numpy"], help=argparse.SUPPRESS)
+    parser.add_argument("--index-dir", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--queries-file", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.index_dir, args.queries_file, args.k)
+    else:
+        run_benchmark(args.persist_dir, args.queries, args.k, args.ivf_lists)
@@ -0,0 +1,246 @@
+# scripts/bm25_index.py
+
+from collections import Counter
+from pathlib import Path
+from langchain_core.documents import Document
+from config import VECTORSTORE_DIR, BM25_K1, BM25_B
+import json
+import numpy as np
+import os
+import re
+import shutil
+
+# Inverted index over the chunks of the vector store, kept next to it
+BM25_DIR_NAME = "bm25"
+BM25_BATCH_SIZE = 5000
+
+# Words, keeping document numbers (2017/2063, 1907/2006, the 2014/65 of
+# 2014/65/EU) and CELEX numbers (32017R2063) as one token
+TOKEN_RE = re.compile(r"\w+(?:/\w+)?")
+CELEX_RE = re.compile(r"\b([1-9])(\d{4})([A-Z]{1,2})(\d{4})\b")
+# A document number only counts where it cites an act: "Regulation (EU)
+# 2017/2063", "Directive 2014/65/EU", "Regulation (EC) No 1907/2006". Bare
+# years, year ranges and article numbers are left to the ranked search.
+DOCUMENT_NUMBER_RE = re.compile(
+    r"\b(?:Regulation|Directive|Decision)s?\s+"
+    r"(?:\((?:EU|EC|EEC|Euratom|CFSP)(?:,\s*Euratom)?\)\s+)?"
+    r"(?:No\.?\s+)?"
+    r"((?:19|20)\d{2}/\d{1,4}|\d{1,4}/(?:19|20)\d{2})\b",
+    re.IGNORECASE,
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def celex_from_source(source: str) -> str:
+    # Summaries are saved as <category>/<celex>.txt
+    return Path(source).stem
+
+
+def extract_ids(text: str) -> list[str]:
+    """
+    Finds CELEX numbers and cited document numbers ("Regulation (EU)
+    2017/2063") in a question and returns them as index terms. A CELEX number
+    also yields its document number, so 32017R2063 matches chunks that only
+    cite 2017/2063.
+    """
+    terms = []
+    for match in CELEX_RE.finditer(text.upper()):
+        terms.append(f"celex:{match.group(0).lower()}")
+        terms.append(f"{match.group(2)}/{int(match.group(4))}")
+    terms.extend(DOCUMENT_NUMBER_RE.findall(text))
+    return list(dict.fromkeys(terms))
+
+
+def build_bm25_index(db, persist_dir: Path = VECTORSTORE_DIR) -> int:
+    """
+    Builds the inverted index from every chunk in the Chroma store. Postings
+    are stored as flat numpy arrays sorted by term, chunk texts as one UTF-8
+    blob with offsets, so the index can be memory-mapped on load. Each chunk
+    also gets a celex:<id> term for its source document. Returns the number of
+    indexed chunks.
+    """
+    ids, sources, categories = [], [], []
+    texts = bytearray()
+    text_offsets = [0]
+    term_ids, doc_rows, term_freqs, doc_lengths = [], [], [], []
+    vocab = {}
+
+    offset = 0
+    while True:
+        batch = db.get(
+            include=["documents", "metadatas"],
+            limit=BM25_BATCH_SIZE,
+            offset=offset,
+        )
+        if not batch["ids"]:
+            break
+        for chunk_id, text, metadata in zip(
+            batch["ids"], batch["documents"], batch["metadatas"]
+        ):
+            row = len(ids)
+            ids.append(chunk_id)
+            sources.append(metadata["source"])
+            categories.append(metadata["category"])
+            texts += text.encode("utf-8")
+            text_offsets.append(len(texts))
+
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            counts = Counter(tokens)
+            counts[f"celex:{celex_from_source(metadata['source']).lower()}"] += 1
+            for term, tf in counts.items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_rows.append(row)
+                term_freqs.append(tf)
+        offset += len(batch["ids"])
+
+    index_dir = Path(persist_dir) / BM25_DIR_NAME
+    if not ids:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        return 0
+
+    tmp_dir = index_dir.with_name(f"{BM25_DIR_NAME}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    term_ids = np.asarray(term_ids, dtype=np.int32)
+    order = np.argsort(term_ids, kind="stable")
+    term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=term_offsets[1:])
+
+    postings_rows = np.asarray(doc_rows, dtype=np.int32)[order]
+    postings_tf = np.asarray(term_freqs, dtype=np.float32)[order]
+    np.save(tmp_dir / "postings_rows.npy", postings_rows)
+    np.save(tmp_dir / "postings_tf.npy", postings_tf)
+    np.save(tmp_dir / "term_offsets.npy", term_offsets)
+    np.save(tmp_dir / "doc_lengths.npy", np.asarray(doc_lengths, dtype=np.float32))
+    np.save(tmp_dir / "text_offsets.npy", np.asarray(text_offsets, dtype=np.int64))
+    (tmp_dir / "texts.bin").write_bytes(bytes(texts))
+
+    category_names = sorted(set(categories))
+    category_codes = {name: i for i, name in enumerate(category_names)}
+    np.save(
+        tmp_dir / "doc_categories.npy",
+        np.asarray([category_codes[c] for c in categories], dtype=np.int16),
+    )
+    with open(tmp_dir / "chunks.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {"ids": ids, "sources": sources, "categories": category_names},
+            f,
+            ensure_ascii=False,
+        )
+    with open(tmp_dir / "vocab.json", "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+
+    # Swap the new index in; readers only ever see a complete directory
+    old_dir = index_dir.with_name(f"{BM25_DIR_NAME}.old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if index_dir.exists():
+        os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(ids)
+
+
+class BM25Index:
+    """
+    Read-only BM25 index built by build_bm25_index. The arrays are memory
+    mapped, so loading is cheap and only the postings a query touches are read.
+    """
+
+    def __init__(self, index_dir: Path, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings_rows = np.load(index_dir / "postings_rows.npy", mmap_mode="r")
+        self.postings_tf = np.load(index_dir / "postings_tf.npy", mmap_mode="r")
+        self.term_offsets = np.load(index_dir / "term_offsets.npy", mmap_mode="r")
+        self.doc_lengths = np.load(index_dir / "doc_lengths.npy", mmap_mode="r")
+        self.text_offsets = np.load(index_dir / "text_offsets.npy", mmap_mode="r")
+        self.doc_categories = np.load(index_dir / "doc_categories.npy", mmap_mode="r")
+        self.texts = np.memmap(index_dir / "texts.bin", dtype=np.uint8, mode="r")
+        with open(index_dir / "chunks.json", "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        self.ids = chunks["ids"]
+        self.sources = chunks["sources"]
+        self.categories = chunks["categories"]
+        with open(index_dir / "vocab.json", "r", encoding="utf-8") as f:
+            self.vocab = json.load(f)
+
+        self.num_docs = len(self.ids)
+        self.avg_length = float(np.mean(self.doc_lengths)) if self.num_docs else 0.0
+
+    @classmethod
+    def load(cls, persist_dir: Path = VECTORSTORE_DIR) -> "BM25Index | None":
+        index_dir = Path(persist_dir) / BM25_DIR_NAME
+        if not (index_dir / "vocab.json").exists():
+            return None
+        return cls(index_dir)
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def document(self, row: int) -> Document:
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return Document(
+            page_content=bytes(self.texts[start:end]).decode("utf-8"),
+            metadata={
+                "category": self.categories[self.doc_categories[row]],
+                "source": self.sources[row],
+            },
+        )
+
+    def _score(
+        self, terms: list[str], category: str | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Sparse accumulation over the postings of the query terms only
+        rows_parts, score_parts = [], []
+        for term in dict.fromkeys(terms):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            rows = np.asarray(self.postings_rows[start:end])
+            tf = np.asarray(self.postings_tf[start:end])
+            df = end - start
+            idf = np.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+            length_ratio = self.doc_lengths[rows] / self.avg_length
+            norm = self.k1 * (1 - self.b + self.b * length_ratio)
+            rows_parts.append(rows)
+            score_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not rows_parts:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        rows, inverse = np.unique(np.concatenate(rows_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        if category is not None:
+            if category not in self.categories:
+                return rows[:0], scores[:0]
+            keep = self.doc_categories[rows] == self.categories.index(category)
+            rows, scores = rows[keep], scores[keep]
+        return rows, scores
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int) -> list[int]:
+        if len(rows) > k:
+            best = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[best], scores[best]
+        return [int(rows[i]) for i in np.argsort(-scores, kind="stable")]
+
+    def search(self, query: str, k: int, category: str | None = None) -> list[Document]:
+        rows, scores = self._score(tokenize(query), category)
+        return [self.document(row) for row in self._top(rows, scores, k)]
+
+    def lookup_ids(self, query: str, k: int) -> list[Document]:
+        """
+        Returns the chunks citing the CELEX or document numbers in query, best
+        first, without embedding anything. Empty when the query has no known id.
+        """
+        terms = extract_ids(query)
+        if not terms:
+            return []
+        rows, scores = self._score(terms, None)
+        return [self.document(row) for row in self._top(rows, scores, k)]
+
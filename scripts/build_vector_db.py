@@ -1,55 +1,390 @@
 # scripts/build_vector_db.py
 
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
 from pathlib import Path
-from config import SUMMARY_DIR, VECTORSTORE_DIR, OPENAI_API_KEY
+from config import (
+    RAW_DIR,
+    SUMMARY_DIR,
+    VECTORSTORE_DIR,
+    VECTOR_BACKEND,
+    VECTORSTORE_LAYOUT,
+    VECTORSTORE_SHARD_WORKERS,
+    FULLTEXT_INDEX,
+)
+from scripts.bm25_index import BM25_DIR_NAME, build_bm25_index, celex_from_source
+from scripts.category_router import CENTROIDS_NAME, build_centroids
+from scripts.chunking import CharacterChunker, get_chunker
+from scripts.corpus_version import save_corpus_version
+from scripts.embedding_cache import CachedEmbeddings, get_embedding_function
+from scripts.ingest import IngestionEngine, IngestItem, open_collection
+from scripts.numpy_index import NUMPY_INDEX_DIR_NAME, build_numpy_index
+from scripts.run_journal import RunJournal
+from scripts.sharded_store import (
+    SHARDS_DIR_NAME,
+    ShardReader,
+    load_shard_map,
+    save_shard_map,
+    shard_dir_name,
+)
+from scripts.tracing import span
+from scripts.two_tier_retriever import FULLTEXT_DIR_NAME
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
+import argparse
+import chromadb
+import hashlib
+import json
 import os
+import shutil
+import time
 
+# Per-file content hash and chunk IDs of everything currently in the store
+MANIFEST_NAME = "manifest.json"
 
-def build_vector_db(
-    root_directory: Path = SUMMARY_DIR, persist_dir: Path = VECTORSTORE_DIR
-):
-    embedding = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=600,
-        chunk_overlap=0,
-        length_function=len,
-        add_start_index=True,
-    )
 
-    documents = []
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(manifest_path: Path) -> dict[str, dict] | None:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_manifest(manifest: dict[str, dict], manifest_path: Path):
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _manifest_version(manifest: dict[str, dict]) -> str:
+    serialized = json.dumps(manifest, sort_keys=True, ensure_ascii=False)
+    return _content_hash(serialized)[:16]
+
+
+def _open_store(
+    persist_dir: Path, embedding, incremental: bool
+) -> tuple[Chroma, chromadb.Collection, dict[str, dict], Path]:
+    os.makedirs(persist_dir, exist_ok=True)
+    manifest_path = Path(persist_dir) / MANIFEST_NAME
+    db = Chroma(persist_directory=str(persist_dir), embedding_function=embedding)
+
+    manifest = _load_manifest(manifest_path) if incremental else None
+    if manifest is None:
+        # Without a manifest we can't tell which chunks are ours, so start clean
+        db.reset_collection()
+        manifest = {}
+    # Opened after the reset, which replaces the collection
+    return db, open_collection(persist_dir), manifest, manifest_path
+
 
-    for category_dir in root_directory.iterdir():
-        if not category_dir.is_dir():
-            continue
-        category = category_dir.name
+def _summary_files(root_directory: Path, category_dirs: list[Path]):
+    for category_dir in category_dirs:
         for txt_file in category_dir.rglob("*.txt"):
+            yield str(txt_file.relative_to(root_directory)), category_dir.name, txt_file
+
+
+def _sync_store(
+    db: Chroma,
+    collection: chromadb.Collection,
+    manifest: dict[str, dict],
+    files,
+    chunker,
+    journal: RunJournal | None,
+    engine: IngestionEngine,
+) -> dict[str, int]:
+    """
+    Brings one store in line with files, (source, category, path) tuples.
+    A file counts as changed when its content or the chunker settings differ
+    from the manifest. Changed files are read and split on the engine's reader
+    thread and embedded in batches; a file enters the manifest (and the
+    journal) only once all of its chunks are written. Returns
+    added/updated/removed/unchanged file counts and the number of embedded
+    chunks.
+    """
+    seen_sources = set()
+    counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    def written(source, content_hash, chunk_ids, updated, name):
+        manifest[source] = {
+            "hash": content_hash,
+            "chunker": chunker.id,
+            "chunk_ids": chunk_ids,
+        }
+        if journal:
+            journal.record(name, "embed", source=source, chunk_ids=chunk_ids)
+        counts["updated" if updated else "added"] += 1
+
+    def changed_files():
+        for source, category, txt_file in files:
+            seen_sources.add(source)
             with open(txt_file, "r", encoding="utf-8") as f:
                 text = f.read()
-                chunks = text_splitter.split_text(text)
-                for chunk in chunks:
-                    documents.append(
-                        Document(
-                            page_content=chunk,
-                            metadata={
-                                "category": category,
-                                "source": str(txt_file.relative_to(root_directory)),
-                            },
-                        )
-                    )
+
+            content_hash = _content_hash(text)
+            entry = manifest.get(source)
+            # Entries written before the chunker was recorded used the 600-char split
+            entry_chunker = entry.get("chunker", CharacterChunker.id) if entry else None
+            if entry and entry["hash"] == content_hash and entry_chunker == chunker.id:
+                counts["unchanged"] += 1
+                continue
+
+            with span("split") as stage:
+                chunks = chunker.split_text(text)
+                stage.set(items=len(chunks))
+            chunk_ids = [f"{source}::{i}" for i in range(len(chunks))]
+
+            # Drop the previous version (and any leftovers of an interrupted run)
+            stale_ids = set(chunk_ids) | set(entry["chunk_ids"] if entry else [])
+            if stale_ids:
+                db.delete(ids=list(stale_ids))
+
+            metadata = {
+                "category": category,
+                "source": source,
+                "celex": celex_from_source(source),
+            }
+            yield IngestItem(
+                ids=chunk_ids,
+                texts=chunks,
+                metadatas=[metadata] * len(chunks),
+                on_written=partial(
+                    written,
+                    source,
+                    content_hash,
+                    chunk_ids,
+                    entry is not None,
+                    txt_file.name,
+                ),
+            )
+
+    counts["chunks"] = engine.run(collection, changed_files()).chunks
+
+    removed_sources = [source for source in manifest if source not in seen_sources]
+    for source in removed_sources:
+        chunk_ids = manifest.pop(source)["chunk_ids"]
+        if chunk_ids:
+            db.delete(ids=chunk_ids)
+    counts["removed"] = len(removed_sources)
+    return counts
+
+
+def _sync_shards(
+    category_dirs: list[Path],
+    root_directory: Path,
+    persist_dir: Path,
+    engine: IngestionEngine,
+    chunker,
+    incremental: bool,
+    journal: RunJournal | None,
+    workers: int,
+) -> tuple[list[Chroma], list[dict], dict[str, int]]:
+    # One store per category, synced independently and in parallel
+    shard_map = {d.name: shard_dir_name(d.name) for d in category_dirs}
+
+    def sync_shard(category_dir: Path):
+        shard_dir = Path(persist_dir) / SHARDS_DIR_NAME / shard_map[category_dir.name]
+        db, collection, manifest, manifest_path = _open_store(
+            shard_dir, engine.embedding, incremental
+        )
+        files = _summary_files(root_directory, [category_dir])
+        counts = _sync_store(
+            db, collection, manifest, files, chunker, journal, engine
+        )
+        _save_manifest(manifest, manifest_path)
+        return db, manifest, counts
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(copy_context().run, sync_shard, category_dir)
+            for category_dir in category_dirs
+        ]
+        results = [future.result() for future in futures]
+
+    totals = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "chunks": 0}
+    for _, _, counts in results:
+        for key, value in counts.items():
+            totals[key] += value
+
+    # Shards of categories that disappeared are dropped as a whole
+    for category, name in load_shard_map(persist_dir).items():
+        if category not in shard_map:
+            shard_dir = Path(persist_dir) / SHARDS_DIR_NAME / name
+            totals["removed"] += len(_load_manifest(shard_dir / MANIFEST_NAME) or {})
+            shutil.rmtree(shard_dir, ignore_errors=True)
+    save_shard_map(shard_map, persist_dir)
+
+    return [db for db, _, _ in results], [m for _, m, _ in results], totals
+
+
+def _sync_fulltext(
+    raw_directory: Path,
+    persist_dir: Path,
+    categories: dict[str, str],
+    engine: IngestionEngine,
+    chunker,
+    incremental: bool,
+) -> tuple[dict[str, dict], dict[str, int]]:
+    """
+    Syncs the fine tier: full raw texts of the documents that have a summary
+    (categories maps their CELEX number to its category), chunked into a
+    store of their own. Raw texts keep their line breaks, so the chunker sees
+    the Article and annex structure.
+    """
+    db, collection, manifest, manifest_path = _open_store(
+        Path(persist_dir) / FULLTEXT_DIR_NAME, engine.embedding, incremental
+    )
+    files = (
+        (str(path.relative_to(raw_directory)), categories[path.stem], path)
+        for path in sorted(Path(raw_directory).rglob("*.txt"))
+        if path.stem in categories
+    )
+    # The journal tracks summary chunks only, the manifest covers this tier
+    counts = _sync_store(db, collection, manifest, files, chunker, None, engine)
+    _save_manifest(manifest, manifest_path)
+    return manifest, counts
+
+
+def build_vector_db(
+    root_directory: Path = SUMMARY_DIR,
+    persist_dir: Path = VECTORSTORE_DIR,
+    incremental: bool = True,
+    journal: RunJournal | None = None,
+    layout: str = VECTORSTORE_LAYOUT,
+    workers: int = VECTORSTORE_SHARD_WORKERS,
+    engine: IngestionEngine | None = None,
+    chunker=None,
+    raw_directory: Path = RAW_DIR,
+    fulltext: bool = FULLTEXT_INDEX,
+) -> dict[str, float]:
+    """
+    Syncs the vector store with the summaries in root_directory. Only new or
+    changed files are split and embedded, chunks of removed files are deleted.
+    With incremental=False the collection is wiped and rebuilt from scratch.
+    Embedded chunk IDs are also recorded in the run journal when one is given.
+    With the "sharded" layout every category gets its own store, synced in
+    parallel, so re-indexing one category never touches the others.
+    The corpus version written next to the manifest changes with the contents,
+    which invalidates answers cached against the previous store. Category
+    centroids for question routing and the BM25 keyword index are recomputed
+    whenever the store changed, as is the flat numpy index when it is the
+    configured query backend.
+    Files are split by chunker (the configured CHUNKER by default), chunks are
+    embedded and written by engine (by default an IngestionEngine over the
+    cached OpenAI embeddings). With fulltext, the raw texts in raw_directory
+    of every summarized document are also chunked into the fine tier of the
+    two-tier index, a separate store searched per document at query time.
+    Returns the sync counts along with the ingestion time and throughput.
+    """
+    engine = engine or IngestionEngine(get_embedding_function())
+    embedding = engine.embedding
+    chunker = chunker or get_chunker()
 
     os.makedirs(persist_dir, exist_ok=True)
-    db = Chroma.from_documents(
-        documents,
-        embedding=embedding,
-        persist_directory=str(persist_dir),
+    category_dirs = sorted(d for d in root_directory.iterdir() if d.is_dir())
+
+    sync_start = time.perf_counter()
+    if layout == "sharded":
+        dbs, manifests, counts = _sync_shards(
+            category_dirs,
+            root_directory,
+            persist_dir,
+            engine,
+            chunker,
+            incremental,
+            journal,
+            workers,
+        )
+        db = ShardReader(dbs)
+    elif layout == "single":
+        db, collection, manifest, manifest_path = _open_store(
+            persist_dir, embedding, incremental
+        )
+        files = _summary_files(root_directory, category_dirs)
+        counts = _sync_store(
+            db, collection, manifest, files, chunker, journal, engine
+        )
+        _save_manifest(manifest, manifest_path)
+        manifests = [manifest]
+    else:
+        raise ValueError(f"Unknown vector store layout: {layout}")
+
+    merged_manifest = {source: entry for m in manifests for source, entry in m.items()}
+    fulltext_counts = None
+    if fulltext:
+        categories = {
+            celex_from_source(source): Path(source).parts[0]
+            for source in merged_manifest
+        }
+        fulltext_manifest, fulltext_counts = _sync_fulltext(
+            raw_directory, persist_dir, categories, engine, chunker, incremental
+        )
+        counts["chunks"] += fulltext_counts["chunks"]
+        # Full-text changes invalidate cached answers as well
+        for source, entry in fulltext_manifest.items():
+            merged_manifest[f"{FULLTEXT_DIR_NAME}/{source}"] = entry
+    elif (Path(persist_dir) / FULLTEXT_DIR_NAME).exists():
+        shutil.rmtree(Path(persist_dir) / FULLTEXT_DIR_NAME, ignore_errors=True)
+    save_corpus_version(_manifest_version(merged_manifest), persist_dir)
+
+    counts["seconds"] = time.perf_counter() - sync_start
+    counts["chunks_per_second"] = (
+        counts["chunks"] / counts["seconds"] if counts["seconds"] else 0.0
     )
 
-    print(f"✅ Vector database built and saved at: {persist_dir}")
+    changed = counts["added"] or counts["updated"] or counts["removed"]
+    if changed or not (Path(persist_dir) / CENTROIDS_NAME).exists():
+        with span("centroids") as stage:
+            categories = build_centroids(db, persist_dir)
+            stage.set(items=categories)
+        print(f"🧭 Category centroids computed for {categories} categories")
+    if changed or not (Path(persist_dir) / BM25_DIR_NAME).exists():
+        with span("bm25_index") as stage:
+            chunks = build_bm25_index(db, persist_dir)
+            stage.set(items=chunks)
+        print(f"🔤 BM25 index built over {chunks} chunks")
+    numpy_index_dir = Path(persist_dir) / NUMPY_INDEX_DIR_NAME
+    if VECTOR_BACKEND == "numpy" and (changed or not numpy_index_dir.exists()):
+        with span("numpy_index") as stage:
+            rows = build_numpy_index(db, persist_dir)
+            stage.set(items=rows)
+        print(f"🧮 Numpy vector index exported with {rows} rows")
+
+    shards = f", {len(category_dirs)} shards" if layout == "sharded" else ""
+    print(
+        f"✅ Vector database synced at: {persist_dir} "
+        f"({counts['added']} added, {counts['updated']} updated, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged{shards})"
+    )
+    if fulltext_counts:
+        print(
+            f"📚 Full-text tier synced ({fulltext_counts['added']} added, "
+            f"{fulltext_counts['updated']} updated, {fulltext_counts['removed']} "
+            f"removed, {fulltext_counts['unchanged']} unchanged)"
+        )
+    if counts["chunks"]:
+        print(
+            f"⚡ Embedded {counts['chunks']} chunks in {counts['seconds']:.1f}s "
+            f"({counts['chunks_per_second']:.0f} chunks/s)"
+        )
+    if isinstance(embedding, CachedEmbeddings):
+        stats = embedding.stats()
+        print(
+            f"🗃️ Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate)"
+        )
+    return counts
 
 
 if __name__ == "__main__":
-    build_vector_db()
+    parser = argparse.ArgumentParser(description="Build or update the vector database")
+    parser.add_argument(
+        "--full", action="store_true", help="Rebuild the whole store from scratch"
+    )
+    args = parser.parse_args()
+    build_vector_db(incremental=not args.full)
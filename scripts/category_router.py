@@ -0,0 +1,181 @@
+# scripts/category_router.py
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from config import (
+    VECTORSTORE_DIR,
+    CATEGORY_ROUTER,
+    CATEGORY_ROUTER_MIN_MARGIN,
+)
+import numpy as np
+import os
+
+# Per-category mean chunk embedding, written next to the vector store
+CENTROIDS_NAME = "category_centroids.npz"
+CENTROID_BATCH_SIZE = 5000
+
+
+@dataclass
+class Route:
+    category: str
+    confidence: float
+    strategy: str
+
+
+def build_centroids(db, persist_dir: Path = VECTORSTORE_DIR) -> int:
+    """
+    Averages the chunk embeddings of every category in the Chroma store and
+    saves the normalized centroids. Reads the collection in batches so only the
+    running sums are kept in memory. Returns the number of categories.
+    """
+    sums, counts = {}, {}
+    offset = 0
+    while True:
+        batch = db.get(
+            include=["embeddings", "metadatas"],
+            limit=CENTROID_BATCH_SIZE,
+            offset=offset,
+        )
+        embeddings = batch["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            break
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        for vector, metadata in zip(vectors, batch["metadatas"]):
+            category = metadata["category"]
+            if category in sums:
+                sums[category] += vector
+                counts[category] += 1
+            else:
+                sums[category] = vector.copy()
+                counts[category] = 1
+        offset += len(vectors)
+
+    centroids_path = Path(persist_dir) / CENTROIDS_NAME
+    if not sums:
+        centroids_path.unlink(missing_ok=True)
+        return 0
+
+    categories = sorted(sums)
+    centroids = np.stack([sums[c] / counts[c] for c in categories])
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+    tmp_path = centroids_path.with_name(f"{CENTROIDS_NAME}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, categories=np.array(categories), centroids=centroids)
+    os.replace(tmp_path, centroids_path)
+    return len(categories)
+
+
+class CategoryRouter(ABC):
+    """
+    Picks the category of a question. route() returns None when the router is
+    not confident enough, so routers can be chained with FallbackRouter.
+    """
+
+    name = "base"
+    # Routers that answer without calling the chat model
+    local = True
+
+    @abstractmethod
+    def route(self, question: str, vector: list[float]) -> Route | None:
+        ...
+
+    def route_local(self, question: str, vector: list[float]) -> Route | None:
+        """Like route(), but None instead of asking the chat model."""
+        return self.route(question, vector) if self.local else None
+
+
+class CentroidRouter(CategoryRouter):
+    """
+    Nearest centroid by cosine similarity. Confidence is the margin between
+    the best and the second best category.
+    """
+
+    name = "centroid"
+
+    def __init__(
+        self,
+        persist_dir: Path = VECTORSTORE_DIR,
+        min_margin: float = CATEGORY_ROUTER_MIN_MARGIN,
+    ):
+        self.min_margin = min_margin
+        try:
+            with np.load(Path(persist_dir) / CENTROIDS_NAME) as data:
+                self.categories = data["categories"].tolist()
+                self.centroids = data["centroids"]
+        except FileNotFoundError:
+            self.categories, self.centroids = [], None
+
+    def scores(self, vector: list[float]) -> list[tuple[str, float]]:
+        if self.centroids is None:
+            return []
+        query_vector = np.asarray(vector, dtype=np.float32)
+        query_vector = query_vector / (np.linalg.norm(query_vector) + 1e-12)
+        similarities = self.centroids @ query_vector
+        order = np.argsort(similarities)[::-1]
+        return [(self.categories[i], float(similarities[i])) for i in order]
+
+    def route(self, question: str, vector: list[float]) -> Route | None:
+        scores = self.scores(vector)
+        if not scores:
+            return None
+        best_category, best = scores[0]
+        margin = best - scores[1][1] if len(scores) > 1 else 1.0
+        if margin < self.min_margin:
+            return None
+        return Route(best_category, margin, self.name)
+
+
+class LLMRouter(CategoryRouter):
+    """Asks the chat model, always confident."""
+
+    name = "llm"
+    local = False
+
+    def __init__(self, classify: Callable[[str], str]):
+        self.classify = classify
+
+    def route(self, question: str, vector: list[float]) -> Route | None:
+        return Route(self.classify(question), 1.0, self.name)
+
+
+class FallbackRouter(CategoryRouter):
+    """Tries each router in turn and returns the first confident route."""
+
+    name = "fallback"
+
+    def __init__(self, *routers: CategoryRouter):
+        self.routers = routers
+
+    def route(self, question: str, vector: list[float]) -> Route | None:
+        for router in self.routers:
+            route = router.route(question, vector)
+            if route is not None:
+                return route
+        return None
+
+    def route_local(self, question: str, vector: list[float]) -> Route | None:
+        for router in self.routers:
+            route = router.route_local(question, vector)
+            if route is not None:
+                return route
+        return None
+
+
+def get_category_router(
+    llm_classify: Callable[[str], str],
+    strategy: str = CATEGORY_ROUTER,
+    persist_dir: Path = VECTORSTORE_DIR,
+) -> CategoryRouter:
+    """
+    "centroid" routes locally and falls back to the LLM only below the
+    confidence margin (or when no centroids have been built yet), "llm"
+    always asks the model.
+    """
+    if strategy == "llm":
+        return LLMRouter(llm_classify)
+    if strategy == "centroid":
+        return FallbackRouter(CentroidRouter(persist_dir), LLMRouter(llm_classify))
+    raise ValueError(f"Unknown category router: {strategy}")
@@ -0,0 +1,194 @@
+# scripts/chunking.py
+
+from dataclasses import dataclass
+from config import (
+    EMBEDDING_MODEL,
+    CHUNKER,
+    CHUNK_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_MIN_TOKENS,
+)
+import re
+import tiktoken
+
+# Boundary levels, strongest first. A unit's level is that of the boundary
+# right before it; HARD means a sentence was cut because it didn't fit
+SECTION, PARAGRAPH, SENTENCE, HARD = 0, 1, 2, 3
+
+# Article / annex / chapter / title / section headings, at a line start or
+# right after a sentence so "see Article 5" never splits, plus the markdown
+# and all-bold heading lines of the LLM summaries
+SECTION_RE = re.compile(
+    r"(?:^|(?<=[.;:] ))(?=(?:\*\*|#{1,6} )?"
+    r"(?:Article \d+[a-z]?\b|ANNEX\b|Annex [IVXLC]+\b|CHAPTER [IVXLC]+\b"
+    r"|TITLE [IVXLC]+\b|SECTION \d+\b)|#{1,6} |\*\*[^*\n]+\*\*[ \t]*$)",
+    re.MULTILINE,
+)
+# Blank lines, and recitals "(12)", numbered paragraphs "3." and points "(a)"
+# or bullets at a line start (recitals and paragraphs also mid-line, since
+# sanitized text has no newlines left)
+PARAGRAPH_RE = re.compile(
+    r"\n[ \t]*\n"
+    r"|^(?=[ \t]*(?:\d+\. |\(\d+\) |\([a-z]\) |[-•*] ))"
+    r"|(?<=[.;:] )(?=\(\d+\) |\d+\. [A-Z])",
+    re.MULTILINE,
+)
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+(?=[A-Z(\"“'])|\n")
+
+
+@dataclass
+class _Unit:
+    text: str
+    level: int
+    tokens: int = 0
+
+
+class StructureChunker:
+    """
+    Splits EU legal text on its own structure: sections (Articles, annexes,
+    chapters, headings), then paragraphs (recitals, numbered paragraphs,
+    points), then sentences; a sentence is only cut when it alone exceeds the
+    budget. Units are packed greedily into chunks of at most chunk_tokens
+    tokens of the embedding model's tokenizer. A new section starts a new
+    chunk once the current one holds min_tokens, and an oversize chunk breaks
+    at its last paragraph boundary when it can. Chunks continuing the same
+    section repeat up to overlap_tokens of whole trailing sentences. Token
+    counts for all units of a batch of documents come from one batched
+    tiktoken call.
+    """
+
+    def __init__(
+        self,
+        chunk_tokens: int = CHUNK_TOKENS,
+        overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+        min_tokens: int = CHUNK_MIN_TOKENS,
+        model: str = EMBEDDING_MODEL,
+    ):
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = min(overlap_tokens, chunk_tokens // 2)
+        self.min_tokens = min(min_tokens, chunk_tokens)
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+        # Stored in the vector store manifest, a change re-chunks every file
+        self.id = (
+            f"structure:{self.encoding.name}:{chunk_tokens}:"
+            f"{self.overlap_tokens}:{self.min_tokens}"
+        )
+
+    def count_tokens(self, texts: list[str]) -> list[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def _units(self, text: str) -> list[_Unit]:
+        units = []
+        for section in SECTION_RE.split(text):
+            level = SECTION
+            for paragraph in PARAGRAPH_RE.split(section):
+                if not paragraph.strip():
+                    continue
+                level = min(level, PARAGRAPH)
+                for sentence in SENTENCE_RE.split(paragraph):
+                    if sentence.strip():
+                        units.append(_Unit(sentence.strip(), level))
+                        level = SENTENCE
+        return units
+
+    def _fit(self, units: list[_Unit]) -> list[_Unit]:
+        # Cut sentences longer than a whole chunk on token boundaries
+        fitted = []
+        for unit in units:
+            if unit.tokens <= self.chunk_tokens:
+                fitted.append(unit)
+                continue
+            tokens = self.encoding.encode_ordinary(unit.text)
+            for i in range(0, len(tokens), self.chunk_tokens):
+                piece = tokens[i : i + self.chunk_tokens]
+                level = unit.level if i == 0 else HARD
+                fitted.append(_Unit(self.encoding.decode(piece), level, len(piece)))
+        return fitted
+
+    def _overlap(self, units: list[_Unit]) -> list[_Unit]:
+        carried, tokens = [], 0
+        for unit in reversed(units):
+            if tokens + unit.tokens > self.overlap_tokens:
+                break
+            carried.insert(0, unit)
+            tokens += unit.tokens
+        return carried
+
+    @staticmethod
+    def _join(units: list[_Unit]) -> str:
+        parts = []
+        for i, unit in enumerate(units):
+            if i:
+                parts.append("\n" if unit.level <= PARAGRAPH else " ")
+            parts.append(unit.text)
+        return "".join(parts)
+
+    def _pack(self, units: list[_Unit]) -> list[str]:
+        chunks, current, size = [], [], 0
+        for unit in units:
+            if current and unit.level == SECTION and size >= self.min_tokens:
+                chunks.append(self._join(current))
+                current, size = [], 0
+
+            if current and size + unit.tokens > self.chunk_tokens:
+                # Prefer ending on the last paragraph boundary of the chunk
+                cut = len(current)
+                for i in range(len(current) - 1, 0, -1):
+                    if current[i].level <= PARAGRAPH:
+                        if sum(u.tokens for u in current[:i]) >= self.min_tokens:
+                            cut = i
+                        break
+                chunks.append(self._join(current[:cut]))
+                current = current[cut:] or self._overlap(current)
+                size = sum(u.tokens for u in current)
+                while current and size + unit.tokens > self.chunk_tokens:
+                    size -= current.pop(0).tokens
+
+            current.append(unit)
+            size += unit.tokens
+        if current:
+            chunks.append(self._join(current))
+        return chunks
+
+    def split_texts(self, texts: list[str]) -> list[list[str]]:
+        documents = [self._units(text) for text in texts]
+        flat = [unit for units in documents for unit in units]
+        for unit, tokens in zip(flat, self.count_tokens([u.text for u in flat])):
+            unit.tokens = tokens
+        return [self._pack(self._fit(units)) for units in documents]
+
+    def split_text(self, text: str) -> list[str]:
+        return self.split_texts([text])[0]
+
+
+class CharacterChunker:
+    """The original 600-character recursive splitter, kept for comparison."""
+
+    id = "recursive:600:0"
+
+    def __init__(self):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=600,
+            chunk_overlap=0,
+            length_function=len,
+            add_start_index=True,
+        )
+
+    def split_text(self, text: str) -> list[str]:
+        return self.splitter.split_text(text)
+
+    def split_texts(self, texts: list[str]) -> list[list[str]]:
+        return [self.split_text(text) for text in texts]
+
+
+def get_chunker(name: str = CHUNKER) -> StructureChunker | CharacterChunker:
+    if name == "structure":
+        return StructureChunker()
+    if name == "recursive":
+        return CharacterChunker()
+    raise ValueError(f"Unknown chunker: {name}")
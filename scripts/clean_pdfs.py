@@ -1,43 +1,104 @@
 import fitz  # PyMuPDF
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import sys
 import os
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from config import PDF_DIR, RAW_DIR
+from config import PDF_DIR, RAW_DIR, PDF_WORKERS
 
+# Compiled once per process instead of on every call
+MONITORUL_RE = re.compile(r"MONITORUL OFICIAL.*?\n")
+PARTEA_RE = re.compile(r"^\s*P A R T E A.*?\n", flags=re.MULTILINE)
+ISSN_RE = re.compile(r"^.*?ISSN.*?$", flags=re.MULTILINE)
+BLANK_LINES_RE = re.compile(r"\n{2,}")
 
-def clean_pdfs():
-    RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    def clean_text(raw_text: str) -> str:
-        raw_text = re.sub(r"MONITORUL OFICIAL.*?\n", "", raw_text)
-        raw_text = re.sub(r"^\s*P A R T E A.*?\n", "", raw_text, flags=re.MULTILINE)
-        raw_text = re.sub(r"^.*?ISSN.*?$", "", raw_text, flags=re.MULTILINE)
-        raw_text = raw_text.replace("\x04", "…")
-        raw_text = raw_text.replace("�", "")
-        raw_text = re.sub(r"\n{2,}", "\n\n", raw_text)
-        lines = [line.strip() for line in raw_text.splitlines() if line.strip()]
-        return "\n".join(lines)
-
-    def process_pdf(pdf_path: Path, output_dir: Path):
-        out_path = output_dir / f"{pdf_path.stem}.txt"
-        if out_path.exists():
-            print(f"⏩ Skipping {pdf_path.name} (already exists)")
-            return
-        doc = fitz.open(pdf_path)
-        raw_text = "\n".join(page.get_text() for page in doc[1:])  # skip first page
-        doc.close()
-        cleaned = clean_text(raw_text)
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(cleaned)
-        print(f"✅ Cleaned: {pdf_path.name}")
+def clean_text(raw_text: str) -> str:
+    raw_text = MONITORUL_RE.sub("", raw_text)
+    raw_text = PARTEA_RE.sub("", raw_text)
+    raw_text = ISSN_RE.sub("", raw_text)
+    raw_text = raw_text.replace("\x04", "…")
+    raw_text = raw_text.replace("�", "")
+    raw_text = BLANK_LINES_RE.sub("\n\n", raw_text)
+    lines = [line.strip() for line in raw_text.splitlines() if line.strip()]
+    return "\n".join(lines)
+
+
+def process_pdf(pdf_path: Path, output_dir: Path) -> int:
+    """
+    Cleans one PDF page by page, streaming the text to disk instead of
+    joining the whole document in memory. Returns the number of pages read.
+    """
+    out_path = output_dir / f"{pdf_path.stem}.txt"
+    tmp_path = out_path.with_suffix(".tmp")
+    pages = 0
+    try:
+        with fitz.open(pdf_path) as doc, open(tmp_path, "w", encoding="utf-8") as f:
+            written = False
+            for page in doc.pages(1):  # skip first page
+                page_text = page.get_text()
+                if not page_text.endswith("\n"):
+                    page_text += "\n"
+                cleaned = clean_text(page_text)
+                pages += 1
+                if cleaned:
+                    if written:
+                        f.write("\n")
+                    f.write(cleaned)
+                    written = True
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        # Don't leave a partial text behind for a PDF that failed
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return pages
+
 
+def clean_pdfs(workers: int | None = PDF_WORKERS):
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+    pending = []
     for pdf_file in PDF_DIR.glob("*.pdf"):
-        process_pdf(pdf_file, RAW_DIR)
+        if (RAW_DIR / f"{pdf_file.stem}.txt").exists():
+            print(f"⏩ Skipping {pdf_file.name} (already exists)")
+            continue
+        pending.append(pdf_file)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    total_pages = 0
+    start = time.perf_counter()
+
+    if workers == 1:
+        for pdf_file in pending:
+            try:
+                total_pages += process_pdf(pdf_file, RAW_DIR)
+                print(f"✅ Cleaned: {pdf_file.name}")
+            except Exception as e:
+                print(f"❌ Failed to clean {pdf_file.name}: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(process_pdf, pdf_file, RAW_DIR): pdf_file
+                for pdf_file in pending
+            }
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    total_pages += future.result()
+                    print(f"✅ Cleaned: {pdf_file.name}")
+                except Exception as e:
+                    print(f"❌ Failed to clean {pdf_file.name}: {e}")
 
+    elapsed = time.perf_counter() - start
+    if total_pages:
+        print(
+            f"📊 {total_pages} pages in {elapsed:.1f}s "
+            f"({total_pages / elapsed:.1f} pages/s with {workers} workers)"
+        )
     print("✅ All PDFs processed successfully.")
 
 
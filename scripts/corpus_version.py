@@ -0,0 +1,23 @@
+# scripts/corpus_version.py
+
+from pathlib import Path
+from config import VECTORSTORE_DIR
+import os
+
+# Fingerprint of the vector store manifest, changes whenever the store contents
+# change. Kept apart from build_vector_db so readers don't import Chroma
+CORPUS_VERSION_NAME = "corpus_version"
+
+
+def read_corpus_version(persist_dir: Path = VECTORSTORE_DIR) -> str | None:
+    try:
+        return (Path(persist_dir) / CORPUS_VERSION_NAME).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def save_corpus_version(version: str, persist_dir: Path = VECTORSTORE_DIR):
+    version_path = Path(persist_dir) / CORPUS_VERSION_NAME
+    tmp_path = version_path.with_suffix(".tmp")
+    tmp_path.write_text(version)
+    os.replace(tmp_path, version_path)
@@ -0,0 +1,106 @@
+# scripts/embedding_cache.py
+
+from array import array
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+from config import (
+    OPENAI_API_KEY,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+)
+from scripts.lru_store import SQLiteLRUStore
+from scripts.tracing import record_cache
+import hashlib
+import threading
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding function with an on-disk cache keyed by
+    (model, sha256(text)). Least recently used entries are evicted once the
+    cache grows past max_entries.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str = EMBEDDING_MODEL,
+        cache_path: Path = EMBEDDING_CACHE_PATH,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+    ):
+        self.underlying = underlying
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._store = SQLiteLRUStore(cache_path, "embeddings", "vector", max_entries)
+
+    def _key(self, text: str) -> str:
+        return f"{self.model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = self._store.get_many(keys)
+        return {key: array("f", blob).tolist() for key, blob in found.items()}
+
+    def _save(self, items: list[tuple[str, list[float]]]):
+        self._store.put_many(
+            [(key, array("f", vector).tobytes()) for key, vector in items]
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = self._lookup(list(dict.fromkeys(keys)))
+
+        # Embed each missing text once, even if it appears several times in the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            new_vectors = self.underlying.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), new_vectors))
+            self._save(new_items)
+            vectors.update(new_items)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        record_cache(len(texts) - len(missing), len(missing))
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self._lookup([key])
+        if key in cached:
+            with self._lock:
+                self.hits += 1
+            record_cache(1, 0)
+            return cached[key]
+
+        vector = self.underlying.embed_query(text)
+        self._save([(key, vector)])
+        with self._lock:
+            self.misses += 1
+        record_cache(0, 1)
+        return vector
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def get_embedding_function() -> CachedEmbeddings:
+    # langchain_openai pulls in openai and tiktoken, import it only when needed
+    from langchain_openai import OpenAIEmbeddings
+
+    return CachedEmbeddings(
+        OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY)
+    )
@@ -1,9 +1,5 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from urllib.parse import urljoin
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import json
 from pathlib import Path
@@ -12,60 +8,85 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from config import PDF_DIR, METADATA_JSON_RO
+from config import (
+    PDF_DIR,
+    METADATA_JSON_RO,
+    SCRAPER_WORKERS,
+    SCRAPER_DOWNLOAD_TIMEOUT,
+)
+from scripts.webdriver_pool import WebDriverPool
 
 
-def extract_pdf():
+def _wait_for_download(download_dir: Path, timeout: float) -> Path | None:
+    # Chrome writes to *.crdownload and renames once the download completes
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        files = list(download_dir.iterdir())
+        finished = [f for f in files if f.suffix == ".pdf"]
+        in_progress = [f for f in files if f.suffix == ".crdownload"]
+        if finished and not in_progress:
+            return finished[0]
+        time.sleep(0.2)
+    return None
+
+
+def _download_pdf(pool: WebDriverPool, entry: dict) -> str:
+    celex_id = entry["celex"]
+    pdf_path = Path(PDF_DIR) / f"{celex_id}.pdf"
+    page_url = entry["link"].replace("AUTO", "RO/TXT").replace("&rid=1", "")
+    print(f"🔍 Processing {celex_id}: {page_url}")
+
+    with pool.driver() as driver:
+        download_dir = pool.download_dir_for(driver)
+        for leftover in download_dir.iterdir():
+            leftover.unlink()
+
+        pool.load(
+            driver,
+            page_url,
+            wait_for=(By.CSS_SELECTOR, "a#format_language_table_PDF_RO"),
+        )
+        pdf_link_element = driver.find_element(
+            By.CSS_SELECTOR, "a#format_language_table_PDF_RO"
+        )
+        pdf_url = urljoin(page_url, pdf_link_element.get_attribute("href"))
+        print(f"⬇ Downloading PDF: {pdf_url}")
+        pool.throttle.wait(pdf_url)
+        driver.get(pdf_url)
+
+        downloaded = _wait_for_download(download_dir, SCRAPER_DOWNLOAD_TIMEOUT)
+        if downloaded is None:
+            raise TimeoutError(
+                f"download did not finish within {SCRAPER_DOWNLOAD_TIMEOUT}s"
+            )
+        os.replace(downloaded, pdf_path)
+    return pdf_path.name
+
+
+def extract_pdf(workers: int = SCRAPER_WORKERS):
     # Load metadata
     with open(METADATA_JSON_RO, "r", encoding="utf-8") as f:
         entries = json.load(f)
 
-    # Selenium options
-    options = Options()
-    options.add_argument("--headless")
-    options.add_experimental_option(
-        "prefs",
-        {
-            "download.default_directory": str(PDF_DIR),
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "plugins.always_open_pdf_externally": True,
-        },
-    )
-
-    # Initialize WebDriver
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
+    PDF_DIR.mkdir(parents=True, exist_ok=True)
 
+    pending = []
     for entry in entries:
-        celex_id = entry["celex"]
-        pdf_filename = f"{celex_id}.pdf"
-        pdf_path = Path(PDF_DIR) / pdf_filename
+        pdf_filename = f"{entry['celex']}.pdf"
 
         # ✅ Skip if already downloaded
-        if pdf_path.exists():
+        if (Path(PDF_DIR) / pdf_filename).exists():
             print(f"⏩ Skipping {pdf_filename} (already exists)")
             continue
+        pending.append(entry)
 
-        page_url = entry["link"].replace("AUTO", "RO/TXT").replace("&rid=1", "")
-        print(f"🔍 Processing {celex_id}: {page_url}")
+    with WebDriverPool(workers, download_dir=PDF_DIR) as pool:
+        for entry, result in pool.map(_download_pdf, pending):
+            if isinstance(result, Exception):
+                print(f"❌ Could not download PDF for {entry['celex']}: {result}")
+            else:
+                print(f"✅ Saved {result}")
 
-        driver.get(page_url)
-        time.sleep(3)
-
-        try:
-            pdf_link_element = driver.find_element(
-                By.CSS_SELECTOR, "a#format_language_table_PDF_RO"
-            )
-            pdf_url = urljoin(page_url, pdf_link_element.get_attribute("href"))
-            driver.get(pdf_url)
-            print(f"⬇ Downloading PDF: {pdf_url}")
-            time.sleep(3)  # Wait for download
-        except Exception as e:
-            print(f"❌ Could not find PDF link for {celex_id}: {e}")
-
-    driver.quit()
     print("✅ All PDFs processed successfully.")
 
 
@@ -1,82 +1,134 @@
 # extract_result_text.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
-import time
+from selenium.webdriver.common.by import By
 import json
 import os
-from urllib.parse import urljoin
-from webdriver_manager.chrome import ChromeDriverManager
-from config import RAW_DIR, METADATA_JSON
+import re
+from config import RAW_DIR, METADATA_JSON, SCRAPER_WORKERS, FETCH_BACKEND
+from scripts.host_throttle import HostThrottle
+from scripts.html_extract import extract_document_text
+from scripts.http_fetcher import HttpFetcher
+from scripts.webdriver_pool import WebDriverPool
 
+DOCUMENT_DIV_RE = re.compile(r"""id\s*=\s*["']document1["']""")
 
-def extract_result_text():
+
+def _document_url(entry: dict) -> str:
+    return entry["link"].replace("AUTO", "EN/TXT").replace("&rid=1", "")
+
+
+def _save_document(celex_id: str, html: str):
+    full_text = extract_document_text(html)
+    with open(RAW_DIR / f"{celex_id}.txt", "w", encoding="utf-8") as f:
+        f.write(full_text)
+
+
+def _fetch_document(pool: WebDriverPool, entry: dict):
+    html = pool.fetch(_document_url(entry), wait_for=(By.ID, "document1"))
+    _save_document(entry["celex"], html)
+
+
+def _fetch_over_http(
+    entries: list[dict],
+    saved: set[str],
+    fallback: list[dict],
+    throttle: HostThrottle,
+):
+    """
+    Fetches the static document pages over plain HTTP and yields a progress
+    message per document. Entries whose page failed or did not contain the
+    document are appended to fallback for the browser.
+    """
+    fetcher = HttpFetcher(throttle=throttle)
+    by_url = {_document_url(entry): entry for entry in entries}
+    conditional_urls = {
+        url for url, entry in by_url.items() if entry["celex"] in saved
+    }
+
+    try:
+        for result, headers in fetcher.iter_fetch(by_url, conditional_urls):
+            entry = by_url[result.url]
+            celex_id = entry["celex"]
+            if result.not_modified:
+                yield f"⏭️ Skipping {celex_id} (not modified)"
+            elif result.html and DOCUMENT_DIV_RE.search(result.html):
+                _save_document(celex_id, result.html)
+                fetcher.remember(result, headers)
+                yield f"✅ Saved document for {celex_id}"
+            else:
+                reason = result.error or "no document1 div in static HTML"
+                yield f"🧭 {celex_id} needs the browser ({reason})"
+                fallback.append(entry)
+    finally:
+        fetcher.save_validators()
+
+
+def extract_result_text(
+    workers: int = SCRAPER_WORKERS,
+    backend: str = FETCH_BACKEND,
+    refresh: bool = False,
+):
     """
     Reads eurlex_results.json, visits each link, extracts the HTML content
     from <div id='document1'>, saves to RAW_DIR/<celex_id>.txt
+
+    With the "http" backend pages are fetched over plain HTTP and only pages
+    that need JavaScript go through Selenium. refresh=True revalidates already
+    saved documents with conditional requests and re-saves the changed ones.
     """
     with open(METADATA_JSON, "r", encoding="utf-8") as f:
         entries = json.load(f)
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
     os.makedirs(RAW_DIR, exist_ok=True)
+    # One per-host rate for both backends
+    throttle = HostThrottle()
 
+    pending = []
+    saved = set()
     for entry in entries:
         celex_id = entry["celex"]
         output_path = RAW_DIR / f"{celex_id}.txt"
 
         if output_path.exists():
+            if refresh and backend == "http":
+                saved.add(celex_id)
+                pending.append(entry)
+                continue
             message = f"⏭️ Skipping {celex_id} (already saved)"
             print(message)
             yield message  # Yield message for Streamlit UI
             continue
 
-        url = entry["link"].replace("AUTO", "EN/TXT").replace("&rid=1", "")
-        message = f"🔍 Processing CELEX {celex_id} → {url}"
-        print(message)
-        yield message  # Yield for UI
+        pending.append(entry)
 
-        driver.get(url)
-        time.sleep(3)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        document_div = soup.find("div", id="document1")
-        document_content = []
-
-        if document_div:
-            for child in document_div.descendants:
-                if child.name == "table":
-                    table_rows = []
-                    for row in child.find_all("tr"):
-                        row_cells = [
-                            cell.get_text(separator=" ", strip=True)
-                            for cell in row.find_all("td")
-                        ]
-                        if row_cells:
-                            table_rows.append(" ; ".join(row_cells))
-                    if table_rows:
-                        document_content.append("\n".join(table_rows))
-                elif child.name == "p":
-                    paragraph = child.get_text(separator=" ", strip=True)
-                    if paragraph:
-                        document_content.append(paragraph)
-        else:
-            document_content.append("No content found in the div with id 'document1'.")
-
-        full_text = "\n\n".join(document_content)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_text)
-
-        message = f"✅ Saved document for {celex_id}"
+    if pending and backend == "http":
+        message = f"🔍 Fetching {len(pending)} documents over HTTP"
         print(message)
         yield message  # Yield for UI
 
-    driver.quit()
+        fallback = []
+        for message in _fetch_over_http(pending, saved, fallback, throttle):
+            print(message)
+            yield message  # Yield for UI
+        pending = fallback
+
+    if not pending:
+        return
+
+    message = f"🔍 Fetching {len(pending)} documents with {workers} browser workers"
+    print(message)
+    yield message  # Yield for UI
+
+    with WebDriverPool(workers, throttle=throttle) as pool:
+        for entry, result in pool.map(_fetch_document, pending):
+            if isinstance(result, Exception):
+                message = f"❌ Failed to fetch {entry['celex']}: {result}"
+            else:
+                message = f"✅ Saved document for {entry['celex']}"
+            print(message)
+            yield message  # Yield for UI
 
 
 if __name__ == "__main__":
-    extract_result_text()
+    for _ in extract_result_text():
+        pass
@@ -0,0 +1,39 @@
+# scripts/host_throttle.py
+
+from urllib.parse import urlparse
+from config import SCRAPER_HOST_MIN_INTERVAL
+import asyncio
+import threading
+import time
+
+
+class HostThrottle:
+    """
+    Keeps at least min_interval seconds between two requests to one host.
+    Thread-safe, so the HTTP fetcher and the browser pool of one run can share
+    an instance and stay within the same per-host rate.
+    """
+
+    def __init__(self, min_interval: float = SCRAPER_HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url: str) -> float:
+        """Books the next slot for the url's host, returns the seconds until it."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        return slot - now
+
+    def wait(self, url: str):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str):
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
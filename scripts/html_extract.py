@@ -0,0 +1,63 @@
+# scripts/html_extract.py
+
+from lxml import html as lxml_html
+
+NO_CONTENT_MESSAGE = "No content found in the div with id 'document1'."
+
+_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+_TABLE_SECTIONS = {"thead", "tbody", "tfoot"}
+
+
+def _text(element) -> str:
+    # Same normalization as BeautifulSoup's get_text(separator=" ", strip=True)
+    return " ".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _table_rows(table) -> list[str]:
+    # Only this table's own rows; nested tables are part of their cell's text
+    rows = []
+    for child in table:
+        if child.tag in _TABLE_SECTIONS:
+            candidates = [row for row in child if row.tag == "tr"]
+        elif child.tag == "tr":
+            candidates = [child]
+        else:
+            continue
+        for row in candidates:
+            cells = [_text(cell) for cell in row if cell.tag == "td"]
+            if cells:
+                rows.append(" ; ".join(cells))
+    return rows
+
+
+def extract_document_text(html: str) -> str:
+    """
+    Extracts the paragraphs and table rows of <div id="document1"> in document
+    order, walking the tree once. A table or paragraph is emitted as a whole and
+    never descended into, so nested content is not repeated.
+    """
+    tree = lxml_html.fromstring(html.encode("utf-8"), parser=_PARSER)
+    matches = tree.xpath('//div[@id="document1"]')
+    if not matches:
+        return NO_CONTENT_MESSAGE
+
+    document_content = []
+    stack = [iter(matches[0])]
+    while stack:
+        for element in stack[-1]:
+            tag = element.tag
+            if tag == "table":
+                rows = _table_rows(element)
+                if rows:
+                    document_content.append("\n".join(rows))
+            elif tag == "p":
+                paragraph = _text(element)
+                if paragraph:
+                    document_content.append(paragraph)
+            elif isinstance(tag, str):
+                stack.append(iter(element))
+                break
+        else:
+            stack.pop()
+
+    return "\n\n".join(document_content)
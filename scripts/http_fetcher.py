@@ -0,0 +1,161 @@
+# scripts/http_fetcher.py
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from config import (
+    HTTP_CONCURRENCY,
+    HTTP_TIMEOUT,
+    HTTP_VALIDATORS_JSON,
+    SCRAPER_HOST_MIN_INTERVAL,
+)
+from scripts.host_throttle import HostThrottle
+import asyncio
+import httpx
+import json
+import os
+import queue
+import threading
+
+USER_AGENT = "Mozilla/5.0 (compatible; eu-rag-pipeline)"
+_DONE = object()
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int | None = None
+    html: str | None = None
+    not_modified: bool = False
+    error: Exception | None = None
+
+
+class HttpFetcher:
+    """
+    Fetches static pages over pooled keep-alive connections with gzip and
+    conditional requests (ETag / Last-Modified validators kept on disk).
+    Works against any base URL, so it can be pointed at a local fixture server.
+    Requests go through a per-host throttle, which can be shared with the
+    browser pool of the same run.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = HTTP_CONCURRENCY,
+        timeout: float = HTTP_TIMEOUT,
+        validators_path: Path = HTTP_VALIDATORS_JSON,
+        host_min_interval: float = SCRAPER_HOST_MIN_INTERVAL,
+        throttle: HostThrottle | None = None,
+    ):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.validators_path = Path(validators_path)
+        self.throttle = throttle or HostThrottle(host_min_interval)
+        try:
+            with open(self.validators_path, "r", encoding="utf-8") as f:
+                self.validators = json.load(f)
+        except FileNotFoundError:
+            self.validators = {}
+        self._lock = threading.Lock()
+
+    def remember(self, result: FetchResult, headers: httpx.Headers):
+        validators = {
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+        }
+        if any(validators.values()):
+            with self._lock:
+                self.validators[result.url] = validators
+
+    def save_validators(self):
+        self.validators_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.validators_path.with_suffix(".tmp")
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.validators, f, indent=2)
+        os.replace(tmp_path, self.validators_path)
+
+    async def _fetch_one(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        url: str,
+        conditional: bool,
+    ) -> tuple[FetchResult, httpx.Headers | None]:
+        headers = {}
+        validators = self.validators.get(url, {}) if conditional else {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        async with semaphore:
+            await self.throttle.wait_async(url)
+
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.HTTPError as e:
+                return FetchResult(url, error=e), None
+
+        if response.status_code == 304:
+            return FetchResult(url, status=304, not_modified=True), response.headers
+        if response.status_code != 200:
+            error = httpx.HTTPStatusError(
+                f"HTTP {response.status_code}",
+                request=response.request,
+                response=response,
+            )
+            return FetchResult(url, status=response.status_code, error=error), None
+        return (
+            FetchResult(url, status=200, html=response.text),
+            response.headers,
+        )
+
+    async def _fetch_all(self, requests: list[tuple[str, bool]], on_result):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"},
+        ) as client:
+            tasks = [
+                asyncio.create_task(
+                    self._fetch_one(client, semaphore, url, conditional)
+                )
+                for url, conditional in requests
+            ]
+            for task in asyncio.as_completed(tasks):
+                on_result(*await task)
+
+    def iter_fetch(
+        self, urls: Iterable[str], conditional_urls: set[str] = frozenset()
+    ) -> Iterator[tuple[FetchResult, httpx.Headers | None]]:
+        """
+        Fetches urls concurrently on a background event loop and yields
+        (result, response headers) as each one completes. Validators are only
+        sent for urls in conditional_urls. Pass the headers to remember() once
+        the page has been stored, so the next run can revalidate it.
+        """
+        requests = [(url, url in conditional_urls) for url in urls]
+        results = queue.Queue()
+        errors = []
+
+        def _run():
+            try:
+                asyncio.run(self._fetch_all(requests, lambda *item: results.put(item)))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                results.put(_DONE)
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        while (item := results.get()) is not _DONE:
+            yield item
+        thread.join()
+        if errors:
+            raise errors[0]
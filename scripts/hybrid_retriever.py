@@ -0,0 +1,60 @@
+# scripts/hybrid_retriever.py
+
+from langchain_core.documents import Document
+from config import RETRIEVAL_K, RETRIEVAL_FETCH_K, RRF_K
+from scripts.bm25_index import BM25Index
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[Document]], k: int, rrf_k: int = RRF_K
+) -> list[Document]:
+    """Fuses ranked lists by summing 1 / (rrf_k + rank) per chunk."""
+    scores, documents = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = (doc.metadata.get("source"), doc.page_content)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[key] for key in best]
+
+
+class HybridRetriever:
+    """
+    Drop-in replacement for the Chroma retriever that fuses dense and BM25
+    rankings. Questions citing a CELEX or document number known to the index
+    are answered from the inverted index alone, without embedding the query.
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        bm25: BM25Index,
+        k: int = RETRIEVAL_K,
+        fetch_k: int = RETRIEVAL_FETCH_K,
+        rrf_k: int = RRF_K,
+    ):
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.search_kwargs = {"k": k}
+        self.fetch_k = max(fetch_k, k)
+        self.rrf_k = rrf_k
+
+    def fuse(self, dense: list[Document], sparse: list[Document]) -> list[Document]:
+        return reciprocal_rank_fusion(
+            [dense, sparse], self.search_kwargs["k"], self.rrf_k
+        )
+
+    def invoke(self, query: str, filter: dict | None = None) -> list[Document]:
+        k = self.search_kwargs["k"]
+        category = (filter or {}).get("category")
+
+        exact = self.bm25.lookup_ids(query, k)
+        if category is not None:
+            exact = [doc for doc in exact if doc.metadata["category"] == category]
+        if exact:
+            return exact
+
+        dense = self.vectorstore.similarity_search(query, k=self.fetch_k, filter=filter)
+        sparse = self.bm25.search(query, self.fetch_k, category)
+        return self.fuse(dense, sparse)
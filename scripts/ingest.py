@@ -0,0 +1,213 @@
+# scripts/ingest.py
+
+from collections.abc import Callable, Iterable
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+from chromadb.config import Settings
+from config import INGEST_BATCH_SIZE, INGEST_WORKERS, INGEST_QUEUE_BATCHES
+from scripts.tracing import span
+import chromadb
+import queue
+import threading
+import time
+
+# How often blocked queue operations check whether the run was aborted
+POLL_INTERVAL = 0.1
+# langchain-chroma's default collection, the one every store here reads
+COLLECTION_NAME = "langchain"
+
+
+@dataclass
+class IngestItem:
+    """The chunks of one file. on_written runs once all of them are stored."""
+
+    ids: list[str]
+    texts: list[str]
+    metadatas: list[dict]
+    on_written: Callable[[], None] | None = None
+
+
+@dataclass
+class IngestStats:
+    items: int = 0
+    chunks: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class _Batch:
+    ids: list[str] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+    metadatas: list[dict] = field(default_factory=list)
+    # (item, number of its chunks in this batch)
+    segments: list[tuple[IngestItem, int]] = field(default_factory=list)
+    embeddings: list[list[float]] | None = None
+
+
+def open_collection(persist_dir: Path) -> chromadb.Collection:
+    """
+    The chromadb collection of the store in persist_dir. The client is opened
+    with the settings Chroma uses for a persist_directory, so both share one
+    client per directory.
+    """
+    client = chromadb.Client(
+        Settings(is_persistent=True, persist_directory=str(persist_dir))
+    )
+    return client.get_or_create_collection(COLLECTION_NAME, embedding_function=None)
+
+
+class IngestionEngine:
+    """
+    Three-stage ingestion pipeline. A producer thread pulls items (reading and
+    splitting files happens inside the iterable) and packs their chunks into
+    batches of batch_size; workers embed batches concurrently; the calling
+    thread upserts each embedded batch with its vectors in one call to the
+    store's chromadb collection. Both queues hold at most queue_batches
+    batches, so memory stays bounded however large the corpus is. Any
+    embedder works, including a local fake.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        batch_size: int = INGEST_BATCH_SIZE,
+        workers: int = INGEST_WORKERS,
+        queue_batches: int = INGEST_QUEUE_BATCHES,
+    ):
+        self.embedding = embedding
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.queue_batches = max(1, queue_batches)
+
+    def run(
+        self, collection: chromadb.Collection, items: Iterable[IngestItem]
+    ) -> IngestStats:
+        start = time.perf_counter()
+        stats = IngestStats()
+        chunk_queue = queue.Queue(maxsize=self.queue_batches)
+        write_queue = queue.Queue(maxsize=self.queue_batches)
+        stop = threading.Event()
+        remaining: dict[int, int] = {}
+
+        def put(q: queue.Queue, value) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(value, timeout=POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            return None
+
+        def produce():
+            try:
+                batch = _Batch()
+                for item in items:
+                    if stop.is_set():
+                        return
+                    remaining[id(item)] = len(item.ids)
+                    # Files without chunks still ride along to get on_written
+                    batch.segments.append((item, 0))
+                    for chunk in zip(item.ids, item.texts, item.metadatas):
+                        batch.ids.append(chunk[0])
+                        batch.texts.append(chunk[1])
+                        batch.metadatas.append(chunk[2])
+                        if batch.segments and batch.segments[-1][0] is item:
+                            batch.segments[-1] = (item, batch.segments[-1][1] + 1)
+                        else:
+                            batch.segments.append((item, 1))
+                        if len(batch.ids) >= self.batch_size:
+                            if not put(chunk_queue, batch):
+                                return
+                            batch = _Batch()
+                if batch.segments:
+                    put(chunk_queue, batch)
+            except BaseException as exc:
+                put(write_queue, exc)
+            finally:
+                for _ in range(self.workers):
+                    put(chunk_queue, None)
+
+        def embed():
+            try:
+                while (batch := get(chunk_queue)) is not None:
+                    if batch.texts:
+                        with span("embed", items=len(batch.texts)):
+                            batch.embeddings = self.embedding.embed_documents(
+                                batch.texts
+                            )
+                    if not put(write_queue, batch):
+                        return
+            except BaseException as exc:
+                put(write_queue, exc)
+            finally:
+                put(write_queue, None)
+
+        # Each thread runs in a copy of this context, so its spans nest under ours
+        threads = [
+            threading.Thread(
+                target=copy_context().run,
+                args=(produce,),
+                name="ingest-reader",
+                daemon=True,
+            )
+        ]
+        threads += [
+            threading.Thread(
+                target=copy_context().run,
+                args=(embed,),
+                name=f"ingest-embed-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        try:
+            while finished < self.workers:
+                batch = write_queue.get()
+                if batch is None:
+                    finished += 1
+                    continue
+                if isinstance(batch, BaseException):
+                    raise batch
+                if batch.ids:
+                    with span("upsert", items=len(batch.ids)):
+                        collection.upsert(
+                            ids=batch.ids,
+                            embeddings=batch.embeddings,
+                            documents=batch.texts,
+                            metadatas=batch.metadatas,
+                        )
+                    stats.chunks += len(batch.ids)
+                    stats.batches += 1
+                for item, count in batch.segments:
+                    remaining[id(item)] -= count
+                    if remaining[id(item)] == 0:
+                        del remaining[id(item)]
+                        stats.items += 1
+                        if item.on_written:
+                            item.on_written()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        stats.seconds = time.perf_counter() - start
+        return stats
@@ -0,0 +1,170 @@
+# scripts/llm_engine.py
+
+from collections.abc import Hashable
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    LLM_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_RETRIES,
+)
+from scripts.tracing import current_span, record_usage
+import asyncio
+import random
+import time
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int = 0) -> int:
+    # Rough chars-per-token estimate, good enough for rate limiting
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+class RateLimiter:
+    """Token bucket limiting both requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed * self.requests_per_minute / 60,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60,
+        )
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                    0.01,
+                )
+                await asyncio.sleep(wait)
+
+
+class LLMEngine:
+    """
+    Runs chat completions concurrently under a concurrency cap and a shared
+    RPM/TPM budget, retrying 429/5xx and connection errors with jittered
+    exponential backoff. Set OPENAI_BASE_URL to run against a local fake server.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = LLM_CONCURRENCY,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_url: str | None = OPENAI_BASE_URL,
+    ):
+        # Retries are handled here so they share the rate limiter
+        self.client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY, base_url=base_url, max_retries=0
+        )
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        if response is not None and response.headers.get("retry-after"):
+            try:
+                return float(response.headers["retry-after"])
+            except ValueError:
+                pass
+        cap = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2**attempt)
+        return random.uniform(cap / 2, cap)
+
+    async def complete(self, messages: list[dict], **kwargs) -> str:
+        kwargs.setdefault("model", OPENAI_MODEL)
+        tokens = estimate_tokens(messages, kwargs.get("max_tokens") or 0)
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._limiter.acquire(tokens)
+                try:
+                    response = await self.client.chat.completions.create(
+                        messages=messages, **kwargs
+                    )
+                    record_usage(response.usage)
+                    return response.choices[0].message.content.strip()
+                except (APIConnectionError, APIStatusError) as e:
+                    retryable = (
+                        isinstance(e, APIConnectionError)
+                        or e.status_code in RETRYABLE_STATUS_CODES
+                    )
+                    if not retryable or attempt == self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    current_span().add(llm_retries=1)
+                    print(
+                        f"⚠️ LLM request failed ({e.__class__.__name__}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+    async def complete_many(
+        self, requests: dict[Hashable, dict]
+    ) -> dict[Hashable, str]:
+        keys = list(requests)
+        results = await asyncio.gather(
+            *(self.complete(**requests[key]) for key in keys), return_exceptions=True
+        )
+
+        completed = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                # Left pending so the next run picks it up again
+                print(f"❌ LLM request failed for {key}: {result}")
+                continue
+            completed[key] = result
+        return completed
+
+    async def close(self):
+        await self.client.close()
+
+
+def run_completions(
+    requests: dict[Hashable, dict], **engine_kwargs
+) -> dict[Hashable, str]:
+    """
+    Runs a batch of chat completion requests keyed by document and returns the
+    response text per key, in request order. Failed requests are left out.
+    """
+    if not requests:
+        return {}
+
+    async def _run():
+        engine = LLMEngine(**engine_kwargs)
+        try:
+            return await engine.complete_many(requests)
+        finally:
+            await engine.close()
+
+    return asyncio.run(_run())
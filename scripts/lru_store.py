@@ -0,0 +1,108 @@
+# scripts/lru_store.py
+
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+# SQLite's default limit on host parameters per statement is 999
+LOOKUP_BATCH_SIZE = 500
+# Past max_entries the store is evicted down to this share of it, so the
+# eviction (and its row count) runs once per batch of inserts, not per insert
+EVICT_TO_FRACTION = 0.9
+
+
+class SQLiteLRUStore:
+    """
+    Key → value table in a SQLite file (WAL mode, safe to share across
+    threads) with a last_used timestamp per row. Reads refresh the timestamp,
+    and once the table grows past max_entries the least recently used rows
+    are deleted. Values are stored as given, bytes or text.
+    """
+
+    def __init__(
+        self, path: Path, table: str, value_column: str, max_entries: int
+    ):
+        self.table = table
+        self.value_column = value_column
+        self.max_entries = max_entries
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"key TEXT PRIMARY KEY, {value_column} NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)"
+        )
+        self._conn.commit()
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        self._count = count
+
+    def get_many(self, keys: list[str]) -> dict:
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[i : i + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, {self.value_column} FROM {self.table} "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET last_used = ? "
+                        f"WHERE key IN ({placeholders})",
+                        [now, *batch],
+                    )
+            self._conn.commit()
+        return found
+
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: list[tuple[str, object]]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} "
+                f"(key, {self.value_column}, last_used) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items],
+            )
+            # Upper bound (replaced keys count too), made exact when evicting
+            self._count += len(items)
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def put(self, key: str, value):
+        self.put_many([(key, value)])
+
+    def _evict(self):
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        if count > self.max_entries:
+            keep = int(self.max_entries * EVICT_TO_FRACTION)
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)",
+                (count - keep,),
+            )
+            count = keep
+        self._count = count
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
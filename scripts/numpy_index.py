@@ -0,0 +1,290 @@
+# scripts/numpy_index.py
+
+from pathlib import Path
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from config import (
+    VECTORSTORE_DIR,
+    NUMPY_INDEX_DTYPE,
+    NUMPY_INDEX_IVF_LISTS,
+    NUMPY_INDEX_IVF_PROBES,
+)
+import json
+import numpy as np
+import os
+import shutil
+
+# Flat (optionally IVF-partitioned) vector index kept next to the Chroma store
+NUMPY_INDEX_DIR_NAME = "numpy_index"
+EXPORT_BATCH_SIZE = 5000
+SEARCH_BLOCK_ROWS = 16384
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 50_000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12)
+
+
+def _kmeans(vectors: np.ndarray, n_lists: int, seed: int = 0) -> np.ndarray:
+    # Spherical k-means on a sample, enough to partition a few 100k rows
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE_SIZE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE_SIZE, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for i in range(n_lists):
+            members = vectors[assignment == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+        block = vectors[start : start + SEARCH_BLOCK_ROWS]
+        lists[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return lists
+
+
+def build_numpy_index(
+    db,
+    persist_dir: Path = VECTORSTORE_DIR,
+    dtype: str = NUMPY_INDEX_DTYPE,
+    ivf_lists: int = NUMPY_INDEX_IVF_LISTS,
+) -> int:
+    """
+    Exports the Chroma collection to a flat index: normalized embeddings in one
+    .npy file (float32, or int8 with a per-row scale), rows ordered by category
+    and IVF list so that every (category, list) pair is a contiguous row range,
+    and a sidecar with the chunk texts and metadata. ivf_lists=0 keeps a single
+    list per category for exact search. Returns the number of rows.
+    """
+    ids, texts, sources, categories, vectors = [], [], [], [], []
+    offset = 0
+    while True:
+        batch = db.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=EXPORT_BATCH_SIZE,
+            offset=offset,
+        )
+        if not batch["ids"]:
+            break
+        ids.extend(batch["ids"])
+        texts.extend(batch["documents"])
+        sources.extend(metadata["source"] for metadata in batch["metadatas"])
+        categories.extend(metadata["category"] for metadata in batch["metadatas"])
+        vectors.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        offset += len(batch["ids"])
+
+    index_dir = Path(persist_dir) / NUMPY_INDEX_DIR_NAME
+    if not ids:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        return 0
+
+    vectors = _normalize(np.concatenate(vectors))
+    category_names = sorted(set(categories))
+    category_codes = np.asarray(
+        [category_names.index(c) for c in categories], dtype=np.int32
+    )
+
+    n_lists = min(ivf_lists, len(vectors)) if ivf_lists else 1
+    centroids = _kmeans(vectors, n_lists) if n_lists > 1 else None
+    lists = _assign(vectors, centroids) if centroids is not None else None
+    if lists is None:
+        lists = np.zeros(len(vectors), dtype=np.int32)
+
+    order = np.lexsort((lists, category_codes))
+    vectors, category_codes, lists = vectors[order], category_codes[order], lists[order]
+
+    # list_offsets[c, l] is the first row of list l in category c
+    counts = np.zeros((len(category_names), n_lists), dtype=np.int64)
+    np.add.at(counts, (category_codes, lists), 1)
+    list_offsets = np.zeros((len(category_names), n_lists + 1), dtype=np.int64)
+    list_offsets[:, 1:] = np.cumsum(counts, axis=1)
+    list_offsets += np.concatenate([[0], np.cumsum(counts.sum(axis=1))[:-1]])[:, None]
+
+    tmp_dir = index_dir.with_name(f"{NUMPY_INDEX_DIR_NAME}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        quantized = np.round(vectors / (scales[:, None] + 1e-12)).astype(np.int8)
+        np.save(tmp_dir / "vectors.npy", quantized)
+        np.save(tmp_dir / "scales.npy", scales.astype(np.float32))
+    elif dtype == "float32":
+        np.save(tmp_dir / "vectors.npy", vectors)
+    else:
+        raise ValueError(f"Unknown numpy index dtype: {dtype}")
+
+    np.save(tmp_dir / "list_offsets.npy", list_offsets)
+    if centroids is not None:
+        np.save(tmp_dir / "ivf_centroids.npy", centroids)
+
+    encoded = [texts[i].encode("utf-8") for i in order]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in encoded], out=text_offsets[1:])
+    np.save(tmp_dir / "text_offsets.npy", text_offsets)
+    (tmp_dir / "texts.bin").write_bytes(b"".join(encoded))
+    np.save(tmp_dir / "doc_categories.npy", category_codes.astype(np.int16))
+    with open(tmp_dir / "chunks.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "ids": [ids[i] for i in order],
+                "sources": [sources[i] for i in order],
+                "categories": category_names,
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    # Swap the new index in; readers only ever see a complete directory
+    old_dir = index_dir.with_name(f"{NUMPY_INDEX_DIR_NAME}.old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if index_dir.exists():
+        os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(ids)
+
+
+class NumpyRetriever:
+    """Minimal stand-in for the vector store retriever used by rag_interface."""
+
+    def __init__(self, vectorstore: "NumpyVectorIndex", search_kwargs: dict):
+        self.vectorstore = vectorstore
+        self.search_kwargs = search_kwargs
+
+    def invoke(self, query: str, filter: dict | None = None) -> list[Document]:
+        return self.vectorstore.similarity_search(
+            query, k=self.search_kwargs.get("k", 4), filter=filter
+        )
+
+
+class NumpyVectorIndex:
+    """
+    Read-only vector store over the files written by build_numpy_index. All
+    arrays are memory mapped. Search is a blocked matrix product over the row
+    ranges of the requested category (and, with IVF, of the n_probes lists
+    closest to the query), followed by a top-k partition.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        embeddings: Embeddings,
+        n_probes: int = NUMPY_INDEX_IVF_PROBES,
+    ):
+        self.embeddings = embeddings
+        self.n_probes = n_probes
+        self.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+        self.scales = (
+            np.load(index_dir / "scales.npy", mmap_mode="r")
+            if (index_dir / "scales.npy").exists()
+            else None
+        )
+        self.list_offsets = np.load(index_dir / "list_offsets.npy")
+        self.centroids = (
+            np.load(index_dir / "ivf_centroids.npy")
+            if (index_dir / "ivf_centroids.npy").exists()
+            else None
+        )
+        self.text_offsets = np.load(index_dir / "text_offsets.npy", mmap_mode="r")
+        self.texts = np.memmap(index_dir / "texts.bin", dtype=np.uint8, mode="r")
+        self.doc_categories = np.load(index_dir / "doc_categories.npy", mmap_mode="r")
+        with open(index_dir / "chunks.json", "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        self.ids = chunks["ids"]
+        self.sources = chunks["sources"]
+        self.categories = chunks["categories"]
+
+    @classmethod
+    def load(
+        cls, embeddings: Embeddings, persist_dir: Path = VECTORSTORE_DIR
+    ) -> "NumpyVectorIndex | None":
+        index_dir = Path(persist_dir) / NUMPY_INDEX_DIR_NAME
+        if not (index_dir / "chunks.json").exists():
+            return None
+        return cls(index_dir, embeddings)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def as_retriever(self, search_kwargs: dict | None = None) -> NumpyRetriever:
+        return NumpyRetriever(self, search_kwargs or {})
+
+    def document(self, row: int) -> Document:
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return Document(
+            page_content=bytes(self.texts[start:end]).decode("utf-8"),
+            metadata={
+                "category": self.categories[self.doc_categories[row]],
+                "source": self.sources[row],
+            },
+        )
+
+    def _ranges(self, query: np.ndarray, category: str | None) -> list[tuple[int, int]]:
+        if category is None:
+            codes = range(len(self.categories))
+        elif category in self.categories:
+            codes = [self.categories.index(category)]
+        else:
+            return []
+
+        if self.centroids is None:
+            lists = [0]
+        else:
+            probes = min(self.n_probes, len(self.centroids))
+            lists = np.argpartition(-(self.centroids @ query), probes - 1)[:probes]
+
+        ranges = []
+        for code in codes:
+            for i in lists:
+                start, end = self.list_offsets[code, i], self.list_offsets[code, i + 1]
+                if end > start:
+                    ranges.append((int(start), int(end)))
+        return ranges
+
+    def _scores(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        if self.scales is None:
+            return self.vectors[start:end] @ query
+        # Dequantize block by block so the product still runs through BLAS
+        block = self.vectors[start:end].astype(np.float32)
+        return (block @ query) * self.scales[start:end]
+
+    def search(
+        self, vector: list[float], k: int, category: str | None = None
+    ) -> list[tuple[int, float]]:
+        """Returns the k closest (row, cosine similarity) pairs, best first."""
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+
+        for range_start, range_end in self._ranges(query, category):
+            for start in range(range_start, range_end, SEARCH_BLOCK_ROWS):
+                end = min(start + SEARCH_BLOCK_ROWS, range_end)
+                rows = np.concatenate([best_rows, np.arange(start, end)])
+                scores = np.concatenate([best_scores, self._scores(start, end, query)])
+                if len(rows) > k:
+                    keep = np.argpartition(-scores, k)[:k]
+                    rows, scores = rows[keep], scores[keep]
+                best_rows, best_scores = rows, scores
+
+        order = np.argsort(-best_scores, kind="stable")
+        return [(int(best_rows[i]), float(best_scores[i])) for i in order]
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, filter: dict | None = None
+    ) -> list[Document]:
+        category = (filter or {}).get("category")
+        return [self.document(row) for row, _ in self.search(embedding, k, category)]
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: dict | None = None
+    ) -> list[Document]:
+        vector = self.embeddings.embed_query(query)
+        return self.similarity_search_by_vector(vector, k, filter)
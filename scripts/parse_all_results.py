@@ -1,96 +1,109 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
-import time
 import json
 from urllib.parse import urljoin
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
+from functools import partial
 from config import (
     METADATA_JSON,
     BASE_URL,
     DEFAULT_TARGET_YEAR,
     build_query_url,
     CATEGORY_QUERY_PARAMS,
+    SCRAPER_WORKERS,
 )
+from scripts.webdriver_pool import WebDriverPool
 
 
-def parse_all_results(target_year=DEFAULT_TARGET_YEAR):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
-
-    driver.set_page_load_timeout(300)
+def _scrape_category(
+    pool: WebDriverPool, category: str, target_year: int
+) -> list[dict]:
+    print(f"[i] Scraping category: {category}")
     results_data = []
 
-    for category, query_param in CATEGORY_QUERY_PARAMS.items():
-        print(f"[i] Scraping category: {category}")
-
-        page = 1  # ✅ Only scrape page 1
-        driver.get(build_query_url(target_year, page, category))
-        time.sleep(5)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+    page = 1  # ✅ Only scrape page 1
+    html = pool.fetch(
+        build_query_url(target_year, page, category),
+        wait_for=(By.ID, "MainContent"),
+    )
+    soup = BeautifulSoup(html, "html.parser")
 
-        try:
-            results_info = soup.select_one("div.ResultsToolsWrapper strong:last-child")
-            total_results = int(results_info.text.strip()) if results_info else 0
-            print(f"    Total results: {total_results}. Scraping only page 1.")
-
-            print(f"    Processing page {page}/1 for {category}")
-            search_results = soup.select(".SearchResult")
-
-            for div in search_results:
-                a_tag = div.find("h2").find("a") if div.find("h2") else None
-                if not a_tag:
-                    continue
-
-                title = a_tag.text.strip()
-                full_link = urljoin(BASE_URL, a_tag.get("href"))
-
-                celex = None
-                date_str = None
-
-                try:
-                    collapse_panel = div.find("div", class_="CollapsePanel-sm")
-                    result_data = collapse_panel.find(
-                        "div", class_=lambda x: x and "SearchResultData" in x
-                    )
-                    row_div = result_data.find("div", class_="row")
-                    col_sm_6_list = row_div.find_all("div", class_="col-sm-6")
-
-                    if len(col_sm_6_list) >= 2:
-                        dl1 = col_sm_6_list[0].find("dl")
-                        dl2 = col_sm_6_list[1].find("dl")
-
-                        if dl1:
-                            for dt, dd in zip(dl1.find_all("dt"), dl1.find_all("dd")):
-                                if "CELEX number" in dt.text:
-                                    celex = dd.text.strip()
-
-                        if dl2 and len(dl2.find_all("dd")) >= 2:
-                            raw_text = dl2.find_all("dd")[1].text.strip()
-                            date_str = raw_text.split(";")[0].strip()
-                except Exception as e:
-                    print(f"[!] Error extracting details: {e}")
-
-                if celex:
-                    results_data.append(
-                        {
-                            "celex": celex,
-                            "title": title,
-                            "link": full_link,
-                            "date": date_str,
-                            "page": page,
-                            "category": category,
-                        }
-                    )
-
-        except Exception as e:
-            print(f"❌ Error processing category '{category}': {e}")
-
-    driver.quit()
+    try:
+        results_info = soup.select_one("div.ResultsToolsWrapper strong:last-child")
+        total_results = int(results_info.text.strip()) if results_info else 0
+        print(f"    Total results: {total_results}. Scraping only page 1.")
+
+        print(f"    Processing page {page}/1 for {category}")
+        search_results = soup.select(".SearchResult")
+
+        for div in search_results:
+            a_tag = div.find("h2").find("a") if div.find("h2") else None
+            if not a_tag:
+                continue
+
+            title = a_tag.text.strip()
+            full_link = urljoin(BASE_URL, a_tag.get("href"))
+
+            celex = None
+            date_str = None
+
+            try:
+                collapse_panel = div.find("div", class_="CollapsePanel-sm")
+                result_data = collapse_panel.find(
+                    "div", class_=lambda x: x and "SearchResultData" in x
+                )
+                row_div = result_data.find("div", class_="row")
+                col_sm_6_list = row_div.find_all("div", class_="col-sm-6")
+
+                if len(col_sm_6_list) >= 2:
+                    dl1 = col_sm_6_list[0].find("dl")
+                    dl2 = col_sm_6_list[1].find("dl")
+
+                    if dl1:
+                        for dt, dd in zip(dl1.find_all("dt"), dl1.find_all("dd")):
+                            if "CELEX number" in dt.text:
+                                celex = dd.text.strip()
+
+                    if dl2 and len(dl2.find_all("dd")) >= 2:
+                        raw_text = dl2.find_all("dd")[1].text.strip()
+                        date_str = raw_text.split(";")[0].strip()
+            except Exception as e:
+                print(f"[!] Error extracting details: {e}")
+
+            if celex:
+                results_data.append(
+                    {
+                        "celex": celex,
+                        "title": title,
+                        "link": full_link,
+                        "date": date_str,
+                        "page": page,
+                        "category": category,
+                    }
+                )
+
+    except Exception as e:
+        print(f"❌ Error processing category '{category}': {e}")
+
+    return results_data
+
+
+def parse_all_results(
+    target_year=DEFAULT_TARGET_YEAR, workers: int = SCRAPER_WORKERS
+):
+    # Categories are scraped in parallel, results are merged in a fixed order
+    scraped = {}
+    scrape = partial(_scrape_category, target_year=target_year)
+    with WebDriverPool(min(workers, len(CATEGORY_QUERY_PARAMS))) as pool:
+        for category, result in pool.map(scrape, CATEGORY_QUERY_PARAMS):
+            if isinstance(result, Exception):
+                print(f"❌ Error processing category '{category}': {result}")
+                result = []
+            scraped[category] = result
+
+    results_data = [
+        entry for category in CATEGORY_QUERY_PARAMS for entry in scraped[category]
+    ]
 
     try:
         with open(METADATA_JSON, "r", encoding="utf-8") as f:
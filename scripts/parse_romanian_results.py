@@ -1,11 +1,7 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
-import time
 import json
 from urllib.parse import urljoin
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import os
 import sys
@@ -13,6 +9,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from config import BASE_URL_RO, METADATA_JSON_RO, DEFAULT_TARGET_YEAR
+from scripts.webdriver_pool import WebDriverPool
 
 # Limit to one page per category
 MAX_PAGE_PER_CATEGORY = 1
@@ -32,21 +29,16 @@ def parse_all_results_ro(target_year=DEFAULT_TARGET_YEAR):
     This version only scrapes one page per category.
     """
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
-
-    driver.set_page_load_timeout(253)
     results_data = []
 
     # Only load the first page
     page = 1
     print(f"\n[+] Processing page {page}...")
-    driver.get(build_query_url(target_year, page))
-    time.sleep(5)
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    with WebDriverPool(size=1, page_load_timeout=253) as pool:
+        html = pool.fetch(
+            build_query_url(target_year, page), wait_for=(By.ID, "MainContent")
+        )
+    soup = BeautifulSoup(html, "html.parser")
 
     try:
         # Extract total results info for logging (optional)
@@ -132,8 +124,6 @@ def parse_all_results_ro(target_year=DEFAULT_TARGET_YEAR):
     except Exception as e:
         print("❌ General error:", e)
 
-    driver.quit()
-
     # Merge with existing JSON
     existing_data = []
     try:
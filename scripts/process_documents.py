@@ -0,0 +1,177 @@
+# scripts/process_documents.py
+
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from config import (
+    SUMMARY_DIR,
+    SUMMARY_MODE,
+    PIPELINE_MAX_IN_FLIGHT,
+    PIPELINE_INDEX_SAVE_EVERY,
+)
+from scripts.categorize import build_categorize_request, parse_category
+from scripts.sanitize import sanitize_text
+from scripts.section_cache import SectionSummaryCache
+from scripts.summarize import summarize_document
+from scripts.llm_engine import LLMEngine
+from scripts.processed_index import ProcessedIndex, content_hash
+from scripts.run_journal import RunJournal
+from scripts.tracing import span
+import asyncio
+import os
+
+
+def write_summary(
+    summary_dir: Path, category: str, relative_path: str, summary: str
+) -> Path:
+    output_path = Path(summary_dir) / category / relative_path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so an interrupted run never leaves a partial summary
+    tmp_path = output_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(summary)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+async def _process_document(
+    engine: LLMEngine,
+    relative_path: str,
+    content: str,
+    raw_hash: str,
+    journal: RunJournal | None = None,
+    section_cache: SectionSummaryCache | None = None,
+) -> tuple[str, str]:
+    doc = Path(relative_path).name
+    entry = journal.get(doc) if journal else {}
+    if entry.get("raw_hash") != raw_hash:
+        entry = {}
+
+    # Reuse journaled outputs so a rerun never pays for the same call twice
+    with span("categorize", items=1) as stage:
+        if "category" in entry:
+            category = entry["category"]
+            stage.add(cache_hits=1)
+        else:
+            stage.add(cache_misses=1)
+            category = parse_category(
+                await engine.complete(**build_categorize_request(content))
+            )
+            if journal:
+                journal.record(doc, "categorize", raw_hash=raw_hash, category=category)
+
+    with span("sanitize", items=1):
+        sanitized = sanitize_text(content)
+        sanitized_hash = content_hash(sanitized)
+
+    with span("summarize", items=1) as stage:
+        if "summary" in entry and entry.get("sanitized_hash") == sanitized_hash:
+            summary = entry["summary"]
+            stage.add(cache_hits=1)
+        else:
+            stage.add(cache_misses=1)
+            summary = await summarize_document(engine, sanitized, section_cache)
+            if journal:
+                journal.record(
+                    doc,
+                    "summarize",
+                    raw_hash=raw_hash,
+                    sanitized_hash=sanitized_hash,
+                    summary=summary,
+                )
+    return category, summary
+
+
+async def _run_documents(
+    documents: Iterable[tuple[str, str]],
+    index: ProcessedIndex,
+    on_result: Callable[[str, str, str, str], None],
+    max_in_flight: int,
+    journal: RunJournal | None = None,
+):
+    """
+    Pulls documents lazily and keeps at most max_in_flight of them in the
+    categorize → sanitize → summarize stage at once. on_result is called with
+    (relative_path, raw_hash, category, summary) as soon as a document is done.
+    """
+    engine = LLMEngine()
+    section_cache = SectionSummaryCache() if SUMMARY_MODE == "map_reduce" else None
+    in_flight = {}
+
+    def _handle(done):
+        for task in done:
+            relative_path, raw_hash = in_flight.pop(task)
+            try:
+                category, summary = task.result()
+            except Exception as e:
+                print(f"❌ Failed to process {relative_path}: {e}")
+                continue
+            on_result(relative_path, raw_hash, category, summary)
+
+    try:
+        for relative_path, content in documents:
+            celex_filename = Path(relative_path).name
+            raw_hash = content_hash(content)
+            if index.is_processed(celex_filename, raw_hash):
+                print(f"⏭️ Skipping {celex_filename} (already summarized)")
+                continue
+
+            task = asyncio.create_task(
+                _process_document(
+                    engine, relative_path, content, raw_hash, journal, section_cache
+                )
+            )
+            in_flight[task] = (relative_path, raw_hash)
+            if len(in_flight) >= max_in_flight:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                _handle(done)
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            _handle(done)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await engine.close()
+        if section_cache is not None:
+            section_cache.close()
+
+
+def stream_documents(
+    documents: Iterable[tuple[str, str]],
+    index: ProcessedIndex | None = None,
+    summary_dir: Path = SUMMARY_DIR,
+    max_in_flight: int = PIPELINE_MAX_IN_FLIGHT,
+    progress: Callable[[str], None] = print,
+    journal: RunJournal | None = None,
+) -> int:
+    """
+    Fused categorize → sanitize → summarize stage. Documents are read one by
+    one, at most max_in_flight are held in memory, and each summary is written
+    to summary_dir (and recorded in the index) as soon as it is produced.
+    With a journal, categories and summaries from an interrupted run are
+    reused instead of being requested again. Returns the number of
+    summaries written.
+    """
+    if index is None:
+        index = ProcessedIndex.load(summary_dir)
+
+    written = 0
+
+    def _write(relative_path, raw_hash, category, summary):
+        nonlocal written
+        summary_path = write_summary(summary_dir, category, relative_path, summary)
+        index.add(Path(relative_path).name, category, raw_hash, summary_path)
+        written += 1
+        progress(f"✅ Summarized {relative_path} → {category}")
+        if written % PIPELINE_INDEX_SAVE_EVERY == 0:
+            index.save()
+
+    try:
+        asyncio.run(
+            _run_documents(documents, index, _write, max_in_flight, journal)
+        )
+    finally:
+        index.save()
+    return written
@@ -0,0 +1,91 @@
+# scripts/processed_index.py
+
+from pathlib import Path
+from config import SUMMARY_DIR, PROCESSED_INDEX_JSON
+import hashlib
+import json
+import os
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ProcessedIndex:
+    """
+    CELEX filename → {category, content_hash, summary_path} for every document
+    that already has a summary. Loaded with a single pass over SUMMARY_DIR so
+    the pipeline stages can check a document in O(1) instead of stat-ing one
+    path per category directory.
+    """
+
+    def __init__(
+        self, summary_dir: Path = SUMMARY_DIR, index_path: Path = PROCESSED_INDEX_JSON
+    ):
+        self.summary_dir = Path(summary_dir)
+        self.index_path = Path(index_path)
+        self.entries: dict[str, dict] = {}
+
+    @classmethod
+    def load(
+        cls, summary_dir: Path = SUMMARY_DIR, index_path: Path = PROCESSED_INDEX_JSON
+    ) -> "ProcessedIndex":
+        index = cls(summary_dir, index_path)
+        try:
+            with open(index.index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            stored = {}
+
+        # Reconcile with what is actually on disk: summaries written before the
+        # index existed are picked up without a hash, deleted ones are dropped
+        if index.summary_dir.exists():
+            for category_dir in index.summary_dir.iterdir():
+                if not category_dir.is_dir():
+                    continue
+                for summary_file in category_dir.rglob("*.txt"):
+                    relative = str(summary_file.relative_to(index.summary_dir))
+                    entry = stored.get(summary_file.name)
+                    if entry and entry["summary_path"] == relative:
+                        index.entries[summary_file.name] = entry
+                    else:
+                        index.entries[summary_file.name] = {
+                            "category": category_dir.name,
+                            "content_hash": None,
+                            "summary_path": relative,
+                        }
+        return index
+
+    def __contains__(self, celex_filename: str) -> bool:
+        return celex_filename in self.entries
+
+    def get(self, celex_filename: str) -> dict | None:
+        return self.entries.get(celex_filename)
+
+    def is_processed(self, celex_filename: str, raw_hash: str | None = None) -> bool:
+        # Summaries without a recorded hash predate the index and count as current
+        entry = self.entries.get(celex_filename)
+        if entry is None:
+            return False
+        return raw_hash is None or entry["content_hash"] in (None, raw_hash)
+
+    def add(
+        self, celex_filename: str, category: str, raw_hash: str, summary_path: Path
+    ):
+        previous = self.entries.get(celex_filename)
+        relative = str(Path(summary_path).relative_to(self.summary_dir))
+        if previous and previous["summary_path"] != relative:
+            # The document was re-categorized, don't leave the old summary behind
+            (self.summary_dir / previous["summary_path"]).unlink(missing_ok=True)
+        self.entries[celex_filename] = {
+            "category": category,
+            "content_hash": raw_hash,
+            "summary_path": relative,
+        }
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
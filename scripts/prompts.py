@@ -0,0 +1,237 @@
+# scripts/prompts.py
+
+from dataclasses import dataclass
+from functools import lru_cache
+from langchain_core.documents import Document
+from config import OPENAI_MODEL, PROMPT_MAX_TOKENS, LOG_TOKEN_USAGE
+from scripts.tracing import record_usage, usage_counts
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Chat format overhead: tokens added around each message, and priming the reply
+MESSAGE_OVERHEAD_TOKENS = 3
+REPLY_OVERHEAD_TOKENS = 3
+# Retrieved documents are joined by blank lines into the prompt's context
+CONTEXT_SEPARATOR = "\n\n"
+
+# Fixed instructions go in the system message, ahead of everything that varies
+# per question, so every call of a stage starts with the same prefix
+CATEGORY_INSTRUCTIONS = (
+    "You are a classifier that determines the correct category of a user's question about European regulations.\n"
+    "Choose exactly one category from the following list:\n"
+)
+CATEGORY_SUFFIX = (
+    "\n\nRespond ONLY with the category name. Do not add any explanation or formatting."
+)
+
+ANSWER_INSTRUCTIONS = (
+    "You are an expert in European regulations. The user message gives a category, context retrieved from "
+    "documents of that category, and a question. "
+    "Use only the context to answer the user's question. The answer may be spread across the whole document. "
+    "Before answering the question, read the document thoroughly. "
+    "If the answer is not in the context, say: 'The information is not available in the provided documents.'"
+)
+
+# Formatting rules shared by the refine step and the single-pass prompt
+FORMAT_GUIDELINES = (
+    "Guidelines:\n"
+    "- Structure the response in full sentences.\n"
+    "- Use formal language but keep it easy to understand.\n"
+    "- Highlight legal points, actions, or obligations where relevant.\n"
+    "- Use bullet points or paragraphs only if it improves clarity.\n"
+)
+
+REFINE_INSTRUCTIONS = (
+    "You are a professional legal assistant helping a user understand European Union regulations. "
+    "Your task is to take the raw answer in the user message and rewrite it in a clear, organized, and formal tone.\n\n"
+    f"{FORMAT_GUIDELINES}"
+    "- Remove any phrasing artifacts from the LLM that generated the raw answer.\n"
+    "- Do NOT add new facts or assumptions.\n"
+    "- The final response must only be based on the raw answer and the user question."
+)
+
+SINGLE_PASS_INSTRUCTIONS = (
+    "You are a professional legal assistant helping a user understand European Union regulations. "
+    "The user message gives a category, context retrieved from documents of that category, and a question. "
+    "Use only the context to answer the user's question. The answer may be spread across the whole document. "
+    "Before answering the question, read the document thoroughly. "
+    "If the answer is not in the context, say: 'The information is not available in the provided documents.' "
+    "Write the answer in a clear, organized, and formal tone.\n\n"
+    f"{FORMAT_GUIDELINES}"
+    "- Do NOT add facts or assumptions that are not in the context."
+)
+
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    # tiktoken and its BPE ranks are loaded on the first count, not at import
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(OPENAI_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode_ordinary(text))
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    return REPLY_OVERHEAD_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(message["content"])
+        for message in messages
+    )
+
+
+def trim_context(documents: list[Document], budget: int) -> tuple[list[Document], int]:
+    """
+    Cuts retrieved documents down to budget tokens of context. Documents come
+    best first, so whole documents are dropped from the end; a first document
+    that alone is too long is cut on a token boundary. Returns the documents
+    kept and the number of tokens removed.
+    """
+    if not documents:
+        return documents, 0
+    encoding = get_encoding()
+    counts = [
+        len(tokens)
+        for tokens in encoding.encode_ordinary_batch(
+            [doc.page_content for doc in documents]
+        )
+    ]
+    separator = len(encoding.encode_ordinary(CONTEXT_SEPARATOR))
+    total = sum(counts) + separator * (len(documents) - 1)
+    if total <= budget:
+        return documents, 0
+
+    kept, used = [], 0
+    for doc, tokens in zip(documents, counts):
+        cost = tokens + (separator if kept else 0)
+        if used + cost > budget:
+            if not kept and budget > 0:
+                tokens = encoding.encode_ordinary(doc.page_content)[:budget]
+                cut = encoding.decode(tokens)
+                kept.append(Document(page_content=cut, metadata=doc.metadata))
+                used = budget
+            break
+        kept.append(doc)
+        used += cost
+    return kept, total - used
+
+
+@dataclass
+class Prompt:
+    """Messages for one call, with their token count taken before sending."""
+
+    stage: str
+    messages: list[dict]
+    tokens: int
+    trimmed_tokens: int = 0
+
+
+class PromptBuilder:
+    """
+    Assembles the chat prompts of the query path. The system messages (fixed
+    instructions, and the category list, which only changes when the store is
+    rebuilt) are built and counted once; per-call content goes in the user
+    message after them. Prompts carrying retrieved context are counted with
+    tiktoken; the retrieved documents, ranked best first, are trimmed so the
+    whole prompt fits max_prompt_tokens.
+    """
+
+    def __init__(
+        self, categories: list[str], max_prompt_tokens: int = PROMPT_MAX_TOKENS
+    ):
+        self.max_prompt_tokens = max_prompt_tokens
+        formatted_categories = "\n- " + "\n- ".join(categories)
+        self._system = {
+            "category": CATEGORY_INSTRUCTIONS + formatted_categories + CATEGORY_SUFFIX,
+            "answer": ANSWER_INSTRUCTIONS,
+            "refine": REFINE_INSTRUCTIONS,
+            "single_pass": SINGLE_PASS_INSTRUCTIONS,
+        }
+        self._system_tokens = {
+            stage: count_message_tokens([{"role": "system", "content": content}])
+            for stage, content in self._system.items()
+        }
+
+    def _prompt(self, stage: str, user: str, trimmed_tokens: int = 0) -> Prompt:
+        messages = [
+            {"role": "system", "content": self._system[stage]},
+            {"role": "user", "content": user},
+        ]
+        tokens = (
+            self._system_tokens[stage] + MESSAGE_OVERHEAD_TOKENS + count_tokens(user)
+        )
+        return Prompt(stage, messages, tokens, trimmed_tokens)
+
+    def _with_context(
+        self, stage: str, question: str, category: str, documents: list[Document]
+    ) -> Prompt:
+        head = f"Category: {category}\n\nContext:\n"
+        tail = f"\n\nQuestion: {question}\n\nAnswer:"
+        budget = (
+            self.max_prompt_tokens
+            - self._system_tokens[stage]
+            - MESSAGE_OVERHEAD_TOKENS
+            - count_tokens(head + tail)
+        )
+        documents, trimmed = trim_context(documents, budget)
+        context = CONTEXT_SEPARATOR.join(doc.page_content for doc in documents)
+        return self._prompt(stage, head + context + tail, trimmed)
+
+    def category(self, question: str) -> Prompt:
+        return self._prompt("category", question)
+
+    def answer(
+        self, question: str, category: str, documents: list[Document]
+    ) -> Prompt:
+        return self._with_context("answer", question, category, documents)
+
+    def single_pass(
+        self, question: str, category: str, documents: list[Document]
+    ) -> Prompt:
+        return self._with_context("single_pass", question, category, documents)
+
+    def refine(self, raw_answer: str, question: str) -> Prompt:
+        user = (
+            f"User Question: {question}\n\n"
+            f"Raw Answer: {raw_answer}\n\n"
+            "Formatted Answer:"
+        )
+        return self._prompt("refine", user)
+
+
+def log_usage(prompt: Prompt, usage):
+    """Records a call's token usage on the current span and logs it."""
+    record_usage(usage)
+    if usage is None:
+        return
+    prompt_tokens, cached_tokens, completion_tokens = usage_counts(usage)
+    trimmed = (
+        f", {prompt.trimmed_tokens} context tokens trimmed"
+        if prompt.trimmed_tokens
+        else ""
+    )
+    logger.info(
+        "%s: %d prompt tokens (%d counted, %d cached), %d completion tokens%s",
+        prompt.stage,
+        prompt_tokens,
+        prompt.tokens,
+        cached_tokens,
+        completion_tokens,
+        trimmed,
+    )
+
+
+def configure_usage_log(enabled: bool = LOG_TOKEN_USAGE):
+    # Our own handler, so the lines show up under Streamlit's logging setup too
+    if not enabled or logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("🧾 %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
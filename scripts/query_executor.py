@@ -0,0 +1,126 @@
+# scripts/query_executor.py
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from langchain_core.documents import Document
+from config import RETRIEVAL_K, RETRIEVAL_FETCH_K, RRF_K
+from scripts.bm25_index import BM25Index
+from scripts.category_router import CategoryRouter, Route
+from scripts.hybrid_retriever import reciprocal_rank_fusion
+from scripts.tracing import span
+import time
+
+
+@dataclass
+class PreparedQuery:
+    route: Route
+    documents: list[Document]
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def category(self) -> str:
+        return self.route.category
+
+    @property
+    def context(self) -> str:
+        return "\n\n".join([doc.page_content for doc in self.documents])
+
+
+class QueryExecutor:
+    """
+    Takes category detection off the retrieval critical path. The router runs
+    on a worker thread while an unfiltered search fetches fetch_k chunks for the
+    question vector; once the category is known those are filtered locally.
+    Only when fewer than k chunks of that category came back is a filtered
+    search run as a fallback. With a BM25 index the keyword ranking is filtered
+    the same way and fused with the dense one. Stores partitioned by category
+    (searches_by_category) skip the unfiltered search: the keyword search runs
+    alongside the router and a single filtered search follows.
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        router: CategoryRouter,
+        k: int = RETRIEVAL_K,
+        fetch_k: int = RETRIEVAL_FETCH_K,
+        bm25: BM25Index | None = None,
+        rrf_k: int = RRF_K,
+    ):
+        self.vectorstore = vectorstore
+        self.router = router
+        self.k = k
+        self.fetch_k = max(fetch_k, k)
+        self.bm25 = bm25
+        self.rrf_k = rrf_k
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="router")
+
+    def _route(self, question: str, vector: list[float]) -> tuple[Route, float]:
+        start = time.perf_counter()
+        with span("detect") as stage:
+            route = self.router.route(question, vector)
+            stage.set(strategy=route.strategy, confidence=route.confidence)
+        return route, time.perf_counter() - start
+
+    def route_local(self, question: str, vector: list[float]) -> Route | None:
+        """Routes without the chat model, None when no local router is confident."""
+        with span("detect", local=True) as stage:
+            route = self.router.route_local(question, vector)
+            if route is not None:
+                stage.set(strategy=route.strategy, confidence=route.confidence)
+        return route
+
+    def prepare(
+        self, question: str, vector: list[float], route: Route | None = None
+    ) -> PreparedQuery:
+        """
+        Retrieves the context of a question. Without a route (one already
+        found by route_local) the router runs alongside the unfiltered search.
+        """
+        start = time.perf_counter()
+        route_future = None
+        if route is None:
+            route_future = self._pool.submit(
+                copy_context().run, self._route, question, vector
+            )
+
+        by_category = getattr(self.vectorstore, "searches_by_category", False)
+        with span("retrieve", filtered=False):
+            if by_category:
+                dense = []
+            else:
+                dense = self.vectorstore.similarity_search_by_vector(
+                    vector, k=self.fetch_k
+                )
+            sparse = self.bm25.search(question, self.fetch_k) if self.bm25 else []
+        retrieve_time = time.perf_counter() - start
+
+        timings = {"retrieve": retrieve_time}
+        if route_future is not None:
+            route, timings["route"] = route_future.result()
+            timings["route+retrieve"] = time.perf_counter() - start
+
+        def in_category(docs: list[Document]) -> list[Document]:
+            category = route.category
+            return [doc for doc in docs if doc.metadata.get("category") == category]
+
+        dense, sparse = in_category(dense), in_category(sparse)
+        if len(dense) < self.k:
+            fallback_start = time.perf_counter()
+            with span("retrieve", filtered=True):
+                dense = self.vectorstore.similarity_search_by_vector(
+                    vector, k=self.k, filter={"category": route.category}
+                )
+                if self.bm25:
+                    sparse = self.bm25.search(question, self.fetch_k, route.category)
+            timings["retrieve_filtered"] = time.perf_counter() - fallback_start
+
+        if self.bm25:
+            documents = reciprocal_rank_fusion([dense, sparse], self.k, self.rrf_k)
+        else:
+            documents = dense[: self.k]
+        return PreparedQuery(route, documents, timings)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,94 @@
+# scripts/run_journal.py
+
+from pathlib import Path
+from config import PIPELINE_JOURNAL
+import json
+import os
+import threading
+import time
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of per-document stage outputs (category,
+    sanitized-text hash, summary, embedded chunk IDs), keyed by CELEX
+    filename. Every paid step is written here the moment it finishes, so a
+    rerun after a crash picks up each document where it stopped.
+    """
+
+    def __init__(self, path: Path = PIPELINE_JOURNAL):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = PIPELINE_JOURNAL) -> "RunJournal":
+        journal = cls(path)
+        try:
+            with open(journal.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash, everything before it is intact
+                        continue
+                    journal._apply(record)
+        except FileNotFoundError:
+            pass
+        return journal
+
+    def _apply(self, record: dict):
+        doc = record["doc"]
+        entry = self.entries.get(doc, {})
+        raw_hash = record.get("raw_hash")
+        if raw_hash and entry.get("raw_hash") not in (None, raw_hash):
+            # The raw document changed, earlier stage outputs no longer apply
+            entry = {}
+        entry.update(
+            {k: v for k, v in record.items() if k not in ("doc", "stage", "ts")}
+        )
+        self.entries[doc] = entry
+
+    def get(self, doc: str) -> dict:
+        return self.entries.get(doc, {})
+
+    def _terminate_partial_line(self):
+        # A line cut short by a crash must not swallow the next record
+        try:
+            with open(self.path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        except FileNotFoundError:
+            pass
+
+    def record(self, doc: str, stage: str, **fields):
+        record = {"doc": doc, "stage": stage, "ts": time.time(), **fields}
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._terminate_partial_line()
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._apply(record)
+
+    def compact(self):
+        # Rewrite the journal with one merged line per document
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for doc, entry in self.entries.items():
+                record = {"doc": doc, "stage": "compacted", **entry}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
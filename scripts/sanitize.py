@@ -1,11 +1,18 @@
 import re
 from pathlib import Path
-from config import SUMMARY_DIR
+from scripts.processed_index import ProcessedIndex
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def sanitize_text(content: str) -> str:
+    return WHITESPACE_RE.sub(" ", content).strip()
 
 
 def sanitize_texts(
     categorized_data: dict[str, dict[str, str]],
 ) -> dict[str, dict[str, str]]:
+    index = ProcessedIndex.load()
     sanitized = {}
     for category, files in categorized_data.items():
         sanitized[category] = {}
@@ -13,17 +20,11 @@ def sanitize_texts(
             celex_filename = Path(relative_path).name
 
             # ✅ Skip if already summarized (sanitized step is unnecessary)
-            already_summarized = any(
-                (subdir / celex_filename).exists()
-                for subdir in SUMMARY_DIR.iterdir()
-                if subdir.is_dir()
-            )
-            if already_summarized:
+            if celex_filename in index:
                 print(
                     f"⏭️ Skipping sanitization for {celex_filename} (already summarized)"
                 )
                 continue
 
-            cleaned = re.sub(r"\s+", " ", content).strip()
-            sanitized[category][relative_path] = cleaned
+            sanitized[category][relative_path] = sanitize_text(content)
     return sanitized
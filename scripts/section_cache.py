@@ -0,0 +1,53 @@
+# scripts/section_cache.py
+
+from pathlib import Path
+from config import OPENAI_MODEL, SECTION_CACHE_PATH, SECTION_CACHE_MAX_ENTRIES
+from scripts.lru_store import SQLiteLRUStore
+import hashlib
+import json
+import threading
+
+
+class SectionSummaryCache:
+    """
+    On-disk cache of map-step section summaries, keyed by sha256 of the model
+    and the whole request (prompt, section text), so a section shared by two versions
+    of a document, or already summarized before a failed reduce call, is never
+    paid for twice. Least recently used entries are evicted past max_entries.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path = SECTION_CACHE_PATH,
+        max_entries: int = SECTION_CACHE_MAX_ENTRIES,
+        model: str = OPENAI_MODEL,
+    ):
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._store = SQLiteLRUStore(cache_path, "sections", "summary", max_entries)
+
+    def _key(self, request: dict) -> str:
+        # Requests leave the model to the engine, like every other builder's
+        serialized = json.dumps(
+            {"model": self.model, **request}, sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, request: dict) -> str | None:
+        summary = self._store.get(self._key(request))
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    def put(self, request: dict, summary: str):
+        self._store.put(self._key(request), summary)
+
+    def close(self):
+        self._store.close()
@@ -0,0 +1,146 @@
+# scripts/sharded_store.py
+
+from collections import OrderedDict
+from pathlib import Path
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from config import VECTORSTORE_DIR, VECTORSTORE_OPEN_SHARDS
+import hashlib
+import json
+import os
+import re
+import threading
+
+# One Chroma store per category under <persist_dir>/shards/<shard name>
+SHARDS_DIR_NAME = "shards"
+SHARD_MAP_NAME = "shards.json"
+
+
+def shard_dir_name(category: str) -> str:
+    # Category names contain spaces, commas and slashes ("Others/Unidentified")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", category).strip("_").lower()
+    return f"{slug}-{hashlib.sha256(category.encode('utf-8')).hexdigest()[:8]}"
+
+
+def load_shard_map(persist_dir: Path = VECTORSTORE_DIR) -> dict[str, str]:
+    try:
+        with open(Path(persist_dir) / SHARD_MAP_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_shard_map(shard_map: dict[str, str], persist_dir: Path):
+    map_path = Path(persist_dir) / SHARD_MAP_NAME
+    tmp_path = map_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(shard_map, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, map_path)
+
+
+class ShardReader:
+    """
+    Exposes several Chroma stores through the batched get(include, limit,
+    offset) the index builders use, as if they were a single collection.
+    """
+
+    def __init__(self, dbs: list[Chroma]):
+        self.dbs = dbs
+        # IDs only: the public get() without documents, metadata or vectors
+        self.counts = [len(db.get(include=[])["ids"]) for db in dbs]
+
+    def get(self, include: list[str], limit: int, offset: int) -> dict:
+        for db, count in zip(self.dbs, self.counts):
+            if offset < count:
+                return db.get(
+                    include=include, limit=min(limit, count - offset), offset=offset
+                )
+            offset -= count
+        return {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+
+
+class ShardedRetriever:
+    def __init__(self, vectorstore: "ShardedVectorStore", search_kwargs: dict):
+        self.vectorstore = vectorstore
+        self.search_kwargs = search_kwargs
+
+    def invoke(self, query: str, filter: dict | None = None) -> list[Document]:
+        return self.vectorstore.similarity_search(
+            query, k=self.search_kwargs.get("k", 4), filter=filter
+        )
+
+
+class ShardedVectorStore:
+    """
+    Query side of the sharded layout. A category-filtered search opens only
+    that category's shard, lazily, and keeps the max_open most recently used
+    shards open. Unfiltered searches merge the results of every shard.
+    """
+
+    # Tells QueryExecutor that unfiltered searches are the expensive kind here
+    searches_by_category = True
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        persist_dir: Path = VECTORSTORE_DIR,
+        max_open: int = VECTORSTORE_OPEN_SHARDS,
+    ):
+        self.embeddings = embeddings
+        self.persist_dir = Path(persist_dir)
+        self.max_open = max_open
+        self.shard_map = load_shard_map(persist_dir)
+        self._open: OrderedDict[str, Chroma] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(
+        cls, embeddings: Embeddings, persist_dir: Path = VECTORSTORE_DIR
+    ) -> "ShardedVectorStore | None":
+        if not (Path(persist_dir) / SHARD_MAP_NAME).exists():
+            return None
+        return cls(embeddings, persist_dir)
+
+    def as_retriever(self, search_kwargs: dict | None = None) -> ShardedRetriever:
+        return ShardedRetriever(self, search_kwargs or {})
+
+    def shard(self, category: str) -> Chroma | None:
+        if category not in self.shard_map:
+            return None
+        with self._lock:
+            if category in self._open:
+                self._open.move_to_end(category)
+                return self._open[category]
+            shard_dir = self.persist_dir / SHARDS_DIR_NAME / self.shard_map[category]
+            db = Chroma(
+                persist_directory=str(shard_dir), embedding_function=self.embeddings
+            )
+            self._open[category] = db
+            if len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+            return db
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, filter: dict | None = None
+    ) -> list[Document]:
+        category = (filter or {}).get("category")
+        if category is not None:
+            db = self.shard(category)
+            return db.similarity_search_by_vector(embedding, k=k) if db else []
+
+        # Distances from every shard are comparable, lower is closer
+        scored = []
+        for name in self.shard_map:
+            db = self.shard(name)
+            scored.extend(
+                db.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+            )
+        scored.sort(key=lambda pair: pair[1])
+        return [doc for doc, _ in scored[:k]]
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: dict | None = None
+    ) -> list[Document]:
+        vector = self.embeddings.embed_query(query)
+        return self.similarity_search_by_vector(vector, k, filter)
@@ -1,65 +1,256 @@
 # scripts/summarize.py
 
-from openai import OpenAI
 from config import (
+    OPENAI_MODEL,
     MAX_SUMMARY_TOKENS,
     TRUNCATE_WORDS,
-    OPENAI_MODEL,
-    OPENAI_API_KEY,
-    SUMMARY_DIR,
+    SUMMARY_MODE,
+    SUMMARY_SECTION_TOKENS,
+    SUMMARY_SECTION_SUMMARY_TOKENS,
+    SUMMARY_REDUCE_TOKENS,
 )
+from scripts.chunking import StructureChunker
+from scripts.llm_engine import LLMEngine
+from scripts.processed_index import ProcessedIndex
+from scripts.section_cache import SectionSummaryCache
+from scripts.tracing import record_cache, span
+from functools import lru_cache
 from pathlib import Path
+import asyncio
+
+SUMMARY_SYSTEM_PROMPT = (
+    "Your task is to summarize the following European regulation while maintaining high clarity and relevance. "
+    "The summary must capture the regulation’s title, main objectives, scope, and essential details. "
+    "Follow these strict formatting rules: "
+    "1️⃣ Begin with the **title of the regulation**. "
+    "2️⃣ Use clear, structured sentences for **core legal points**. "
+    "3 Avoid introductory phrases. "
+    "4️⃣ The summary **must be exactly 600 tokens**. "
+    "5️⃣ Adjust sentence length if needed to reach token count."
+)
+
+SECTION_SYSTEM_PROMPT = (
+    "You are summarizing one section of a longer European regulation, as part of a summary of the whole act. "
+    "List the obligations, rights, scope, definitions, deadlines, amounts and referenced acts this section contains, "
+    "naming the Articles and annexes they come from. "
+    "If the section contains the title of the act, start with it. "
+    "Be dense and factual, and do not add introductory phrases."
+)
+
+REDUCE_SYSTEM_PROMPT = (
+    "You are given summaries of consecutive sections of one European regulation, in document order. "
+    "Merge them into a single summary of the whole regulation. "
+    "Follow these strict formatting rules: "
+    "1️⃣ Begin with the **title of the regulation**. "
+    "2️⃣ Use clear, structured sentences for **core legal points**, covering the whole act including its annexes. "
+    "3 Avoid introductory phrases and do not repeat points. "
+    "4️⃣ The summary **must be exactly 600 tokens**. "
+    "5️⃣ Adjust sentence length if needed to reach token count."
+)
+
+
+MERGE_SYSTEM_PROMPT = (
+    "You are given summaries of consecutive sections of one European regulation, in document order. "
+    "Merge them into a single summary of this part of the act, as part of a summary of the whole act. "
+    "Keep the obligations, rights, scope, definitions, deadlines, amounts and referenced acts, "
+    "naming the Articles and annexes they come from. "
+    "If the summaries contain the title of the act, start with it. "
+    "Be dense and factual, do not repeat points and do not add introductory phrases."
+)
+
+
+def build_summary_request(content: str) -> dict:
+    truncated = " ".join(content.split()[:TRUNCATE_WORDS])
+    return {
+        "messages": [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Text:\n{truncated}\n\nSummary:"},
+        ],
+        "max_tokens": MAX_SUMMARY_TOKENS,
+        "temperature": 0.0,
+    }
+
+
+def build_section_request(section: str) -> dict:
+    return {
+        "messages": [
+            {"role": "system", "content": SECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Section:\n{section}\n\nSection summary:"},
+        ],
+        "max_tokens": SUMMARY_SECTION_SUMMARY_TOKENS,
+        "temperature": 0.0,
+    }
+
+
+def build_reduce_request(section_summaries: list[str]) -> dict:
+    sections = "\n\n".join(
+        f"Section {i} of {len(section_summaries)}:\n{summary}"
+        for i, summary in enumerate(section_summaries, start=1)
+    )
+    return {
+        "messages": [
+            {"role": "system", "content": REDUCE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{sections}\n\nSummary:"},
+        ],
+        "max_tokens": MAX_SUMMARY_TOKENS,
+        "temperature": 0.0,
+    }
+
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+def build_merge_request(section_summaries: list[str]) -> dict:
+    sections = "\n\n".join(
+        f"Section {i} of {len(section_summaries)}:\n{summary}"
+        for i, summary in enumerate(section_summaries, start=1)
+    )
+    return {
+        "messages": [
+            {"role": "system", "content": MERGE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{sections}\n\nMerged summary:"},
+        ],
+        "max_tokens": SUMMARY_SECTION_SUMMARY_TOKENS,
+        "temperature": 0.0,
+    }
+
+
+@lru_cache(maxsize=None)
+def _section_chunker() -> StructureChunker:
+    # Sections end on Article / annex boundaries, counted in the chat model's tokens
+    return StructureChunker(
+        chunk_tokens=SUMMARY_SECTION_TOKENS,
+        overlap_tokens=0,
+        min_tokens=SUMMARY_SECTION_TOKENS // 2,
+        model=OPENAI_MODEL,
+    )
+
+
+def split_sections(content: str) -> list[str]:
+    """Splits a document into token-budgeted sections, ending on Article boundaries."""
+    return _section_chunker().split_text(content)
+
+
+def group_summaries(summaries: list[str], budget: int) -> list[list[str]]:
+    """
+    Groups consecutive section summaries so each group fits budget tokens.
+    Every group holds at least two summaries (when there are two left), so
+    each merge level shrinks the list.
+    """
+    counts = _section_chunker().count_tokens(summaries)
+    groups, group, used = [], [], 0
+    for summary, tokens in zip(summaries, counts):
+        if len(group) >= 2 and used + tokens > budget:
+            groups.append(group)
+            group, used = [], 0
+        group.append(summary)
+        used += tokens
+    if len(group) == 1 and groups:
+        groups[-1].append(group[0])
+    elif group:
+        groups.append(group)
+    return groups
+
+
+async def _summarize_section(
+    engine: LLMEngine, section: str, cache: SectionSummaryCache | None
+) -> str:
+    request = build_section_request(section)
+    if cache is not None:
+        cached = cache.get(request)
+        record_cache(int(cached is not None), int(cached is None))
+        if cached is not None:
+            return cached
+    summary = await engine.complete(**request)
+    if cache is not None:
+        cache.put(request, summary)
+    return summary
+
+
+async def summarize_document(
+    engine: LLMEngine,
+    content: str,
+    cache: SectionSummaryCache | None = None,
+    mode: str = SUMMARY_MODE,
+) -> str:
+    """
+    Summarizes one sanitized document. Documents within TRUNCATE_WORDS words,
+    and every document in "truncate" mode, take a single call. In
+    "map_reduce" mode longer ones are split into sections that are summarized
+    concurrently (through the engine's shared limits), then merged in one
+    reduce call; when the section summaries don't fit SUMMARY_REDUCE_TOKENS,
+    groups of neighbouring summaries are merged first, so no section is
+    dropped.
+    """
+    if mode == "truncate" or len(content.split()) <= TRUNCATE_WORDS:
+        return await engine.complete(**build_summary_request(content))
+    if mode != "map_reduce":
+        raise ValueError(f"Unknown summary mode: {mode}")
+
+    sections = split_sections(content)
+    with span("summarize_map", items=len(sections)):
+        summaries = await asyncio.gather(
+            *(_summarize_section(engine, section, cache) for section in sections)
+        )
+    # Too many section summaries for one reduce call: merge neighbours first
+    level = 0
+    while (
+        len(summaries) > 1
+        and sum(_section_chunker().count_tokens(summaries)) > SUMMARY_REDUCE_TOKENS
+    ):
+        level += 1
+        groups = group_summaries(summaries, SUMMARY_REDUCE_TOKENS)
+        with span("summarize_merge", items=len(groups), level=level):
+            summaries = await asyncio.gather(
+                *(engine.complete(**build_merge_request(group)) for group in groups)
+            )
+    with span("summarize_reduce", items=1):
+        return await engine.complete(**build_reduce_request(summaries))
 
 
 def summarize_texts(
     sanitized_data: dict[str, dict[str, str]],
+    mode: str = SUMMARY_MODE,
 ) -> dict[str, dict[str, str]]:
+    index = ProcessedIndex.load()
     summarized = {}
+    pending = {}
     for category, files in sanitized_data.items():
         summarized[category] = {}
         for relative_path, content in files.items():
             celex_filename = Path(relative_path).name
 
             # ✅ Check if summary already exists in any category
-            already_exists = any(
-                (subdir / celex_filename).exists()
-                for subdir in SUMMARY_DIR.iterdir()
-                if subdir.is_dir()
-            )
-
-            if already_exists:
+            if celex_filename in index:
                 print(
                     f"⏭️ Skipping summarization for {celex_filename} (already summarized)"
                 )
                 continue
 
-            truncated = " ".join(content.split()[:TRUNCATE_WORDS])
-            summary = (
-                client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Your task is to summarize the following European regulation while maintaining high clarity and relevance. "
-                                "The summary must capture the regulation’s title, main objectives, scope, and essential details. "
-                                "Follow these strict formatting rules: "
-                                "1️⃣ Begin with the **title of the regulation**. "
-                                "2️⃣ Use clear, structured sentences for **core legal points**. "
-                                "3 Avoid introductory phrases. "
-                                "4️⃣ The summary **must be exactly 600 tokens**. "
-                                "5️⃣ Adjust sentence length if needed to reach token count."
-                            ),
-                        },
-                        {"role": "user", "content": f"Text:\n{truncated}\n\nSummary:"},
-                    ],
-                    max_tokens=MAX_SUMMARY_TOKENS,
-                    temperature=0.0,
-                )
-                .choices[0]
-                .message.content.strip()
+            pending[(category, relative_path)] = content
+
+    if not pending:
+        return summarized
+
+    async def _run():
+        engine = LLMEngine()
+        cache = SectionSummaryCache() if mode == "map_reduce" else None
+        try:
+            keys = list(pending)
+            results = await asyncio.gather(
+                *(
+                    summarize_document(engine, pending[key], cache, mode)
+                    for key in keys
+                ),
+                return_exceptions=True,
             )
-            summarized[category][relative_path] = summary
+        finally:
+            await engine.close()
+            if cache is not None:
+                cache.close()
+        return zip(keys, results)
+
+    for (category, relative_path), summary in asyncio.run(_run()):
+        if isinstance(summary, Exception):
+            # Left pending so the next run picks it up again
+            print(f"❌ Summarization failed for {relative_path}: {summary}")
+            continue
+        summarized[category][relative_path] = summary
     return summarized
@@ -0,0 +1,307 @@
+# scripts/tracing.py
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from pathlib import Path
+from config import TRACE_PATH, TRACING_ENABLED
+import json
+import os
+import threading
+import time
+
+# Numeric attributes summed per stage in the summary table
+SUMMED_ATTRIBUTES = [
+    "items",
+    "input_tokens",
+    "output_tokens",
+    "cached_tokens",
+    "cache_hits",
+    "cache_misses",
+]
+
+
+def usage_counts(usage) -> tuple[int, int, int]:
+    """(prompt, cached prompt, completion) tokens of a response.usage."""
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens")
+        prompt = usage.get("prompt_tokens")
+        completion = usage.get("completion_tokens")
+    else:
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None)
+        prompt = getattr(usage, "prompt_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+    return prompt or 0, cached or 0, completion or 0
+
+
+@dataclass
+class Span:
+    """
+    One timed unit of work. Exported with OTLP/JSON field names (trace and
+    span IDs as hex, times in Unix nanoseconds) so the JSONL file can be
+    loaded into any OpenTelemetry-aware tool.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_time_unix_nano: int
+    attributes: dict = field(default_factory=dict)
+    end_time_unix_nano: int | None = None
+    status: str = "OK"
+    tracer: "Tracer | None" = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, **counts):
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def record_usage(self, usage):
+        """Adds the token counts of an OpenAI response.usage (object or dict)."""
+        if usage is None:
+            return
+        prompt, cached, completion = usage_counts(usage)
+        self.add(
+            llm_calls=1,
+            input_tokens=prompt,
+            output_tokens=completion,
+            cached_tokens=cached,
+        )
+
+    def end(self, error: BaseException | None = None):
+        if self.end_time_unix_nano is not None:
+            return
+        self.end_time_unix_nano = time.time_ns()
+        if error is not None:
+            self.status = "ERROR"
+            self.attributes["error"] = f"{error.__class__.__name__}: {error}"
+        if self.tracer:
+            self.tracer._finish(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+
+
+class _NoopSpan(Span):
+    def set(self, **attributes):
+        pass
+
+    def add(self, **counts):
+        pass
+
+    def record_usage(self, usage):
+        pass
+
+    def end(self, error: BaseException | None = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan("noop", "", "", None, 0)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class _StageStats:
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    first_start: int = 0
+    totals: dict = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Records spans for the pipeline and query stages. The active span follows
+    contextvars, so asyncio tasks nest under the span they were created in,
+    as do threads started through copy_context(). Finished spans are appended
+    to a JSONL file (when a path is set) and aggregated per stage name for
+    summary(). A disabled tracer hands out a no-op span and records nothing.
+    """
+
+    def __init__(self, path: Path | None = None, enabled: bool = True):
+        self.path = Path(path) if path else None
+        self.enabled = enabled
+        self._stages: dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start_span(self, name: str, parent: Span | None = None, **attributes) -> Span:
+        """Starts a span without making it the active one; call end() on it."""
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = parent or _current_span.get()
+        if parent is NOOP_SPAN:
+            parent = None
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_span_id=parent.span_id if parent else None,
+            start_time_unix_nano=time.time_ns(),
+            attributes=dict(attributes),
+            tracer=self,
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.end(error=e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _finish(self, span: Span):
+        with self._lock:
+            stats = self._stages.get(span.name)
+            if stats is None:
+                stats = self._stages[span.name] = _StageStats(
+                    first_start=span.start_time_unix_nano
+                )
+            stats.first_start = min(stats.first_start, span.start_time_unix_nano)
+            stats.calls += 1
+            stats.errors += span.status == "ERROR"
+            stats.seconds += span.duration
+            stats.max_seconds = max(stats.max_seconds, span.duration)
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stats.totals[key] = stats.totals.get(key, 0) + value
+
+            if self.path:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+                self._file.flush()
+
+    def summary(self) -> list[dict]:
+        """Per-stage totals, in the order the stages first started."""
+        with self._lock:
+            stages = sorted(self._stages.items(), key=lambda item: item[1].first_start)
+            rows = []
+            for name, stats in stages:
+                hits = stats.totals.get("cache_hits", 0)
+                lookups = hits + stats.totals.get("cache_misses", 0)
+                rows.append(
+                    {
+                        "stage": name,
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "seconds": stats.seconds,
+                        "mean_ms": 1000 * stats.seconds / stats.calls,
+                        "max_ms": 1000 * stats.max_seconds,
+                        **{key: stats.totals.get(key, 0) for key in SUMMED_ATTRIBUTES},
+                        "cache_hit_rate": hits / lookups if lookups else None,
+                    }
+                )
+            return rows
+
+    def format_summary(self) -> str:
+        # Time is summed over calls, so concurrent stages can exceed the wall time
+        lines = [
+            f"{'stage':<16}{'calls':>7}{'errors':>7}{'total':>10}{'mean':>10}{'max':>10}"
+            f"{'items':>8}{'in tok':>10}{'out tok':>9}{'cached':>9}{'cache hit':>11}"
+        ]
+        for row in self.summary():
+            hit_rate = row["cache_hit_rate"]
+            lines.append(
+                f"{row['stage']:<16}{row['calls']:>7}{row['errors']:>7}"
+                f"{row['seconds']:9.2f}s"
+                f"{row['mean_ms']:8.1f}ms{row['max_ms']:8.1f}ms{row['items']:>8}"
+                f"{row['input_tokens']:>10}{row['output_tokens']:>9}"
+                f"{row['cached_tokens']:>9}"
+                f"{'-' if hit_rate is None else f'{hit_rate:.0%}':>11}"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer = Tracer(TRACE_PATH, enabled=TRACING_ENABLED)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def configure_tracing(path: Path | None = TRACE_PATH, enabled: bool = True) -> Tracer:
+    """Replaces the process-wide tracer, e.g. for a --profile run."""
+    global _tracer
+    _tracer.close()
+    _tracer = Tracer(path, enabled)
+    return _tracer
+
+
+def span(name: str, **attributes):
+    return _tracer.span(name, **attributes)
+
+
+def current_span() -> Span:
+    return _current_span.get() or NOOP_SPAN
+
+
+def record_usage(usage):
+    current_span().record_usage(usage)
+
+
+def record_cache(hits: int, misses: int):
+    current_span().add(cache_hits=hits, cache_misses=misses)
+
+
+def traced(name: str, iterable: Iterable, **attributes) -> Iterator:
+    """
+    Spans the consumption of a generator. Its body runs with the span active
+    (so usage recorded inside lands on it) without the span leaking into the
+    caller's context between items.
+    """
+    if not _tracer.enabled:
+        yield from iterable
+        return
+    span = _tracer.start_span(name, **attributes)
+    context = copy_context()
+    context.run(_current_span.set, span)
+    iterator = context.run(iter, iterable)
+    try:
+        while True:
+            try:
+                item = context.run(next, iterator)
+            except StopIteration:
+                break
+            yield item
+    except Exception as e:
+        span.end(error=e)
+        raise
+    finally:
+        span.end()
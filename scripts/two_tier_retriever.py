@@ -0,0 +1,122 @@
+# scripts/two_tier_retriever.py
+
+from pathlib import Path
+from langchain_core.documents import Document
+from config import VECTORSTORE_DIR, FULLTEXT_DOCUMENTS, FULLTEXT_K
+from scripts.bm25_index import celex_from_source, tokenize
+from scripts.tracing import span
+
+# Fine tier store (chunks of the full raw texts), kept next to the summaries
+FULLTEXT_DIR_NAME = "fulltext"
+
+
+def top_celexes(documents: list[Document], n: int) -> list[str]:
+    """CELEX numbers of the first n distinct documents in a ranking."""
+    celexes = dict.fromkeys(
+        doc.metadata.get("celex") or celex_from_source(doc.metadata["source"])
+        for doc in documents
+    )
+    return list(celexes)[:n]
+
+
+class TwoTierRetriever:
+    """
+    Wraps the summary retriever (the coarse, document-level tier) with a store
+    of full-text chunks (the fine tier). A query first ranks summaries, then
+    searches only the fine chunks of the best documents of that ranking, so
+    annexes and articles past the summarization cut-off can be found without
+    every search scanning every raw chunk. Results are the summary chunks
+    followed by the fine ones.
+    """
+
+    def __init__(
+        self,
+        retriever,
+        fulltext,
+        documents: int = FULLTEXT_DOCUMENTS,
+        k: int = FULLTEXT_K,
+    ):
+        self.retriever = retriever
+        self.fulltext = fulltext
+        self.documents = documents
+        self.k = k
+
+    @classmethod
+    def load(
+        cls, retriever, embedding, persist_dir: Path = VECTORSTORE_DIR
+    ) -> "TwoTierRetriever | None":
+        fulltext_dir = Path(persist_dir) / FULLTEXT_DIR_NAME
+        if not fulltext_dir.exists():
+            return None
+        from langchain_chroma import Chroma
+
+        fulltext = Chroma(
+            persist_directory=str(fulltext_dir), embedding_function=embedding
+        )
+        return cls(retriever, fulltext)
+
+    # The query path reads these off whatever retriever it is given
+    @property
+    def vectorstore(self):
+        return self.retriever.vectorstore
+
+    @property
+    def search_kwargs(self) -> dict:
+        return self.retriever.search_kwargs
+
+    @property
+    def bm25(self):
+        return getattr(self.retriever, "bm25", None)
+
+    def _filter(self, documents: list[Document]) -> dict | None:
+        celexes = top_celexes(documents, self.documents)
+        if not celexes:
+            return None
+        if len(celexes) == 1:
+            return {"celex": celexes[0]}
+        return {"celex": {"$in": celexes}}
+
+    def search_fine(
+        self, documents: list[Document], vector: list[float]
+    ) -> list[Document]:
+        filter = self._filter(documents)
+        if filter is None:
+            return []
+        with span("retrieve", tier="fine") as stage:
+            fine = self.fulltext.similarity_search_by_vector(
+                vector, k=self.k, filter=filter
+            )
+            stage.set(items=len(fine))
+        return fine
+
+    def lookup_fine(self, documents: list[Document], query: str) -> list[Document]:
+        """
+        Fine chunks of the given documents without a query vector, for questions
+        that cite them by number: the chunks are read by CELEX filter and ranked
+        by how many of the query's terms they contain, ties in document order.
+        """
+        filter = self._filter(documents)
+        if filter is None:
+            return []
+        with span("retrieve", tier="fine", strategy="exact_id") as stage:
+            stored = self.fulltext.get(where=filter, include=["documents", "metadatas"])
+            terms = set(tokenize(query))
+            ranked = sorted(
+                zip(stored["ids"], stored["documents"], stored["metadatas"]),
+                key=lambda row: (
+                    -len(terms.intersection(tokenize(row[1]))),
+                    row[0].rsplit("::", 1)[0],
+                    int(row[0].rsplit("::", 1)[1]),
+                ),
+            )
+            fine = [
+                Document(page_content=text, metadata=metadata)
+                for _, text, metadata in ranked[: self.k]
+            ]
+            stage.set(items=len(fine))
+        return fine
+
+    def invoke(self, query: str, filter: dict | None = None) -> list[Document]:
+        documents = self.retriever.invoke(query, filter=filter)
+        vector = self.vectorstore.embeddings.embed_query(query)
+        return documents + self.search_fine(documents, vector)
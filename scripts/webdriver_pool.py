@@ -0,0 +1,173 @@
+# scripts/webdriver_pool.py
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from config import (
+    SCRAPER_WORKERS,
+    SCRAPER_HOST_MIN_INTERVAL,
+    SCRAPER_WAIT_TIMEOUT,
+    SCRAPER_PAGE_LOAD_TIMEOUT,
+)
+from scripts.host_throttle import HostThrottle
+import queue
+import threading
+
+
+class WebDriverPool:
+    """
+    A pool of up to `size` headless Chrome drivers shared by the scrapers.
+    Drivers are started on demand and reused, page loads go through a
+    per-host politeness throttle and wait for an explicit readiness
+    condition instead of sleeping a fixed time.
+    """
+
+    def __init__(
+        self,
+        size: int = SCRAPER_WORKERS,
+        download_dir: Path | None = None,
+        page_load_timeout: int = SCRAPER_PAGE_LOAD_TIMEOUT,
+        host_min_interval: float = SCRAPER_HOST_MIN_INTERVAL,
+        throttle: HostThrottle | None = None,
+    ):
+        self.size = size
+        self.download_dir = Path(download_dir) if download_dir else None
+        self.page_load_timeout = page_load_timeout
+        # A shared throttle keeps other fetchers of the run at the same rate
+        self.throttle = throttle or HostThrottle(host_min_interval)
+        self._service = None
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._reserved = 0
+        self._download_dirs = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "WebDriverPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start_driver(self, worker_id: int):
+        with self._lock:
+            if self._service is None:
+                # Resolve the chromedriver binary once for the whole pool
+                self._service = Service(ChromeDriverManager().install())
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless")
+        download_dir = None
+        if self.download_dir:
+            # One download directory per driver so files can be attributed
+            download_dir = self.download_dir / f".worker-{worker_id}"
+            download_dir.mkdir(parents=True, exist_ok=True)
+            options.add_experimental_option(
+                "prefs",
+                {
+                    "download.default_directory": str(download_dir),
+                    "download.prompt_for_download": False,
+                    "download.directory_upgrade": True,
+                    "plugins.always_open_pdf_externally": True,
+                },
+            )
+
+        driver = webdriver.Chrome(service=self._service, options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        with self._lock:
+            self._drivers.append(driver)
+            self._download_dirs[id(driver)] = download_dir
+        return driver
+
+    @contextmanager
+    def driver(self):
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                worker_id = self._reserved
+                can_start = worker_id < self.size
+                if can_start:
+                    self._reserved += 1
+            if can_start:
+                try:
+                    driver = self._start_driver(worker_id)
+                except Exception:
+                    with self._lock:
+                        self._reserved -= 1
+                    raise
+            else:
+                driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def download_dir_for(self, driver) -> Path | None:
+        return self._download_dirs.get(id(driver))
+
+    def load(
+        self,
+        driver,
+        url: str,
+        wait_for: tuple[str, str] | None = None,
+        timeout: float = SCRAPER_WAIT_TIMEOUT,
+    ) -> str:
+        """
+        Loads url and waits until the wait_for locator is present (or the
+        document is ready). Returns the page source either way, so the caller
+        decides what a page without the expected element means.
+        """
+        self.throttle.wait(url)
+        driver.get(url)
+        try:
+            if wait_for:
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located(wait_for)
+                )
+            else:
+                WebDriverWait(driver, timeout).until(
+                    lambda d: d.execute_script("return document.readyState")
+                    == "complete"
+                )
+        except TimeoutException:
+            print(f"⚠️ Timed out waiting for {wait_for or 'page load'} on {url}")
+        return driver.page_source
+
+    def fetch(
+        self,
+        url: str,
+        wait_for: tuple[str, str] | None = None,
+        timeout: float = SCRAPER_WAIT_TIMEOUT,
+    ) -> str:
+        with self.driver() as driver:
+            return self.load(driver, url, wait_for, timeout)
+
+    def map(
+        self, fn: Callable[["WebDriverPool", object], object], items: Iterable
+    ) -> Iterator[tuple[object, object]]:
+        """
+        Runs fn(pool, item) for every item on `size` worker threads and yields
+        (item, result) as each finishes. A failing item yields its exception.
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = {executor.submit(fn, self, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def close(self):
+        for driver in self._drivers:
+            driver.quit()
+        self._drivers = []
+        self._reserved = 0
+        self._download_dirs = {}
+        self._idle = queue.Queue()
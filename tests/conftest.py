@@ -0,0 +1,6 @@
+# tests/conftest.py
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
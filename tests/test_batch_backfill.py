@@ -0,0 +1,120 @@
+# tests/test_batch_backfill.py
+
+from functools import partial
+from scripts import batch_backfill as batch_module
+from scripts.batch_backfill import LocalBatchBackend, backfill, fake_completion
+from scripts.processed_index import ProcessedIndex, content_hash
+from scripts.run_journal import RunJournal
+from scripts.summarize import SUMMARY_SYSTEM_PROMPT
+import json
+import pytest
+
+RAW_TEXTS = {
+    "32024R0001.txt": "Rules on  Energy\nmarkets for gas and power.",
+    "32024R0002.txt": "Fees for Banking supervision by the central bank.",
+    "32024R0003.txt": "Transparency of Energy labelling for household appliances.",
+}
+# The summarize request of this document fails
+FAILING_TEXT = "Fees for Banking"
+
+
+def failing_completion(body: dict) -> str:
+    system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+    if system == SUMMARY_SYSTEM_PROMPT and FAILING_TEXT in user:
+        raise RuntimeError("model overloaded")
+    return fake_completion(body)
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for name, text in RAW_TEXTS.items():
+        (raw_dir / name).write_text(text, encoding="utf-8")
+    paths = {
+        "raw_dir": raw_dir,
+        "summary_dir": tmp_path / "summarized",
+        "batch_dir": tmp_path / "batches",
+    }
+    # The index and journal default to the real data directory
+    index_path = tmp_path / "processed_index.json"
+    journal_path = tmp_path / "pipeline_journal.jsonl"
+    monkeypatch.setattr(
+        ProcessedIndex, "load", partial(ProcessedIndex.load, index_path=index_path)
+    )
+    monkeypatch.setattr(RunJournal, "load", partial(RunJournal.load, journal_path))
+    return {**paths, "index_path": index_path, "journal_path": journal_path}
+
+
+def run(paths: dict, backend):
+    backfill(
+        "run",
+        backend,
+        raw_dir=paths["raw_dir"],
+        summary_dir=paths["summary_dir"],
+        batch_dir=paths["batch_dir"],
+        poll_interval=0.01,
+    )
+
+
+def journal_records(path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_writes_summaries_index_and_journal(paths, tmp_path, capsys):
+    run(paths, LocalBatchBackend(tmp_path / "local", completion_seconds=0.05))
+
+    expected = {
+        "32024R0001.txt": "Energy",
+        "32024R0002.txt": "Banking",
+        "32024R0003.txt": "Energy",
+    }
+    for name, category in expected.items():
+        summary = paths["summary_dir"] / category / name
+        assert summary.read_text(encoding="utf-8") == " ".join(RAW_TEXTS[name].split())
+
+    index = json.loads(paths["index_path"].read_text(encoding="utf-8"))
+    assert index == {
+        name: {
+            "category": category,
+            "content_hash": content_hash(RAW_TEXTS[name]),
+            "summary_path": f"{category}/{name}",
+        }
+        for name, category in expected.items()
+    }
+
+    records = journal_records(paths["journal_path"])
+    assert sorted((r["doc"], r["stage"]) for r in records) == sorted(
+        (name, stage) for name in expected for stage in ("categorize", "summarize")
+    )
+    assert not (paths["batch_dir"] / batch_module.STATE_NAME).exists()
+    out = capsys.readouterr().out
+    assert "💾 Wrote 3 of 3 summaries (6 requests, 0 failed)" in out
+
+    # Everything is summarized now
+    run(paths, LocalBatchBackend(tmp_path / "local"))
+
+    assert "✅ Nothing to backfill" in capsys.readouterr().out
+
+
+def test_failed_requests_are_left_for_the_next_run(paths, tmp_path, capsys):
+    run(paths, LocalBatchBackend(tmp_path / "local", responder=failing_completion))
+
+    out = capsys.readouterr().out
+    assert "💾 Wrote 2 of 3 summaries (6 requests, 1 failed)" in out
+    assert not (paths["summary_dir"] / "Banking" / "32024R0002.txt").exists()
+    assert not (paths["batch_dir"] / batch_module.STATE_NAME).exists()
+    # The category of the failed document is journaled all the same
+    records = journal_records(paths["journal_path"])
+    assert [r["stage"] for r in records if r["doc"] == "32024R0002.txt"] == [
+        "categorize"
+    ]
+
+    run(paths, LocalBatchBackend(tmp_path / "local"))
+
+    # Only the failed summary is requested again
+    out = capsys.readouterr().out
+    assert "💾 Wrote 1 of 1 summaries (1 requests, 0 failed)" in out
+    summary = paths["summary_dir"] / "Banking" / "32024R0002.txt"
+    assert summary.read_text(encoding="utf-8") == RAW_TEXTS["32024R0002.txt"]
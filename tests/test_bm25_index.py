@@ -0,0 +1,39 @@
+# tests/test_bm25_index.py
+
+from scripts.bm25_index import extract_ids
+import pytest
+
+
+@pytest.mark.parametrize(
+    "question, terms",
+    [
+        ("What does 32017R2063 require?", ["celex:32017r2063", "2017/2063"]),
+        ("Summarize 32014l0065", ["celex:32014l0065", "2014/65"]),
+        ("Who enforces Regulation (EU) 2017/2063?", ["2017/2063"]),
+        ("Is Directive 2014/65/EU still in force?", ["2014/65"]),
+        ("Scope of Regulation (EC) No 1907/2006", ["1907/2006"]),
+        ("Council Decision (CFSP) 2022/266 sanctions", ["2022/266"]),
+        (
+            "Does Commission Implementing Regulation (EU) 2021/1165 amend "
+            "Regulation (EU) 2018/848?",
+            ["2021/1165", "2018/848"],
+        ),
+    ],
+)
+def test_extract_ids_finds_cited_acts(question, terms):
+    assert extract_ids(question) == terms
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What changed for fishing quotas in 2019?",
+        "Which rules applied during 2019/2020?",
+        "What does Article 12/2016 say about penalties?",
+        "Explain Article 5(2) and paragraph 3 of Annex II",
+        "Costs rose by 1500/2000 euro per tonne",
+        "Is 02016R0679-20160504 the consolidated text?",
+    ],
+)
+def test_extract_ids_ignores_years_and_article_numbers(question):
+    assert extract_ids(question) == []
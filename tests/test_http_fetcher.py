@@ -0,0 +1,244 @@
+# tests/test_http_fetcher.py
+
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from scripts import extract_result_text as extract_module
+from scripts.html_extract import extract_document_text
+from scripts.http_fetcher import HttpFetcher
+import gzip
+import hashlib
+import httpx
+import json
+import pytest
+import socket
+import threading
+
+ROOT = Path(__file__).resolve().parent.parent
+# Pages in EUR-Lex's Official Journal markup, and a JavaScript-only shell
+PAGES = {
+    "/decision": ROOT / "data" / "fixtures" / "html" / "decision-short.html",
+    "/annex": ROOT / "data" / "fixtures" / "html" / "implementing-regulation-annex.html",
+    "/scripted": Path(__file__).resolve().parent / "fixtures" / "scripted-shell.html",
+}
+LAST_MODIFIED = formatdate(1735689600, usegmt=True)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # Keep-alive needs HTTP/1.1 and a Content-Length on every response
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+            server.connections.add(self.client_address)
+        path = PAGES.get(self.path)
+        if path is None:
+            self._send(500, b"Internal Server Error", {})
+            return
+
+        body = path.read_bytes()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        validators = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", validators)
+            return
+        headers = {**validators, "Content-Type": "text/html; charset=utf-8"}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = set()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def refused_url():
+    # A port that was just free: nothing listens on it any more
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/decision"
+
+
+def make_fetcher(tmp_path, **kwargs) -> HttpFetcher:
+    return HttpFetcher(
+        validators_path=tmp_path / "validators.json", host_min_interval=0.0, **kwargs
+    )
+
+
+def fetch(fetcher: HttpFetcher, urls, conditional_urls=frozenset()) -> dict:
+    return {
+        result.url: (result, headers)
+        for result, headers in fetcher.iter_fetch(urls, conditional_urls)
+    }
+
+
+def test_fetch_decodes_gzip_and_reuses_connections(server, tmp_path):
+    urls = [f"{server.base_url}/decision?copy={i}" for i in range(6)]
+    PAGES.update({f"/decision?copy={i}": PAGES["/decision"] for i in range(6)})
+    try:
+        results = fetch(make_fetcher(tmp_path, concurrency=2), urls)
+    finally:
+        for i in range(6):
+            PAGES.pop(f"/decision?copy={i}")
+
+    expected = PAGES["/decision"].read_text(encoding="utf-8")
+    for url in urls:
+        result, _ = results[url]
+        assert result.status == 200
+        assert result.html == expected
+    assert all("gzip" in headers["Accept-Encoding"] for _, headers in server.requests)
+    # Six requests over at most two pooled keep-alive connections
+    assert len(server.connections) <= 2
+
+
+def test_fetch_stores_validators_and_revalidates(server, tmp_path):
+    url = f"{server.base_url}/annex"
+    fetcher = make_fetcher(tmp_path)
+    result, headers = fetch(fetcher, [url])[url]
+
+    assert result.status == 200
+    assert not result.not_modified
+    fetcher.remember(result, headers)
+    fetcher.save_validators()
+    stored = json.loads((tmp_path / "validators.json").read_text(encoding="utf-8"))
+    assert stored[url]["last_modified"] == LAST_MODIFIED
+    etag = stored[url]["etag"]
+
+    # A new run revalidates with the stored validators
+    result, _ = fetch(make_fetcher(tmp_path), [url], {url})[url]
+
+    assert result.status == 304
+    assert result.not_modified
+    assert result.html is None
+    _, request_headers = server.requests[-1]
+    assert request_headers["If-None-Match"] == etag
+    assert request_headers["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_fetch_sends_validators_only_for_conditional_urls(server, tmp_path):
+    url = f"{server.base_url}/annex"
+    fetcher = make_fetcher(tmp_path)
+    fetcher.validators = {url: {"etag": '"stale"', "last_modified": LAST_MODIFIED}}
+
+    result, _ = fetch(fetcher, [url])[url]
+
+    assert result.status == 200
+    _, request_headers = server.requests[-1]
+    assert "If-None-Match" not in request_headers
+    assert "If-Modified-Since" not in request_headers
+
+
+def test_fetch_reports_errors(server, refused_url, tmp_path):
+    error_url = f"{server.base_url}/error"
+    results = fetch(make_fetcher(tmp_path), [error_url, refused_url])
+
+    result, headers = results[error_url]
+    assert result.status == 500
+    assert isinstance(result.error, httpx.HTTPStatusError)
+    assert result.html is None
+    assert headers is None
+
+    result, headers = results[refused_url]
+    assert result.status is None
+    assert isinstance(result.error, httpx.ConnectError)
+    assert headers is None
+
+
+class FakeWebDriverPool:
+    """Stands in for the browser: every page renders its document1 div."""
+
+    fetched: list[str] = []
+    throttles: list = []
+
+    def __init__(self, workers: int, throttle=None):
+        self.throttles.append(throttle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def fetch(self, url: str, wait_for=None) -> str:
+        self.fetched.append(url)
+        return f'<div id="document1"><p>Rendered {url}</p></div>'
+
+    def map(self, fn, items):
+        for item in items:
+            yield item, fn(self, item)
+
+
+def test_extract_result_text_falls_back_to_browser(server, tmp_path, monkeypatch):
+    entries = [
+        {"celex": celex, "link": f"{server.base_url}/{path}"}
+        for celex, path in [
+            ("32025D0001", "decision"),
+            ("32025R0002", "scripted"),
+            ("32025R0003", "error"),
+        ]
+    ]
+    metadata = tmp_path / "eurlex_results.json"
+    metadata.write_text(json.dumps(entries), encoding="utf-8")
+    raw_dir = tmp_path / "raw"
+    fetchers = []
+
+    def http_fetcher(throttle):
+        fetchers.append(make_fetcher(tmp_path, throttle=throttle))
+        return fetchers[-1]
+
+    monkeypatch.setattr(extract_module, "METADATA_JSON", metadata)
+    monkeypatch.setattr(extract_module, "RAW_DIR", raw_dir)
+    monkeypatch.setattr(extract_module, "HttpFetcher", http_fetcher)
+    monkeypatch.setattr(extract_module, "WebDriverPool", FakeWebDriverPool)
+    monkeypatch.setattr(FakeWebDriverPool, "fetched", [])
+    monkeypatch.setattr(FakeWebDriverPool, "throttles", [])
+
+    messages = list(extract_module.extract_result_text(workers=1, backend="http"))
+
+    assert "✅ Saved document for 32025D0001" in messages
+    assert sorted(FakeWebDriverPool.fetched) == [
+        f"{server.base_url}/error",
+        f"{server.base_url}/scripted",
+    ]
+    # Both backends share one per-host throttle
+    assert FakeWebDriverPool.throttles == [fetchers[0].throttle]
+    expected = extract_document_text(PAGES["/decision"].read_text(encoding="utf-8"))
+    assert (raw_dir / "32025D0001.txt").read_text(encoding="utf-8") == expected
+    for celex in ("32025R0002", "32025R0003"):
+        assert (raw_dir / f"{celex}.txt").read_text(encoding="utf-8").startswith(
+            "Rendered"
+        )
+
+    # A refresh revalidates the saved pages: the static one is not modified
+    messages = list(
+        extract_module.extract_result_text(workers=1, backend="http", refresh=True)
+    )
+
+    assert "⏭️ Skipping 32025D0001 (not modified)" in messages
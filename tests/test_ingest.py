@@ -0,0 +1,126 @@
+# tests/test_ingest.py
+
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from scripts.ingest import IngestionEngine, IngestItem, open_collection
+import pytest
+
+EMBEDDING_SIZE = 16
+CORPUS = {
+    "Energy/32024R0001.txt": ["Article 1 covers gas.", "Article 2 covers power."],
+    "Energy/32024R0002.txt": ["Annex I lists the grids."],
+    "Transport/32024R0003.txt": [
+        "Article 1 covers rail.",
+        "Article 2 covers roads.",
+        "Article 3 covers ports.",
+        "Annex II lists the corridors.",
+    ],
+    # A file without chunks still counts as written
+    "Transport/32024R0004.txt": [],
+}
+
+
+class FailingEmbedding(DeterministicFakeEmbedding):
+    """Fails every batch containing a text with the marker."""
+
+    marker: str = "covers roads"
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if any(self.marker in text for text in texts):
+            raise RuntimeError("embedding request failed")
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "summarized"
+    for source, paragraphs in CORPUS.items():
+        path = root / source
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Chroma(
+        persist_directory=str(tmp_path / "vectorstore"),
+        embedding_function=DeterministicFakeEmbedding(size=EMBEDDING_SIZE),
+    )
+
+
+@pytest.fixture
+def collection(tmp_path, db):
+    # The engine writes to the same collection the store reads
+    return open_collection(tmp_path / "vectorstore")
+
+
+def read_items(root, written: list[str]):
+    # Files are read and split lazily, on the engine's reader thread
+    for path in sorted(root.rglob("*.txt")):
+        source = str(path.relative_to(root))
+        text = path.read_text(encoding="utf-8")
+        chunks = [chunk for chunk in text.split("\n\n") if chunk]
+        metadata = {"category": path.parent.name, "source": source}
+        yield IngestItem(
+            ids=[f"{source}::{i}" for i in range(len(chunks))],
+            texts=chunks,
+            metadatas=[metadata] * len(chunks),
+            on_written=lambda source=source: written.append(source),
+        )
+
+
+def test_ingests_every_chunk_with_ids_and_metadata(corpus, db, collection):
+    written = []
+    engine = IngestionEngine(
+        DeterministicFakeEmbedding(size=EMBEDDING_SIZE), batch_size=3, workers=2
+    )
+
+    stats = engine.run(collection, read_items(corpus, written))
+
+    total_chunks = sum(len(paragraphs) for paragraphs in CORPUS.values())
+    assert stats.items == len(CORPUS)
+    assert stats.chunks == total_chunks
+    # Batches span file boundaries: one upsert per full batch of 3
+    assert stats.batches == -(-total_chunks // 3)
+    assert sorted(written) == sorted(CORPUS)
+
+    stored = db.get(include=["documents", "metadatas", "embeddings"])
+    expected = {
+        f"{source}::{i}": (text, source)
+        for source, paragraphs in CORPUS.items()
+        for i, text in enumerate(paragraphs)
+    }
+    assert sorted(stored["ids"]) == sorted(expected)
+    fake = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    for chunk_id, text, metadata, vector in zip(
+        stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"]
+    ):
+        expected_text, source = expected[chunk_id]
+        assert text == expected_text
+        assert metadata == {"category": source.split("/")[0], "source": source}
+        assert list(vector) == pytest.approx(fake.embed_query(text))
+
+
+def test_reingesting_upserts_in_place(corpus, db, collection):
+    engine = IngestionEngine(
+        DeterministicFakeEmbedding(size=EMBEDDING_SIZE), batch_size=2, workers=3
+    )
+
+    first = engine.run(collection, read_items(corpus, []))
+    second = engine.run(collection, read_items(corpus, []))
+
+    assert first.chunks == second.chunks == len(db.get()["ids"])
+
+
+def test_failing_embed_batch_is_raised(corpus, collection):
+    written = []
+    engine = IngestionEngine(
+        FailingEmbedding(size=EMBEDDING_SIZE), batch_size=2, workers=2
+    )
+
+    with pytest.raises(RuntimeError, match="embedding request failed"):
+        engine.run(collection, read_items(corpus, written))
+
+    # The file whose chunks failed to embed is never reported as written
+    assert "Transport/32024R0003.txt" not in written
@@ -0,0 +1,209 @@
+# tests/test_llm_engine.py
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import BadRequestError, InternalServerError
+from scripts import llm_engine
+from scripts.llm_engine import LLMEngine, RateLimiter
+import asyncio
+import json
+import threading
+import time
+import pytest
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        content = body["messages"][-1]["content"]
+        with server.lock:
+            server.requests.append(body)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            scripted = server.script.pop(0) if server.script else None
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if scripted is not None:
+            status, headers = scripted
+        elif "fail" in content:
+            status, headers = 400, {}
+        else:
+            status, headers = 200, {}
+
+        if status == 200:
+            payload = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": f" echo: {content} ",
+                        },
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            }
+        else:
+            payload = {"error": {"message": f"status {status}", "type": "test"}}
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    OpenAI-compatible chat completions endpoint. Requests are answered with
+    the scripted (status, headers) pairs in order, then with 200 (400 for
+    messages containing "fail"); every request takes delay seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOpenAIHandler)
+        self.lock = threading.Lock()
+        self.script = []
+        self.requests = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAIServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def engine_settings(monkeypatch):
+    # config ships without a key, and an empty bearer token is not a valid header
+    monkeypatch.setattr(llm_engine, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_engine, "BASE_BACKOFF_SECONDS", 0.01)
+
+
+def run(server, coroutine, **engine_kwargs):
+    async def _run():
+        engine = LLMEngine(base_url=server.base_url, **engine_kwargs)
+        try:
+            return await coroutine(engine)
+        finally:
+            await engine.close()
+
+    return asyncio.run(_run())
+
+
+def message(text: str) -> dict:
+    return {"messages": [{"role": "user", "content": text}], "max_tokens": 5}
+
+
+def test_complete_returns_stripped_content(server):
+    result = run(server, lambda engine: engine.complete(**message("hello")))
+
+    assert result == "echo: hello"
+    assert len(server.requests) == 1
+    assert server.requests[0]["model"] == llm_engine.OPENAI_MODEL
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503])
+def test_complete_retries_retryable_statuses(server, status):
+    server.script = [(status, {}), (status, {})]
+
+    result = run(server, lambda engine: engine.complete(**message("retry")))
+
+    assert result == "echo: retry"
+    assert len(server.requests) == 3
+
+
+def test_complete_waits_for_retry_after(server):
+    server.script = [(429, {"Retry-After": "0.3"})]
+
+    start = time.perf_counter()
+    result = run(server, lambda engine: engine.complete(**message("later")))
+
+    assert result == "echo: later"
+    assert len(server.requests) == 2
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_complete_does_not_retry_client_errors(server):
+    with pytest.raises(BadRequestError):
+        run(server, lambda engine: engine.complete(**message("fail")))
+    assert len(server.requests) == 1
+
+
+def test_complete_raises_once_retries_are_exhausted(server):
+    server.script = [(500, {})] * 3
+
+    with pytest.raises(InternalServerError):
+        run(
+            server,
+            lambda engine: engine.complete(**message("down")),
+            max_retries=2,
+        )
+    assert len(server.requests) == 3
+
+
+def test_complete_many_respects_concurrency(server):
+    server.delay = 0.05
+    requests = {i: message(f"document {i}") for i in range(8)}
+
+    results = run(
+        server, lambda engine: engine.complete_many(requests), concurrency=2
+    )
+
+    assert results == {i: f"echo: document {i}" for i in range(8)}
+    assert server.max_in_flight == 2
+
+
+def test_complete_many_leaves_out_failed_requests(server):
+    requests = {
+        "ok-1": message("first"),
+        "bad": message("fail this one"),
+        "ok-2": message("second"),
+    }
+
+    results = run(server, lambda engine: engine.complete_many(requests))
+
+    assert results == {"ok-1": "echo: first", "ok-2": "echo: second"}
+    assert list(results) == ["ok-1", "ok-2"]
+
+
+def test_rate_limiter_waits_for_tokens():
+    async def _run():
+        # 6000 tokens per minute refill at 100 per second
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6000)
+        await limiter.acquire(6000)
+        start = time.perf_counter()
+        await limiter.acquire(20)
+        return time.perf_counter() - start
+
+    assert asyncio.run(_run()) >= 0.15
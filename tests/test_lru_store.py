@@ -0,0 +1,58 @@
+# tests/test_lru_store.py
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from scripts.embedding_cache import CachedEmbeddings
+from scripts.lru_store import SQLiteLRUStore
+from scripts.section_cache import SectionSummaryCache
+import pytest
+
+
+def test_evicts_least_recently_used_down_to_a_fraction(tmp_path):
+    store = SQLiteLRUStore(tmp_path / "store.sqlite", "items", "value", 10)
+    store.put_many([(f"k{i}", f"v{i}") for i in range(10)])
+    # Reading k0 makes it the most recently used entry
+    assert store.get("k0") == "v0"
+
+    store.put("k10", "v10")
+
+    assert len(store) == 9
+    assert store.get("k0") == "v0"
+    assert store.get("k10") == "v10"
+    assert store.get_many(["k1", "k2"]) == {}
+    store.close()
+
+    # The count survives a reopen, replaced keys don't grow the table
+    store = SQLiteLRUStore(tmp_path / "store.sqlite", "items", "value", 10)
+    store.put("k0", "new")
+    assert len(store) == 9
+    assert store.get("k0") == "new"
+
+
+def test_embedding_cache_round_trips_vectors(tmp_path):
+    fake = DeterministicFakeEmbedding(size=8)
+    cache = CachedEmbeddings(fake, cache_path=tmp_path / "embeddings.sqlite")
+
+    first = cache.embed_documents(["a", "b", "a"])
+    second = cache.embed_query("b")
+
+    assert first[0] == pytest.approx(fake.embed_query("a"))
+    assert second == pytest.approx(fake.embed_query("b"))
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_section_cache_round_trips_summaries(tmp_path):
+    cache = SectionSummaryCache(tmp_path / "sections.sqlite", max_entries=2)
+    request = {"messages": [{"role": "user", "content": "Article 1"}]}
+
+    assert cache.get(request) is None
+    cache.put(request, "Scope.")
+
+    assert cache.get(request) == "Scope."
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    # The same request for another model is a different entry
+    other = SectionSummaryCache(tmp_path / "sections.sqlite", model="other-model")
+    assert other.get(request) is None
+    other.close()